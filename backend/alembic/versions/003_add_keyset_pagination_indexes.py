@@ -0,0 +1,41 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    # Task lists are ordered by (deadline, task_id), optionally filtered by portfolio or creator
+    op.create_index('ix_tasks_deadline_task_id', 'tasks', ['deadline', 'task_id'])
+    op.create_index('ix_tasks_portfolio_id_deadline_task_id', 'tasks', ['portfolio_id', 'deadline', 'task_id'])
+    op.create_index('ix_tasks_created_by_deadline_task_id', 'tasks', ['created_by', 'deadline', 'task_id'])
+    # Assigned task lists filter assignments by user before joining tasks
+    op.create_index('ix_task_assignments_user_id_task_id', 'task_assignments', ['user_id', 'task_id'])
+    # Meeting lists are ordered by (meeting_date, meeting_id) newest first, usually within a portfolio
+    op.create_index('ix_meeting_records_meeting_date_meeting_id', 'meeting_records', ['meeting_date', 'meeting_id'])
+    op.create_index(
+        'ix_meeting_records_portfolio_id_meeting_date_meeting_id',
+        'meeting_records',
+        ['portfolio_id', 'meeting_date', 'meeting_id'],
+    )
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_index('ix_meeting_records_portfolio_id_meeting_date_meeting_id', table_name='meeting_records')
+    op.drop_index('ix_meeting_records_meeting_date_meeting_id', table_name='meeting_records')
+    op.drop_index('ix_task_assignments_user_id_task_id', table_name='task_assignments')
+    op.drop_index('ix_tasks_created_by_deadline_task_id', table_name='tasks')
+    op.drop_index('ix_tasks_portfolio_id_deadline_task_id', table_name='tasks')
+    op.drop_index('ix_tasks_deadline_task_id', table_name='tasks')
@@ -0,0 +1,31 @@
+"""Add full-text search index on tasks
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    # GIN expression index over the weighted title/description document searched by
+    # crud.task.search_tasks (the expression must stay identical to task_search_vector)
+    op.execute("""
+        CREATE INDEX ix_tasks_search_vector ON tasks USING gin ((
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ))
+    """)
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_index('ix_tasks_search_vector', table_name='tasks')
@@ -0,0 +1,36 @@
+"""Add full-text search vector to meeting_records
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    # Stored generated tsvector over name, summary and transcript so ranking does not
+    # re-parse whole transcripts on every search
+    op.execute("""
+        ALTER TABLE meeting_records ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(meeting_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(auto_caption, '')), 'C')
+        ) STORED
+    """)
+    op.execute(
+        "CREATE INDEX ix_meeting_records_search_vector ON meeting_records USING gin (search_vector)"
+    )
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_index('ix_meeting_records_search_vector', table_name='meeting_records')
+    op.drop_column('meeting_records', 'search_vector')
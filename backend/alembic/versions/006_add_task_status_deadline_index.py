@@ -0,0 +1,25 @@
+"""Add (status, deadline) index on tasks for reminders
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    # Due-window reminder queries filter open statuses within a deadline range
+    op.create_index('ix_tasks_status_deadline', 'tasks', ['status', 'deadline'])
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_index('ix_tasks_status_deadline', table_name='tasks')
@@ -0,0 +1,67 @@
+"""Add materialized portfolio_stats table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    op.create_table(
+        'portfolio_stats',
+        sa.Column('portfolio_id', sa.Integer(), nullable=False),
+        sa.Column('user_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('task_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('active_task_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_task_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('meeting_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['portfolio_id'], ['portfolios.portfolio_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('portfolio_id'),
+    )
+
+    # Backfill from the current data; kept up to date by the application afterwards
+    op.execute("""
+        INSERT INTO portfolio_stats (
+            portfolio_id, user_count, task_count, active_task_count,
+            completed_task_count, meeting_count, updated_at
+        )
+        SELECT
+            p.portfolio_id,
+            coalesce(u.user_count, 0),
+            coalesce(t.task_count, 0),
+            coalesce(t.active_task_count, 0),
+            coalesce(t.completed_task_count, 0),
+            coalesce(m.meeting_count, 0),
+            now()
+        FROM portfolios p
+        LEFT JOIN (
+            SELECT
+                portfolio_id,
+                count(*) AS task_count,
+                count(*) FILTER (WHERE status != 'Completed') AS active_task_count,
+                count(*) FILTER (WHERE status = 'Completed') AS completed_task_count
+            FROM tasks GROUP BY portfolio_id
+        ) t ON t.portfolio_id = p.portfolio_id
+        LEFT JOIN (
+            SELECT portfolio_id, count(*) AS user_count FROM users GROUP BY portfolio_id
+        ) u ON u.portfolio_id = p.portfolio_id
+        LEFT JOIN (
+            SELECT portfolio_id, count(*) AS meeting_count FROM meeting_records GROUP BY portfolio_id
+        ) m ON m.portfolio_id = p.portfolio_id
+    """)
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_table('portfolio_stats')
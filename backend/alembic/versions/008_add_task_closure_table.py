@@ -0,0 +1,50 @@
+"""Add task_closure table for the task hierarchy
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    op.create_table(
+        'task_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['tasks.task_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['tasks.task_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    # Ancestor lookups (root of a task, ancestor checks) go through descendant_id
+    op.create_index('ix_task_closure_descendant_id_depth', 'task_closure', ['descendant_id', 'depth'])
+
+    # Backfill from parent_task_id; the depth bound guards against existing cycles,
+    # which then fail on the primary key instead of recursing forever
+    op.execute("""
+        INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE closure (ancestor_id, descendant_id, depth) AS (
+            SELECT task_id, task_id, 0 FROM tasks
+            UNION ALL
+            SELECT closure.ancestor_id, tasks.task_id, closure.depth + 1
+            FROM closure JOIN tasks ON tasks.parent_task_id = closure.descendant_id
+            WHERE closure.depth < 100
+        )
+        SELECT ancestor_id, descendant_id, depth FROM closure
+    """)
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_index('ix_task_closure_descendant_id_depth', table_name='task_closure')
+    op.drop_table('task_closure')
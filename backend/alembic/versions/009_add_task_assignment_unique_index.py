@@ -0,0 +1,36 @@
+"""Make task assignments unique per task and user
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Upgrade the database schema"""
+    # Keep the oldest assignment of each (task, user) pair before enforcing uniqueness
+    op.execute("""
+        DELETE FROM task_assignments
+        WHERE assignment_id NOT IN (
+            SELECT MIN(assignment_id) FROM task_assignments GROUP BY task_id, user_id
+        )
+    """)
+    op.create_index(
+        'uq_task_assignments_task_id_user_id',
+        'task_assignments',
+        ['task_id', 'user_id'],
+        unique=True,
+    )
+
+
+def downgrade():
+    """Downgrade the database schema"""
+    op.drop_index('uq_task_assignments_task_id_user_id', table_name='task_assignments')
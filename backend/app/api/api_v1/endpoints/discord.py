@@ -2,12 +2,13 @@ from urllib.parse import urlencode
 
 import requests
 from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, RedirectResponse
-from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.config import settings
 from app.crud import user
+from app.database.session import DBSession
 from app.schemas.user import (
     DiscordUser,
     DiscordUserCreateRequestBody,
@@ -18,7 +19,7 @@ router = APIRouter()
 
 
 @router.get("/")
-def discord_login():
+async def discord_login():
     # Construct Discord Authorization URL
     params = {
         "response_type": "code",
@@ -32,7 +33,7 @@ def discord_login():
 
 
 @router.get("/callback")
-def discord_callback(db: Session = Depends(deps.get_db), code: str | None = None):
+async def discord_callback(db: DBSession = Depends(deps.get_db), code: str | None = None):
     if code is None:
         raise HTTPException(status_code=400, detail="No OAuth code provided")
 
@@ -47,9 +48,9 @@ def discord_callback(db: Session = Depends(deps.get_db), code: str | None = None
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-    # Exchange code for token using synchronous requests
-    token_response = requests.post(
-        f"{settings.DISCORD_API_URL}/oauth2/token", data=data, headers=headers
+    # Exchange code for token using synchronous requests (in the thread pool)
+    token_response = await run_in_threadpool(
+        requests.post, f"{settings.DISCORD_API_URL}/oauth2/token", data=data, headers=headers
     )
     if token_response.status_code != 200:
         error_detail = token_response.json()
@@ -63,8 +64,10 @@ def discord_callback(db: Session = Depends(deps.get_db), code: str | None = None
         raise HTTPException(status_code=400, detail="No access token was obtained")
 
     # Use access token to obtain user information
-    user_response = requests.get(
-        f"{settings.DISCORD_API_URL}/users/@me", headers={"Authorization": f"Bearer {access_token}"}
+    user_response = await run_in_threadpool(
+        requests.get,
+        f"{settings.DISCORD_API_URL}/users/@me",
+        headers={"Authorization": f"Bearer {access_token}"},
     )
     if user_response.status_code != 200:
         raise HTTPException(
@@ -84,7 +87,7 @@ def discord_callback(db: Session = Depends(deps.get_db), code: str | None = None
         raise HTTPException(status_code=422, detail=f"Invalid Discord user data: {str(e)}")
 
     # Check if user exists by discord_id
-    user_record = user.get_by_discord_id(db, discord_id=discord_id)
+    user_record = await db.run_sync(user.get_by_discord_id, discord_id=discord_id)
     if user_record:
         # If it exists, log in directly
         return JSONResponse(
@@ -116,18 +119,18 @@ def discord_callback(db: Session = Depends(deps.get_db), code: str | None = None
 
 @router.post("/register", response_model=UserCreateResponse)
 async def discord_register(
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     discord_user_in: DiscordUserCreateRequestBody = Body(...),
 ):
     """
     New user registration interface for processing password setting requests submitted by the front-end
     """
     # Check if the user already exists in the database (prevent repeated registrations)
-    if user.get_by_discord_id(db, discord_id=discord_user_in.discord_id):
+    if await db.run_sync(user.get_by_discord_id, discord_id=discord_user_in.discord_id):
         raise HTTPException(status_code=400, detail="The user with this Discord ID already exists")
 
     # Check if email already exists
-    if user.get_by_email(db, email=discord_user_in.email):
+    if await db.run_sync(user.get_by_email, email=discord_user_in.email):
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
@@ -141,7 +144,7 @@ async def discord_register(
     )
 
     # Try to create user
-    user_record = user.create_discord_user(db, obj_in=user_in)
+    user_record = await db.run_sync(user.create_discord_user, obj_in=user_in)
     if not user_record:
         raise HTTPException(
             status_code=400,
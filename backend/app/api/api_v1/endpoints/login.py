@@ -1,28 +1,36 @@
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core import security
 from app.core.config import settings
 from app.crud import user
+from app.database.session import DBSession
 from app.schemas.user import Token
 
 router = APIRouter()
 
 
 @router.post("/login/access-token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: DBSession = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Token:
     """
     username should be email of user
     OAuth2 compatible token login, get an access token for future requests
     """
-    user_record = user.authenticate(db, email=form_data.username, password=form_data.password)
-    if not user_record:
+    user_record = await db.run_sync(user.get_by_email, email=form_data.username)
+    # bcrypt is CPU-bound, so verify in the thread pool rather than on the event loop
+    if (
+        not user_record
+        or not user_record.hashed_password
+        or not await run_in_threadpool(
+            security.verify_password, form_data.password, user_record.hashed_password
+        )
+    ):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return Token(
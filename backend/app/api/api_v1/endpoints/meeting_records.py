@@ -1,9 +1,14 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from functools import partial
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.crud import meeting_record
+from app.crud import idempotency, meeting_record
+from app.database.session import DBSession
 from app.models.user import User
 from app.schemas.meeting_record import (
     MeetingRecordCreateRequestBody,
@@ -11,46 +16,76 @@ from app.schemas.meeting_record import (
     MeetingRecordResponse,
     MeetingRecordListResponse,
     MeetingRecordDetailResponse,
+    MeetingRecordSearchResponse,
 )
+from app.utils.byte_range import RangeNotSatisfiable, parse_byte_range
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import FastJSONResponse, encode_meeting_list_item
 
 router = APIRouter()
 
+# Transcripts are read from the database in pieces of this many characters while
+# streaming (at most 4 UTF-8 bytes each)
+TRANSCRIPT_CHUNK_SIZE = 16 * 1024
+
+
+def _create_meeting_record(db: Session, *, obj_in: MeetingRecordCreateRequestBody) -> dict[str, Any]:
+    """Create a meeting record, without committing, and return its response data as JSON"""
+    meeting_rec = meeting_record.create_meeting_record(db, obj_in=obj_in, commit=False)
+    # Reload with portfolio to get portfolio_name
+    meeting_rec = meeting_record.get_by_id(db, meeting_id=meeting_rec.meeting_id)
+
+    response_data = MeetingRecordResponse(**meeting_rec.__dict__)
+    response_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
+    return response_data.model_dump(mode="json")
+
 
 @router.post("/", response_model=MeetingRecordResponse)
-def create_meeting_record(
+async def create_meeting_record(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     meeting_in: MeetingRecordCreateRequestBody,
     current_user: User = Depends(deps.get_current_user),
+    idempotency_key: str | None = Header(None, max_length=255),
 ) -> MeetingRecordResponse:
     """
     Create new meeting record
+
+    A retry sent with the Idempotency-Key header of an earlier request returns that
+    request's response instead of creating a second record.
     """
-    meeting_rec = meeting_record.create_meeting_record(db, obj_in=meeting_in)
-    # Reload with portfolio to get portfolio_name
-    meeting_rec = meeting_record.get_by_id(db, meeting_id=meeting_rec.meeting_id)
-    
-    response_data = MeetingRecordResponse(**meeting_rec.__dict__)
-    response_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
-    return response_data
+    try:
+        response_data = await db.run_sync(
+            idempotency.run_once,
+            user_id=current_user.user_id,
+            scope="POST /meeting-records/",
+            key=idempotency_key,
+            request_hash=idempotency.request_hash(meeting_in),
+            create=partial(_create_meeting_record, obj_in=meeting_in),
+        )
+    except idempotency.IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except idempotency.IdempotencyKeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    return MeetingRecordResponse(**response_data)
 
 
 @router.get("/{meeting_id}", response_model=MeetingRecordDetailResponse)
-def read_meeting_record(
+async def read_meeting_record(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     meeting_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> MeetingRecordDetailResponse:
     """
     Get meeting record by ID with details (permission-filtered)
     """
-    meeting_rec = meeting_record.get_by_id_with_permissions(db, meeting_id=meeting_id, current_user=current_user)
+    meeting_rec = await db.run_sync(meeting_record.get_by_id_with_permissions, meeting_id=meeting_id, current_user=current_user)
     if not meeting_rec:
         raise HTTPException(status_code=404, detail="Meeting record not found")
 
     # Get related tasks count
-    related_tasks_count = meeting_record.get_related_tasks_count(db, meeting_id=meeting_id)
+    related_tasks_count = await db.run_sync(meeting_record.get_related_tasks_count, meeting_id=meeting_id)
 
     meeting_data = MeetingRecordDetailResponse(**meeting_rec.__dict__)
     meeting_data.related_tasks_count = related_tasks_count
@@ -58,9 +93,87 @@ def read_meeting_record(
     return meeting_data
 
 
+@router.get("/{meeting_id}/transcript")
+async def read_meeting_transcript(
+    *,
+    request: Request,
+    db: DBSession = Depends(deps.get_db),
+    meeting_id: int,
+    offset: int = Query(0, ge=0, description="Byte offset to start from (ignored if Range is sent)"),
+    length: int | None = Query(None, ge=1, description="Number of bytes to return"),
+    current_user: User = Depends(deps.get_current_user),
+) -> StreamingResponse:
+    """
+    Stream a meeting's transcript (auto caption) as UTF-8 text (permission-filtered)
+    Supports a single "Range: bytes=..." header, or offset/length query parameters
+    """
+    meeting_rec = await db.run_sync(
+        meeting_record.get_by_id_with_permissions,
+        meeting_id=meeting_id,
+        current_user=current_user,
+        include_transcript=False,
+    )
+    if not meeting_rec:
+        raise HTTPException(status_code=404, detail="Meeting record not found")
+
+    size = await db.run_sync(meeting_record.get_transcript_size, meeting_id=meeting_id)
+    if size is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    headers = {"Accept-Ranges": "bytes"}
+    status_code = 200
+    range_header = request.headers.get("range")
+    byte_range = None
+    if range_header:
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except RangeNotSatisfiable:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        start = min(offset, size)
+        end = min(start + length, size) - 1 if length else size - 1
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+
+    async def transcript_chunks():
+        # Read bounded pieces of text by character offset, keeping a running count of
+        # their UTF-8 bytes to cut out the requested byte range
+        char_offset = 0
+        byte_offset = 0  # UTF-8 bytes before char_offset
+        while byte_offset <= end:
+            text = await db.run_sync(
+                meeting_record.get_transcript_text,
+                meeting_id=meeting_id,
+                offset=char_offset,
+                length=TRANSCRIPT_CHUNK_SIZE,
+            )
+            if not text:
+                break
+            data = text.encode("utf-8")
+            chunk_start = byte_offset
+            char_offset += len(text)
+            byte_offset += len(data)
+            if byte_offset > start:
+                yield data[max(start - chunk_start, 0):end - chunk_start + 1]
+
+    return StreamingResponse(
+        transcript_chunks(),
+        status_code=status_code,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
+
+
 @router.get("/", response_model=list[MeetingRecordListResponse])
-def read_meeting_records(
-    db: Session = Depends(deps.get_db),
+async def read_meeting_records(
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int | None = Query(None, description="Filter by portfolio ID"),
     start_date: date | None = Query(None, description="Filter by start date"),
     end_date: date | None = Query(None, description="Filter by end date"),
@@ -68,39 +181,37 @@ def read_meeting_records(
     has_summary: bool | None = Query(None, description="Filter by summary availability"),
     skip: int = Query(0, ge=0, description="Skip items"),
     limit: int = Query(100, ge=1, le=1000, description="Limit items"),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor, overrides skip"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[MeetingRecordListResponse]:
+) -> FastJSONResponse:
     """
-    Get meeting records with optional filters (permission-filtered)
+    Get meeting records with optional filters (permission-filtered), newest first
     """
-    meetings = meeting_record.get_multi_with_permissions(
-        db,
-        current_user=current_user,
-        portfolio_id=portfolio_id,
-        start_date=start_date,
-        end_date=end_date,
-        has_recording=has_recording,
-        has_summary=has_summary,
-        skip=skip,
-        limit=limit,
-    )
-
-    # Add computed fields
-    result = []
-    for meeting_rec in meetings:
-        meeting_data = MeetingRecordListResponse(**meeting_rec.__dict__)
-        meeting_data.has_recording = bool(meeting_rec.recording_file_link)
-        meeting_data.has_summary = bool(meeting_rec.summary)
-        meeting_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
-        result.append(meeting_data)
-
-    return result
+    try:
+        meetings = await db.run_sync(
+            meeting_record.get_multi_with_permissions,
+            current_user=current_user,
+            portfolio_id=portfolio_id,
+            start_date=start_date,
+            end_date=end_date,
+            has_recording=has_recording,
+            has_summary=has_summary,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = FastJSONResponse([encode_meeting_list_item(meeting_rec) for meeting_rec in meetings])
+    set_next_cursor(response, meetings, meeting_record.MEETING_SORT_KEYS, limit)
+    return response
 
 
 @router.put("/{meeting_id}", response_model=MeetingRecordResponse)
-def update_meeting_record(
+async def update_meeting_record(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     meeting_id: int,
     meeting_in: MeetingRecordUpdate,
     current_user: User = Depends(deps.get_current_user),
@@ -108,13 +219,13 @@ def update_meeting_record(
     """
     Update meeting record (permission-checked)
     """
-    meeting_rec = meeting_record.get_by_id_with_permissions(db, meeting_id=meeting_id, current_user=current_user)
+    meeting_rec = await db.run_sync(meeting_record.get_by_id_with_permissions, meeting_id=meeting_id, current_user=current_user)
     if not meeting_rec:
         raise HTTPException(status_code=404, detail="Meeting record not found")
 
-    meeting_rec = meeting_record.update_meeting_record(db, db_obj=meeting_rec, obj_in=meeting_in)
+    meeting_rec = await db.run_sync(meeting_record.update_meeting_record, db_obj=meeting_rec, obj_in=meeting_in)
     # Reload with portfolio to ensure we have the latest data
-    meeting_rec = meeting_record.get_by_id(db, meeting_id=meeting_rec.meeting_id)
+    meeting_rec = await db.run_sync(meeting_record.get_by_id, meeting_id=meeting_rec.meeting_id)
     
     response_data = MeetingRecordResponse(**meeting_rec.__dict__)
     response_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
@@ -122,9 +233,9 @@ def update_meeting_record(
 
 
 @router.delete("/{meeting_id}")
-def delete_meeting_record(
+async def delete_meeting_record(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     meeting_id: int,
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -132,11 +243,16 @@ def delete_meeting_record(
     Delete meeting record (permission-checked)
     """
     # Check if user has permission to access this meeting first
-    meeting_rec = meeting_record.get_by_id_with_permissions(db, meeting_id=meeting_id, current_user=current_user)
+    meeting_rec = await db.run_sync(
+        meeting_record.get_by_id_with_permissions,
+        meeting_id=meeting_id,
+        current_user=current_user,
+        include_transcript=False,
+    )
     if not meeting_rec:
         raise HTTPException(status_code=404, detail="Meeting record not found")
 
-    success = meeting_record.delete_meeting_record(db, meeting_id=meeting_id)
+    success = await db.run_sync(meeting_record.delete_meeting_record, meeting_id=meeting_id)
     if not success:
         raise HTTPException(status_code=404, detail="Meeting record not found")
 
@@ -144,120 +260,92 @@ def delete_meeting_record(
 
 
 @router.get("/portfolio/{portfolio_id}", response_model=list[MeetingRecordListResponse])
-def read_meeting_records_by_portfolio(
+async def read_meeting_records_by_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(deps.get_current_user),
-) -> list[MeetingRecordListResponse]:
+) -> FastJSONResponse:
     """
     Get meeting records by portfolio ID (permission-filtered)
     """
-    meetings = meeting_record.get_multi_with_permissions(
-        db, 
+    meetings = await db.run_sync(
+        meeting_record.get_multi_with_permissions,
         current_user=current_user,
         portfolio_id=portfolio_id, 
         skip=skip, 
         limit=limit
     )
 
-    result = []
-    for meeting_rec in meetings:
-        meeting_data = MeetingRecordListResponse(**meeting_rec.__dict__)
-        meeting_data.has_recording = bool(meeting_rec.recording_file_link)
-        meeting_data.has_summary = bool(meeting_rec.summary)
-        meeting_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
-        result.append(meeting_data)
-
-    return result
+    return FastJSONResponse([encode_meeting_list_item(meeting_rec) for meeting_rec in meetings])
 
 
 @router.get("/with-recordings/", response_model=list[MeetingRecordListResponse])
-def read_meeting_records_with_recordings(
+async def read_meeting_records_with_recordings(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(deps.get_current_user),
-) -> list[MeetingRecordListResponse]:
+) -> FastJSONResponse:
     """
     Get meeting records that have recording files (permission-filtered)
     """
-    meetings = meeting_record.get_multi_with_permissions(
-        db, 
+    meetings = await db.run_sync(
+        meeting_record.get_multi_with_permissions,
         current_user=current_user,
         has_recording=True,
         skip=skip, 
         limit=limit
     )
 
-    result = []
-    for meeting_rec in meetings:
-        meeting_data = MeetingRecordListResponse(**meeting_rec.__dict__)
-        meeting_data.has_recording = True  # Always true for this endpoint
-        meeting_data.has_summary = bool(meeting_rec.summary)
-        meeting_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
-        result.append(meeting_data)
-
-    return result
+    return FastJSONResponse([encode_meeting_list_item(meeting_rec) for meeting_rec in meetings])
 
 
 @router.get("/with-summaries/", response_model=list[MeetingRecordListResponse])
-def read_meeting_records_with_summaries(
+async def read_meeting_records_with_summaries(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(deps.get_current_user),
-) -> list[MeetingRecordListResponse]:
+) -> FastJSONResponse:
     """
     Get meeting records that have summaries (permission-filtered)
     """
-    meetings = meeting_record.get_multi_with_permissions(
-        db, 
+    meetings = await db.run_sync(
+        meeting_record.get_multi_with_permissions,
         current_user=current_user,
         has_summary=True,
         skip=skip, 
         limit=limit
     )
 
-    result = []
-    for meeting_rec in meetings:
-        meeting_data = MeetingRecordListResponse(**meeting_rec.__dict__)
-        meeting_data.has_recording = bool(meeting_rec.recording_file_link)
-        meeting_data.has_summary = True  # Always true for this endpoint
-        meeting_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
-        result.append(meeting_data)
-
-    return result
+    return FastJSONResponse([encode_meeting_list_item(meeting_rec) for meeting_rec in meetings])
 
 
-@router.get("/search/", response_model=list[MeetingRecordListResponse])
-def search_meeting_records(
+@router.get("/search/", response_model=list[MeetingRecordSearchResponse])
+async def search_meeting_records(
     *,
-    db: Session = Depends(deps.get_db),
-    q: str = Query(..., min_length=1, description="Search term"),
+    db: DBSession = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=200, description="Search term"),
     portfolio_id: int | None = Query(None, description="Filter by portfolio ID"),
+    skip: int = Query(0, ge=0, description="Skip items"),
+    limit: int = Query(20, ge=1, le=100, description="Limit items"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[MeetingRecordListResponse]:
+) -> FastJSONResponse:
     """
-    Search meeting records by name, summary, or caption (permission-filtered)
+    Full-text search meeting records by name, summary, or caption (permission-filtered)
+    Ranked by relevance, with highlighted snippets instead of full transcripts
     """
-    meetings = meeting_record.search_meeting_records_with_permissions(
-        db, 
-        search_term=q, 
+    meetings = await db.run_sync(
+        meeting_record.search_meeting_records_with_permissions,
+        search_term=q,
         current_user=current_user,
-        portfolio_id=portfolio_id
+        portfolio_id=portfolio_id,
+        skip=skip,
+        limit=limit,
     )
-
-    result = []
-    for meeting_rec in meetings:
-        meeting_data = MeetingRecordListResponse(**meeting_rec.__dict__)
-        meeting_data.has_recording = bool(meeting_rec.recording_file_link)
-        meeting_data.has_summary = bool(meeting_rec.summary)
-        meeting_data.portfolio_name = meeting_rec.portfolio.name if meeting_rec.portfolio else None
-        result.append(meeting_data)
-
-    return result
+    return FastJSONResponse(meetings)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.database.pool import get_pool_stats
+from app.database.session import async_engine, engine
+from app.models.user import User
+from app.schemas.metrics import PoolStatsResponse
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=list[PoolStatsResponse])
+async def read_pool_metrics(
+    current_user: User = Depends(deps.get_current_admin),
+) -> list[PoolStatsResponse]:
+    """
+    Get connection pool usage and checkout metrics for each database engine (Admin only)
+    """
+    stats = [get_pool_stats("sync", engine.pool)]
+    if async_engine is not None:
+        stats.append(get_pool_stats("async", async_engine.pool))
+    return [PoolStatsResponse(**stat) for stat in stats]
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.config import settings
 from app.crud import portfolio
+from app.database.query_stats import query_budget
+from app.database.session import DBSession
 from app.models.user import User
 from app.schemas.portfolio import (
     PortfolioCreateRequestBody,
@@ -12,14 +14,15 @@ from app.schemas.portfolio import (
     PortfolioDetailResponse,
     PortfolioStatsResponse,
 )
+from app.utils.serialization import FastJSONResponse, encode_portfolio_list_item
 
 router = APIRouter()
 
 
 @router.post("/", response_model=PortfolioResponse)
-def create_portfolio(
+async def create_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_in: PortfolioCreateRequestBody,
     current_user: User = Depends(deps.get_current_admin),  # Only admin can create portfolios
 ) -> PortfolioResponse:
@@ -27,103 +30,102 @@ def create_portfolio(
     Create new portfolio (Admin only)
     """
     try:
-        portfolio_record = portfolio.create_portfolio(db, obj_in=portfolio_in)
+        portfolio_record = await db.run_sync(portfolio.create_portfolio, obj_in=portfolio_in)
         return PortfolioResponse(**portfolio_record.__dict__)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{portfolio_id}", response_model=PortfolioDetailResponse)
-def read_portfolio(
+async def read_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> PortfolioDetailResponse:
     """
     Get portfolio by ID with details and statistics
     """
-    portfolio_record = portfolio.get_by_id(db, portfolio_id=portfolio_id)
-    if not portfolio_record:
+    portfolio_detail = await db.run_sync(portfolio.get_detail, portfolio_id=portfolio_id)
+    if not portfolio_detail:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
-    # Get statistics for this portfolio
-    user_count = portfolio.get_user_count(db, portfolio_id=portfolio_id)
-    task_count = portfolio.get_task_count(db, portfolio_id=portfolio_id)
-    meeting_count = portfolio.get_meeting_count(db, portfolio_id=portfolio_id)
-    active_task_count = portfolio.get_active_task_count(db, portfolio_id=portfolio_id)
-
-    portfolio_data = PortfolioDetailResponse(**portfolio_record.__dict__)
-    portfolio_data.user_count = user_count
-    portfolio_data.task_count = task_count
-    portfolio_data.meeting_count = meeting_count
-    portfolio_data.active_task_count = active_task_count
-    return portfolio_data
+    return PortfolioDetailResponse(**portfolio_detail)
 
 
 @router.get("/", response_model=list[PortfolioListResponse])
-def read_portfolios(
-    db: Session = Depends(deps.get_db),
+async def read_portfolios(
+    db: DBSession = Depends(deps.get_db),
     skip: int = Query(0, ge=0, description="Skip items"),
     limit: int = Query(100, ge=1, le=1000, description="Limit items"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[PortfolioListResponse]:
+) -> FastJSONResponse:
     """
     Get portfolios list
     """
-    portfolios = portfolio.get_multi(db, skip=skip, limit=limit)
+    portfolios = await db.run_sync(portfolio.get_multi, skip=skip, limit=limit)
 
-    result = []
-    for portfolio_record in portfolios:
-        portfolio_data = PortfolioListResponse(**portfolio_record.__dict__)
-        portfolio_data.has_channel = bool(portfolio_record.channel_id)
-        result.append(portfolio_data)
-
-    return result
+    return FastJSONResponse(
+        [encode_portfolio_list_item(portfolio_record) for portfolio_record in portfolios]
+    )
 
 
 @router.get("/all/simple", response_model=list[PortfolioListResponse])
-def read_all_portfolios_simple(
-    db: Session = Depends(deps.get_db),
+async def read_all_portfolios_simple(
+    db: DBSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> list[PortfolioListResponse]:
+) -> FastJSONResponse:
     """
     Get all portfolios (for dropdown lists, no pagination)
     """
-    portfolios = portfolio.get_all(db)
+    portfolios = await db.run_sync(portfolio.get_all)
 
-    result = []
-    for portfolio_record in portfolios:
-        portfolio_data = PortfolioListResponse(**portfolio_record.__dict__)
-        portfolio_data.has_channel = bool(portfolio_record.channel_id)
-        result.append(portfolio_data)
-
-    return result
+    return FastJSONResponse(
+        [encode_portfolio_list_item(portfolio_record) for portfolio_record in portfolios]
+    )
 
 
 @router.get("/statistics/all", response_model=list[PortfolioStatsResponse])
-def read_all_portfolio_statistics(
-    db: Session = Depends(deps.get_db),
+@query_budget(2)
+async def read_all_portfolio_statistics(
+    db: DBSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> list[PortfolioStatsResponse]:
     """
     Get statistics for all portfolios
     """
-    stats = portfolio.get_all_portfolio_statistics(db)
+    stats = await db.run_sync(portfolio.get_all_portfolio_statistics)
     return [PortfolioStatsResponse(**stat) for stat in stats]
 
 
+@router.post("/statistics/refresh")
+async def refresh_portfolio_statistics(
+    db: DBSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_admin),  # Only admin can rebuild statistics
+):
+    """
+    Rebuild the materialized statistics of all portfolios (Admin only)
+    """
+    if not settings.PORTFOLIO_STATS_MATERIALIZED:
+        raise HTTPException(
+            status_code=400, detail="Materialized portfolio statistics are disabled"
+        )
+
+    refreshed = await db.run_sync(portfolio.refresh_statistics)
+    return {"message": "Portfolio statistics refreshed", "refreshed": refreshed}
+
+
 @router.get("/{portfolio_id}/statistics", response_model=PortfolioStatsResponse)
-def read_portfolio_statistics(
+async def read_portfolio_statistics(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> PortfolioStatsResponse:
     """
     Get detailed statistics for a specific portfolio
     """
-    stats = portfolio.get_portfolio_statistics(db, portfolio_id=portfolio_id)
+    stats = await db.run_sync(portfolio.get_portfolio_statistics, portfolio_id=portfolio_id)
     if not stats:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
@@ -131,9 +133,9 @@ def read_portfolio_statistics(
 
 
 @router.put("/{portfolio_id}", response_model=PortfolioResponse)
-def update_portfolio(
+async def update_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     portfolio_in: PortfolioUpdate,
     current_user: User = Depends(deps.get_current_admin),  # Only admin can update portfolios
@@ -141,13 +143,13 @@ def update_portfolio(
     """
     Update portfolio (Admin only)
     """
-    portfolio_record = portfolio.get_by_id(db, portfolio_id=portfolio_id)
+    portfolio_record = await db.run_sync(portfolio.get_by_id, portfolio_id=portfolio_id)
     if not portfolio_record:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
     try:
-        portfolio_record = portfolio.update_portfolio(
-            db, db_obj=portfolio_record, obj_in=portfolio_in
+        portfolio_record = await db.run_sync(
+            portfolio.update_portfolio, db_obj=portfolio_record, obj_in=portfolio_in
         )
         return PortfolioResponse(**portfolio_record.__dict__)
     except ValueError as e:
@@ -155,9 +157,9 @@ def update_portfolio(
 
 
 @router.delete("/{portfolio_id}")
-def delete_portfolio(
+async def delete_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     current_user: User = Depends(deps.get_current_admin),  # Only admin can delete portfolios
 ):
@@ -165,7 +167,7 @@ def delete_portfolio(
     Delete portfolio (Admin only)
     """
     try:
-        success = portfolio.delete_portfolio(db, portfolio_id=portfolio_id)
+        success = await db.run_sync(portfolio.delete_portfolio, portfolio_id=portfolio_id)
         if not success:
             raise HTTPException(status_code=404, detail="Portfolio not found")
 
@@ -175,119 +177,81 @@ def delete_portfolio(
 
 
 @router.get("/search/", response_model=list[PortfolioListResponse])
-def search_portfolios(
+async def search_portfolios(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     q: str = Query(..., min_length=1, description="Search term"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[PortfolioListResponse]:
+) -> FastJSONResponse:
     """
     Search portfolios by name or description
     """
-    portfolios = portfolio.search_portfolios(db, search_term=q)
+    portfolios = await db.run_sync(portfolio.search_portfolios, search_term=q)
 
-    result = []
-    for portfolio_record in portfolios:
-        portfolio_data = PortfolioListResponse(**portfolio_record.__dict__)
-        portfolio_data.has_channel = bool(portfolio_record.channel_id)
-        result.append(portfolio_data)
-
-    return result
+    return FastJSONResponse(
+        [encode_portfolio_list_item(portfolio_record) for portfolio_record in portfolios]
+    )
 
 
 @router.get("/name/{portfolio_name}", response_model=PortfolioDetailResponse)
-def read_portfolio_by_name(
+async def read_portfolio_by_name(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_name: str,
     current_user: User = Depends(deps.get_current_user),
 ) -> PortfolioDetailResponse:
     """
     Get portfolio by name with details
     """
-    portfolio_record = portfolio.get_by_name(db, name=portfolio_name)
-    if not portfolio_record:
+    portfolio_detail = await db.run_sync(portfolio.get_detail, name=portfolio_name)
+    if not portfolio_detail:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
-    # Get statistics for this portfolio
-    user_count = portfolio.get_user_count(db, portfolio_id=portfolio_record.portfolio_id)
-    task_count = portfolio.get_task_count(db, portfolio_id=portfolio_record.portfolio_id)
-    meeting_count = portfolio.get_meeting_count(db, portfolio_id=portfolio_record.portfolio_id)
-    active_task_count = portfolio.get_active_task_count(
-        db, portfolio_id=portfolio_record.portfolio_id
-    )
-
-    portfolio_data = PortfolioDetailResponse(**portfolio_record.__dict__)
-    portfolio_data.user_count = user_count
-    portfolio_data.task_count = task_count
-    portfolio_data.meeting_count = meeting_count
-    portfolio_data.active_task_count = active_task_count
-    return portfolio_data
+    return PortfolioDetailResponse(**portfolio_detail)
 
 
 @router.get("/channel/{channel_id}", response_model=PortfolioDetailResponse)
-def read_portfolio_by_channel(
+async def read_portfolio_by_channel(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     channel_id: str,
     current_user: User = Depends(deps.get_current_user),
 ) -> PortfolioDetailResponse:
     """
     Get portfolio by Discord channel ID with details
     """
-    portfolio_record = portfolio.get_by_channel_id(db, channel_id=channel_id)
-    if not portfolio_record:
+    portfolio_detail = await db.run_sync(portfolio.get_detail, channel_id=channel_id)
+    if not portfolio_detail:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
-    # Get statistics for this portfolio
-    user_count = portfolio.get_user_count(db, portfolio_id=portfolio_record.portfolio_id)
-    task_count = portfolio.get_task_count(db, portfolio_id=portfolio_record.portfolio_id)
-    meeting_count = portfolio.get_meeting_count(db, portfolio_id=portfolio_record.portfolio_id)
-    active_task_count = portfolio.get_active_task_count(
-        db, portfolio_id=portfolio_record.portfolio_id
-    )
-
-    portfolio_data = PortfolioDetailResponse(**portfolio_record.__dict__)
-    portfolio_data.user_count = user_count
-    portfolio_data.task_count = task_count
-    portfolio_data.meeting_count = meeting_count
-    portfolio_data.active_task_count = active_task_count
-    return portfolio_data
+    return PortfolioDetailResponse(**portfolio_detail)
 
 
 @router.get("/with-channels/", response_model=list[PortfolioListResponse])
-def read_portfolios_with_channels(
-    db: Session = Depends(deps.get_db),
+async def read_portfolios_with_channels(
+    db: DBSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> list[PortfolioListResponse]:
+) -> FastJSONResponse:
     """
     Get portfolios that have Discord channels assigned
     """
-    portfolios = portfolio.get_portfolios_with_channels(db)
-
-    result = []
-    for portfolio_record in portfolios:
-        portfolio_data = PortfolioListResponse(**portfolio_record.__dict__)
-        portfolio_data.has_channel = True  # Always true for this endpoint
-        result.append(portfolio_data)
+    portfolios = await db.run_sync(portfolio.get_portfolios_with_channels)
 
-    return result
+    return FastJSONResponse(
+        [encode_portfolio_list_item(portfolio_record) for portfolio_record in portfolios]
+    )
 
 
 @router.get("/without-channels/", response_model=list[PortfolioListResponse])
-def read_portfolios_without_channels(
-    db: Session = Depends(deps.get_db),
+async def read_portfolios_without_channels(
+    db: DBSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
-) -> list[PortfolioListResponse]:
+) -> FastJSONResponse:
     """
     Get portfolios that don't have Discord channels assigned
     """
-    portfolios = portfolio.get_portfolios_without_channels(db)
-
-    result = []
-    for portfolio_record in portfolios:
-        portfolio_data = PortfolioListResponse(**portfolio_record.__dict__)
-        portfolio_data.has_channel = False  # Always false for this endpoint
-        result.append(portfolio_data)
+    portfolios = await db.run_sync(portfolio.get_portfolios_without_channels)
 
-    return result
+    return FastJSONResponse(
+        [encode_portfolio_list_item(portfolio_record) for portfolio_record in portfolios]
+    )
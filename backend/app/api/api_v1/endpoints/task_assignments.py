@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.crud import task_assignment
+from app.crud import task, task_assignment
+from app.database.session import DBSession
 from app.models.user import User
 from app.schemas.task import TaskListResponse
 from app.schemas.task_assignment import (
     BulkTaskAssignmentCreate,
+    MultiTaskAssignmentCreate,
     TaskAssignmentCreateRequestBody,
     TaskAssignmentDetailResponse,
     TaskAssignmentResponse,
@@ -14,51 +15,82 @@ from app.schemas.task_assignment import (
     TaskUserAssignmentResponse,
     UpdateTaskUsersRequest,
 )
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 
 
 @router.post("/", response_model=TaskAssignmentResponse)
-def create_task_assignment(
+async def create_task_assignment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     assignment_in: TaskAssignmentCreateRequestBody,
     current_user: User = Depends(deps.get_current_user),
 ) -> TaskAssignmentResponse:
     """
     Create new task assignment
     """
-    assignment = task_assignment.create_task_assignment(db, obj_in=assignment_in)
+    try:
+        assignment = await db.run_sync(task_assignment.create_task_assignment, obj_in=assignment_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return TaskAssignmentResponse(**assignment.__dict__)
 
 
 @router.post("/bulk", response_model=list[TaskAssignmentResponse])
-def create_bulk_task_assignments(
+async def create_bulk_task_assignments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     bulk_assignment_in: BulkTaskAssignmentCreate,
     current_user: User = Depends(deps.get_current_user),
 ) -> list[TaskAssignmentResponse]:
     """
     Create multiple task assignments for a single task
     """
-    assignments = task_assignment.create_bulk_task_assignments(
-        db, task_id=bulk_assignment_in.task_id, user_ids=bulk_assignment_in.user_ids
-    )
+    try:
+        assignments = await db.run_sync(
+            task_assignment.create_bulk_task_assignments,
+            task_id=bulk_assignment_in.task_id,
+            user_ids=bulk_assignment_in.user_ids,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [TaskAssignmentResponse(**assignment.__dict__) for assignment in assignments]
+
+
+@router.post("/bulk/tasks", response_model=list[TaskAssignmentResponse])
+async def create_multi_task_assignments(
+    *,
+    db: DBSession = Depends(deps.get_db),
+    multi_assignment_in: MultiTaskAssignmentCreate,
+    current_user: User = Depends(deps.get_current_user),
+) -> list[TaskAssignmentResponse]:
+    """
+    Assign every user to every task; existing assignments are kept and returned
+    """
+    try:
+        assignments = await db.run_sync(
+            task_assignment.assign_users,
+            task_ids=multi_assignment_in.task_ids,
+            user_ids=multi_assignment_in.user_ids,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return [TaskAssignmentResponse(**assignment.__dict__) for assignment in assignments]
 
 
 @router.get("/{assignment_id}", response_model=TaskAssignmentDetailResponse)
-def read_task_assignment(
+async def read_task_assignment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     assignment_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> TaskAssignmentDetailResponse:
     """
     Get task assignment by ID with details
     """
-    assignment = task_assignment.get_by_id(db, assignment_id=assignment_id)
+    assignment = await db.run_sync(task_assignment.get_by_id, assignment_id=assignment_id)
     if not assignment:
         raise HTTPException(status_code=404, detail="Task assignment not found")
 
@@ -66,8 +98,8 @@ def read_task_assignment(
 
 
 @router.get("/", response_model=list[TaskAssignmentResponse])
-def read_task_assignments(
-    db: Session = Depends(deps.get_db),
+async def read_task_assignments(
+    db: DBSession = Depends(deps.get_db),
     task_id: int | None = Query(None, description="Filter by task ID"),
     user_id: int | None = Query(None, description="Filter by user ID"),
     skip: int = Query(0, ge=0, description="Skip items"),
@@ -77,16 +109,16 @@ def read_task_assignments(
     """
     Get task assignments with optional filters
     """
-    assignments = task_assignment.get_multi(
-        db, task_id=task_id, user_id=user_id, skip=skip, limit=limit
+    assignments = await db.run_sync(
+        task_assignment.get_multi, task_id=task_id, user_id=user_id, skip=skip, limit=limit
     )
     return [TaskAssignmentResponse(**assignment.__dict__) for assignment in assignments]
 
 
 @router.put("/{assignment_id}", response_model=TaskAssignmentResponse)
-def update_task_assignment(
+async def update_task_assignment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     assignment_id: int,
     assignment_in: TaskAssignmentUpdate,
     current_user: User = Depends(deps.get_current_user),
@@ -94,25 +126,27 @@ def update_task_assignment(
     """
     Update task assignment
     """
-    assignment = task_assignment.get_by_id(db, assignment_id=assignment_id)
+    assignment = await db.run_sync(task_assignment.get_by_id, assignment_id=assignment_id)
     if not assignment:
         raise HTTPException(status_code=404, detail="Task assignment not found")
 
-    assignment = task_assignment.update_task_assignment(db, db_obj=assignment, obj_in=assignment_in)
+    assignment = await db.run_sync(
+        task_assignment.update_task_assignment, db_obj=assignment, obj_in=assignment_in
+    )
     return TaskAssignmentResponse(**assignment.__dict__)
 
 
 @router.delete("/{assignment_id}")
-def delete_task_assignment(
+async def delete_task_assignment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     assignment_id: int,
     current_user: User = Depends(deps.get_current_user),
 ):
     """
     Delete task assignment
     """
-    success = task_assignment.delete_task_assignment(db, assignment_id=assignment_id)
+    success = await db.run_sync(task_assignment.delete_task_assignment, assignment_id=assignment_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task assignment not found")
 
@@ -120,102 +154,125 @@ def delete_task_assignment(
 
 
 @router.get("/user/me/tasks", response_model=list[TaskListResponse])
-def read_my_assigned_tasks(
+async def read_my_assigned_tasks(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor, overrides skip"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get tasks assigned to current user with details
     """
-    task_details = task_assignment.get_user_assigned_tasks(
-        db, user_id=current_user.user_id, skip=skip, limit=limit
-    )
-    return [TaskListResponse(**task_detail) for task_detail in task_details]
+    try:
+        task_details = await db.run_sync(
+            task_assignment.get_user_assigned_tasks,
+            user_id=current_user.user_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = FastJSONResponse(task_details)
+    set_next_cursor(response, task_details, task.TASK_SORT_KEYS, limit)
+    return response
 
 
 @router.get("/task/{task_id}/users", response_model=list[TaskUserAssignmentResponse])
-def read_task_assigned_users(
+async def read_task_assigned_users(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> list[TaskUserAssignmentResponse]:
     """
     Get users assigned to a specific task with details
     """
-    user_details = task_assignment.get_task_user_details(db, task_id=task_id)
+    user_details = await db.run_sync(task_assignment.get_task_user_details, task_id=task_id)
     return [TaskUserAssignmentResponse(**user_detail) for user_detail in user_details]
 
 
 @router.put("/task/{task_id}/users", response_model=list[TaskUserAssignmentResponse])
-def update_task_users(
+async def update_task_users(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     request: UpdateTaskUsersRequest,
 ) -> list[TaskUserAssignmentResponse]:
     """
     Update users assigned to a specific task
     """
-    user_details = task_assignment.update_task_users_smart(
-        db, task_id=task_id, user_ids=request.user_ids
-    )
+    try:
+        user_details = await db.run_sync(
+            task_assignment.update_task_users_smart, task_id=task_id, user_ids=request.user_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return [TaskUserAssignmentResponse(**user_detail) for user_detail in user_details]
 
 
 @router.get("/user/{user_id}/tasks", response_model=list[TaskListResponse])
-def read_user_assigned_tasks(
+async def read_user_assigned_tasks(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     user_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor, overrides skip"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get tasks assigned to a specific user with details
     """
-    task_details = task_assignment.get_user_assigned_tasks(
-        db, user_id=user_id, skip=skip, limit=limit
-    )
-    return [TaskListResponse(**task_detail) for task_detail in task_details]
+    try:
+        task_details = await db.run_sync(
+            task_assignment.get_user_assigned_tasks,
+            user_id=user_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = FastJSONResponse(task_details)
+    set_next_cursor(response, task_details, task.TASK_SORT_KEYS, limit)
+    return response
 
 
 @router.delete("/task/{task_id}/all")
-def delete_all_task_assignments(
+async def delete_all_task_assignments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     current_user: User = Depends(deps.get_current_user),
 ):
     """
     Delete all assignments for a specific task
     """
-    count = task_assignment.delete_all_task_assignments(db, task_id=task_id)
+    count = await db.run_sync(task_assignment.delete_all_task_assignments, task_id=task_id)
     return {"message": f"Deleted {count} task assignments"}
 
 
 @router.delete("/user/{user_id}/all")
-def delete_all_user_assignments(
+async def delete_all_user_assignments(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     user_id: int,
     current_user: User = Depends(deps.get_current_user),
 ):
     """
     Delete all assignments for a specific user
     """
-    count = task_assignment.delete_all_user_assignments(db, user_id=user_id)
+    count = await db.run_sync(task_assignment.delete_all_user_assignments, user_id=user_id)
     return {"message": f"Deleted {count} user assignments"}
 
 
 @router.delete("/task/{task_id}/user/{user_id}")
-def delete_task_assignment_by_task_and_user(
+async def delete_task_assignment_by_task_and_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     user_id: int,
     current_user: User = Depends(deps.get_current_user),
@@ -223,7 +280,9 @@ def delete_task_assignment_by_task_and_user(
     """
     Delete task assignment by task ID and user ID
     """
-    success = task_assignment.delete_by_task_and_user(db, task_id=task_id, user_id=user_id)
+    success = await db.run_sync(
+        task_assignment.delete_by_task_and_user, task_id=task_id, user_id=user_id
+    )
     if not success:
         raise HTTPException(status_code=404, detail="Task assignment not found")
 
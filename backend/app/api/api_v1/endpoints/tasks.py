@@ -1,124 +1,222 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import datetime
+from functools import partial
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 
 from app.api import deps
-from app.crud import task
+from app.crud import idempotency, task, task_closure
+from app.database.query_stats import query_budget
+from app.database.session import DBSession
 from app.models.user import User
 from app.schemas.task import (
+    DueRemindersResponse,
+    DueWindow,
+    TaskBatchUpdateRequest,
     TaskCreatedByResponse,
     TaskCreateRequestBody,
     TaskDetailResponse,
     TaskGroupCreateRequest,
     TaskGroupCreateResponse,
     TaskListResponse,
+    TaskProgressResponse,
     TaskReminderResponse,
     TaskResponse,
+    TaskSearchResponse,
+    TaskTreeFormat,
+    TaskTreeNodeResponse,
+    TaskTreeResponse,
     TaskUpdate,
-    TomorrowRemindersResponse,
 )
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import FastJSONResponse
+from app.utils.timezone import tz
 
 router = APIRouter()
 
 
 @router.post("/", response_model=TaskResponse)
-def create_task(
+async def create_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_in: TaskCreateRequestBody,
     current_user: User = Depends(deps.get_current_user),
 ) -> TaskResponse:
     """
     Create new task
     """
-    task_record = task.create_task(db, obj_in=task_in, created_by=current_user.user_id)
+    task_record = await db.run_sync(
+        task.create_task, obj_in=task_in, created_by=current_user.user_id
+    )
     return task_record
 
 
 @router.get("/", response_model=list[TaskListResponse])
-def read_tasks(
-    db: Session = Depends(deps.get_db),
+async def read_tasks(
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int | None = Query(None, description="Filter by portfolio ID"),
     status: str | None = Query(None, description="Filter by status"),
     priority: str | None = Query(None, description="Filter by priority"),
     skip: int = Query(0, ge=0, description="Skip items"),
     limit: int = Query(100, ge=1, le=1000, description="Limit items"),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor, overrides skip"),
     current_user: User = Depends(deps.get_current_user),
     include_subtasks: bool = Query(True, description="Include subtasks in response"),
-) -> list[TaskListResponse]:
-    """
-    Get tasks with optional filters
-    """
-    tasks_data = task.get_multi(
-        db,
-        portfolio_id=portfolio_id,
-        status=status,
-        priority=priority,
-        skip=skip,
-        limit=limit,
-        include_subtasks=include_subtasks,
-    )
-    return [TaskListResponse(**task_data) for task_data in tasks_data]
+) -> FastJSONResponse:
+    """
+    Get tasks with optional filters, ordered by deadline
+    """
+    try:
+        tasks_data = await db.run_sync(
+            task.get_multi,
+            portfolio_id=portfolio_id,
+            status=status,
+            priority=priority,
+            skip=skip,
+            limit=limit,
+            include_subtasks=include_subtasks,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = FastJSONResponse(tasks_data)
+    set_next_cursor(response, tasks_data, task.TASK_SORT_KEYS, limit)
+    return response
 
 
 @router.get("/created-by/{user_id}", response_model=list[TaskListResponse])
-def read_tasks_created_by(
+async def read_tasks_created_by(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     user_id: int,
     skip: int = Query(0, ge=0, description="Skip items"),
     limit: int = Query(100, ge=1, le=1000, description="Limit items"),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor, overrides skip"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get tasks created by a specific user
     """
-    tasks = task.get_by_created_by(db, user_id=user_id, skip=skip, limit=limit)
-    return [TaskListResponse(**task_data) for task_data in tasks]
+    try:
+        tasks = await db.run_sync(
+            task.get_by_created_by, user_id=user_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = FastJSONResponse(tasks)
+    set_next_cursor(response, tasks, task.TASK_SORT_KEYS, limit)
+    return response
 
 
 @router.get("/{task_id}/created-by", response_model=TaskCreatedByResponse)
-def read_task_created_by(
+async def read_task_created_by(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> TaskCreatedByResponse:
     """
     Get the user who created the task
     """
-    task_record = task.get_by_id(db, task_id=task_id)
-    if not task_record:
+    created_by_user = await db.run_sync(task.get_created_by_user, task_id=task_id)
+    if not created_by_user:
         raise HTTPException(status_code=404, detail="Task not found")
-    return TaskCreatedByResponse(**task_record.created_by_user.__dict__)
+    return TaskCreatedByResponse(**created_by_user.__dict__)
 
 
 @router.get("/{task_id}", response_model=TaskDetailResponse)
-def read_task(
+@query_budget(3)
+async def read_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> TaskDetailResponse:
     """
     Get task by ID with details
     """
-    task_record = task.get_by_id(db, task_id=task_id)
+    task_detail = await db.run_sync(task.get_detail, task_id=task_id)
+    if not task_detail:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return TaskDetailResponse(**task_detail)
+
+
+@router.get("/{task_id}/tree", response_model=TaskTreeResponse)
+@query_budget(3)
+async def read_task_tree(
+    *,
+    db: DBSession = Depends(deps.get_db),
+    task_id: int,
+    depth: int = Query(
+        task.MAX_TREE_DEPTH,
+        ge=0,
+        le=task.MAX_TREE_DEPTH,
+        description="Levels of descendants to load below the task",
+    ),
+    format: TaskTreeFormat = Query(TaskTreeFormat.NESTED, description="Output layout"),
+    current_user: User = Depends(deps.get_current_user),
+) -> TaskTreeResponse:
+    """
+    Get a task with its whole subtree of subtasks
+    """
+    nodes = await db.run_sync(task.get_task_tree, task_id=task_id, max_depth=depth)
+    if not nodes:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if format == TaskTreeFormat.FLAT:
+        tasks = [TaskTreeNodeResponse(**{**node, "subtasks": None}) for node in nodes]
+    else:
+        tasks = [TaskTreeNodeResponse(**nodes[0])]
+
+    return TaskTreeResponse(
+        root_task_id=task_id,
+        format=format,
+        max_depth=depth,
+        total_count=len(nodes),
+        tasks=tasks,
+    )
+
+
+@router.get("/{task_id}/progress", response_model=TaskProgressResponse)
+@query_budget(3)
+async def read_task_progress(
+    *,
+    db: DBSession = Depends(deps.get_db),
+    task_id: int,
+    current_user: User = Depends(deps.get_current_user),
+) -> TaskProgressResponse:
+    """
+    Get completion progress of all subtasks below a task
+    """
+    task_record = await db.run_sync(task.get_by_id, task_id=task_id)
     if not task_record:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    # Get subtasks if any
-    subtasks = task.get_subtasks(db, parent_task_id=task_id)
-    subtasks_data = [TaskListResponse(**subtask_data) for subtask_data in subtasks]
+    progress = await db.run_sync(task_closure.get_subtree_progress, task_ids=[task_id])
+    return TaskProgressResponse(**progress[task_id])
 
-    task_data = TaskDetailResponse(**task_record.__dict__)
-    task_data.subtasks = subtasks_data
-    return task_data
+
+@router.patch("/batch", response_model=list[TaskListResponse])
+async def update_tasks_batch(
+    *,
+    db: DBSession = Depends(deps.get_db),
+    batch_in: TaskBatchUpdateRequest,
+    current_user: User = Depends(deps.get_current_user),
+) -> FastJSONResponse:
+    """
+    Update status, priority or deadline of many tasks in one transaction
+    """
+    try:
+        tasks = await db.run_sync(task.update_tasks_batch, updates=batch_in.updates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(tasks)
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     task_in: TaskUpdate,
     current_user: User = Depends(deps.get_current_user),
@@ -126,143 +224,207 @@ def update_task(
     """
     Update task
     """
-    task_obj = task.get_by_id(db, task_id=task_id)
+    task_obj = await db.run_sync(task.get_by_id, task_id=task_id)
     if not task_obj:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return task.update_task(db, db_obj=task_obj, obj_in=task_in)
+    try:
+        return await db.run_sync(task.update_task, db_obj=task_obj, obj_in=task_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_id: int,
     current_user: User = Depends(deps.get_current_user),
 ):
     """
-    Delete task
+    Delete task with all of its subtasks and assignments
     """
-    success = task.delete_task(db, task_id=task_id)
-    if not success:
+    count = await db.run_sync(task.delete_task, task_id=task_id)
+    if not count:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return {"message": "Task deleted successfully"}
+    return {"message": "Task deleted successfully", "deleted_count": count}
 
 
 @router.get("/portfolio/{portfolio_id}", response_model=list[TaskListResponse])
-def read_tasks_by_portfolio(
+async def read_tasks_by_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor, overrides skip"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get tasks by portfolio ID
     """
-    tasks = task.get_by_portfolio(db, portfolio_id=portfolio_id, skip=skip, limit=limit)
-    return [TaskListResponse(**task_data) for task_data in tasks]
+    try:
+        tasks = await db.run_sync(
+            task.get_by_portfolio,
+            portfolio_id=portfolio_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = FastJSONResponse(tasks)
+    set_next_cursor(response, tasks, task.TASK_SORT_KEYS, limit)
+    return response
 
 
 @router.get("/subtasks/{parent_task_id}", response_model=list[TaskListResponse])
-def read_subtasks(
+async def read_subtasks(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     parent_task_id: int,
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get subtasks of a parent task
     """
-    subtasks = task.get_subtasks(db, parent_task_id=parent_task_id)
-    return [TaskListResponse(**subtask_data) for subtask_data in subtasks]
+    subtasks = await db.run_sync(task.get_subtasks, parent_task_id=parent_task_id)
+    return FastJSONResponse(subtasks)
 
 
 @router.get("/meeting/{meeting_id}", response_model=list[TaskListResponse])
-def read_tasks_by_meeting(
+async def read_tasks_by_meeting(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     meeting_id: int,
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get tasks created from a specific meeting
     """
-    tasks = task.get_by_meeting(db, meeting_id=meeting_id)
-    return [TaskListResponse(**task_data) for task_data in tasks]
+    tasks = await db.run_sync(task.get_by_meeting, meeting_id=meeting_id)
+    return FastJSONResponse(tasks)
 
 
 @router.get("/meeting/{meeting_id}/pending", response_model=list[TaskListResponse])
-def get_pending_tasks_by_meeting(
+async def get_pending_tasks_by_meeting(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     meeting_id: int,
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
     Get pending tasks created from a specific meeting
     """
-    tasks = task.get_pending_tasks_by_meeting(db, meeting_id=meeting_id)
-    return [TaskListResponse(**task_data) for task_data in tasks]
+    tasks = await db.run_sync(task.get_pending_tasks_by_meeting, meeting_id=meeting_id)
+    return FastJSONResponse(tasks)
 
 
-@router.get("/search/", response_model=list[TaskListResponse])
-def search_tasks(
+@router.delete("/meeting/{meeting_id}/pending")
+async def delete_pending_tasks_by_meeting(
     *,
-    db: Session = Depends(deps.get_db),
-    q: str = Query(..., min_length=1, description="Search term"),
+    db: DBSession = Depends(deps.get_db),
+    meeting_id: int,
+    task_ids: list[int] | None = Query(None, description="Pending tasks to delete, default all"),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Delete rejected pending tasks created from a meeting, with their subtasks
+    """
+    try:
+        count = await db.run_sync(
+            task.delete_pending_tasks_by_meeting, meeting_id=meeting_id, task_ids=task_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": f"Deleted {count} pending tasks", "deleted_count": count}
+
+
+@router.get("/search/", response_model=list[TaskSearchResponse])
+async def search_tasks(
+    *,
+    db: DBSession = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=200, description="Search term"),
     portfolio_id: int | None = Query(None, description="Filter by portfolio ID"),
+    skip: int = Query(0, ge=0, description="Skip items"),
+    limit: int = Query(20, ge=1, le=100, description="Limit items"),
     current_user: User = Depends(deps.get_current_user),
-) -> list[TaskListResponse]:
+) -> FastJSONResponse:
     """
-    Search tasks by title or description
+    Full-text search tasks by title or description, ranked by relevance
+    Matched terms are wrapped in <mark> tags in title_highlight and description_highlight
     """
-    tasks = task.search_tasks(db, search_term=q, portfolio_id=portfolio_id)
-    return [TaskListResponse(**task_data) for task_data in tasks]
+    tasks = await db.run_sync(
+        task.search_tasks, search_term=q, portfolio_id=portfolio_id, skip=skip, limit=limit
+    )
+    return FastJSONResponse(tasks)
 
 
-@router.get("/reminders/tomorrow", response_model=TomorrowRemindersResponse)
-def get_tomorrow_reminders(
+@router.get("/reminders/", response_model=DueRemindersResponse)
+@query_budget(3)
+async def get_due_reminders(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
+    start: datetime | None = Query(None, description="Window start, omit for no lower bound"),
+    end: datetime = Query(..., description="Window end (exclusive)"),
     portfolio_id: int | None = Query(None, description="Filter by portfolio ID"),
     current_user: User = Depends(deps.get_current_user),
-) -> TomorrowRemindersResponse:
+) -> DueRemindersResponse:
     """
-    Get tasks due tomorrow and not completed (Sydney timezone)
-    Returns tasks with status 'Not Started' or 'In Progress' that are due tomorrow
-    Includes portfolio channel and assigned users with their Discord IDs
+    Get tasks due in an arbitrary window and not completed
+    Times without timezone info are taken in the project timezone
     """
-    tasks_data = task.get_tomorrow_reminders(db, portfolio_id=portfolio_id)
-
-    # Convert to response model with portfolio and user info
-    task_reminders = []
-    for task_data in tasks_data:
-        reminder = TaskReminderResponse(
-            task_id=task_data["task_id"],
-            title=task_data["title"],
-            description=task_data["description"],
-            deadline=task_data["deadline"],
-            priority=task_data["priority"],
-            status=task_data["status"],
-            portfolio_id=task_data["portfolio_id"],
-            portfolio_name=task_data["portfolio_name"],
-            portfolio_channel=task_data["portfolio_channel"],
-            assigned_users=task_data["assigned_users"],
-        )
-        task_reminders.append(reminder)
+    start_utc = tz.to_utc(start) if start else None
+    end_utc = tz.to_utc(end)
+    if start_utc and start_utc >= end_utc:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    tasks_data = await db.run_sync(
+        task.get_due_reminders, start=start_utc, end=end_utc, portfolio_id=portfolio_id
+    )
+    return DueRemindersResponse(
+        tasks=[TaskReminderResponse(**task_data) for task_data in tasks_data],
+        total_count=len(tasks_data),
+        window_start=start_utc,
+        window_end=end_utc,
+    )
+
 
-    return TomorrowRemindersResponse(tasks=task_reminders, total_count=len(task_reminders))
+@router.get("/reminders/{window}", response_model=DueRemindersResponse)
+@query_budget(3)
+async def get_window_reminders(
+    *,
+    db: DBSession = Depends(deps.get_db),
+    window: DueWindow,
+    portfolio_id: int | None = Query(None, description="Filter by portfolio ID"),
+    current_user: User = Depends(deps.get_current_user),
+) -> DueRemindersResponse:
+    """
+    Get tasks in a named due window (overdue, today, tomorrow, next_7_days) and not completed
+    Windows are evaluated in the project timezone (Sydney)
+    Returns tasks with status 'Not Started' or 'In Progress'
+    Includes portfolio channel and assigned users with their Discord IDs
+    """
+    start, end = task.get_due_window(window)
+    tasks_data = await db.run_sync(
+        task.get_due_reminders, start=start, end=end, portfolio_id=portfolio_id
+    )
+    return DueRemindersResponse(
+        tasks=[TaskReminderResponse(**task_data) for task_data in tasks_data],
+        total_count=len(tasks_data),
+        window_start=start,
+        window_end=end,
+    )
 
 
 @router.post("/group", response_model=TaskGroupCreateResponse)
-def create_task_group(
+async def create_task_group(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     task_group_in: TaskGroupCreateRequest,
     current_user: User = Depends(deps.get_current_user),
+    idempotency_key: str | None = Header(None, max_length=255),
 ) -> TaskGroupCreateResponse:
     """
     Create a group of related tasks with hierarchical structure
@@ -270,9 +432,13 @@ def create_task_group(
     This endpoint allows creating multiple tasks at once with parent-child relationships.
     Each task can have subtasks, and subtasks can have their own subtasks (nested structure).
 
+    A retry sent with the Idempotency-Key header of an earlier request returns that
+    request's response instead of creating the tasks a second time.
+
     Args:
         task_group_in: Request body containing list of tasks and metadata
         current_user: Current authenticated user
+        idempotency_key: Optional Idempotency-Key header
 
     Returns:
         Response with created task IDs and summary
@@ -282,19 +448,30 @@ def create_task_group(
         tasks_data = [task_item.model_dump() for task_item in task_group_in.tasks]
 
         # Create the task group
-        created_task_ids = task.create_task_group(
-            db,
-            tasks_data=tasks_data,
-            portfolio_id=task_group_in.portfolio_id,
-            source_meeting_id=task_group_in.source_meeting_id,
-            created_by=current_user.user_id,
+        result = await db.run_sync(
+            idempotency.run_once,
+            user_id=current_user.user_id,
+            scope="POST /tasks/group",
+            key=idempotency_key,
+            request_hash=idempotency.request_hash(task_group_in),
+            create=partial(
+                task.create_task_group,
+                tasks_data=tasks_data,
+                portfolio_id=task_group_in.portfolio_id,
+                source_meeting_id=task_group_in.source_meeting_id,
+                created_by=current_user.user_id,
+                commit=False,
+            ),
         )
 
-        return TaskGroupCreateResponse(
-            created_task_ids=created_task_ids,
-            total_created=len(created_task_ids),
-            message=f"Successfully created {len(created_task_ids)} tasks",
-        )
+        message = f"Successfully created {result['total_created']} tasks"
+        if result["errors"]:
+            message += f", {len(result['errors'])} skipped due to validation errors"
+        return TaskGroupCreateResponse(**result, message=message)
 
+    except idempotency.IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except idempotency.IdempotencyKeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create task group: {str(e)}")
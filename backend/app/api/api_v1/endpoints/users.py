@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.crud import user
+from app.database.session import DBSession
 from app.models.user import User
 from app.schemas.user import UserCreateRequestBody, UserCreateResponse, UserListResponse, UserAdminUpdate, UserSelfUpdate
 
@@ -10,23 +10,23 @@ router = APIRouter()
 
 
 @router.post("/", response_model=UserCreateResponse)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     user_in: UserCreateRequestBody,
 ) -> UserCreateResponse:
     """
     Create new user
     """
     # Check if email already exists
-    user_record = user.get_by_email(db, email=user_in.email)
+    user_record = await db.run_sync(user.get_by_email, email=user_in.email)
     if user_record:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
 
-    user_record = user.create_user(db, obj_in=user_in)
+    user_record = await db.run_sync(user.create_user, obj_in=user_in)
     user_response = UserCreateResponse(
         user_id=user_record.user_id,
         email=user_record.email,
@@ -37,14 +37,14 @@ def create_user(
 
 
 @router.get("/me", response_model=UserListResponse)
-def read_user_me(
-    db: Session = Depends(deps.get_db),
+async def read_user_me(
+    db: DBSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> UserListResponse:
     """
     Get current user
     """
-    user_record = user.get_by_id(db, id=current_user.user_id)
+    user_record = await db.run_sync(user.get_by_id, id=current_user.user_id)
     if not user_record:
         raise HTTPException(status_code=404, detail="User not found")
     if user_record.discord_id:
@@ -68,9 +68,9 @@ def read_user_me(
 
 
 @router.put("/me", response_model=UserListResponse)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     user_in: UserSelfUpdate,
     current_user: User = Depends(deps.get_current_user),
 ) -> UserListResponse:
@@ -80,7 +80,7 @@ def update_user_me(
     Business rule: portfolio_id can only be modified once.
     If the user already has a portfolio_id set, it cannot be changed.
     """
-    user_record = user.update_user_self(db, db_obj=current_user, obj_in=user_in)
+    user_record = await db.run_sync(user.update_user_self, db_obj=current_user, obj_in=user_in)
     return UserListResponse(
         user_id=user_record.user_id,
         email=user_record.email,
@@ -92,23 +92,23 @@ def update_user_me(
 
 
 @router.get("/portfolio/{portfolio_id}", response_model=list[UserListResponse])
-def get_users_by_portfolio(
+async def get_users_by_portfolio(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     portfolio_id: int,
     current_user: User = Depends(deps.get_current_user),
 ) -> list[UserListResponse]:
     """
     Get all users belonging to a specific portfolio
     """
-    users = user.get_users_by_portfolio(db, portfolio_id=portfolio_id)
+    users = await db.run_sync(user.get_users_by_portfolio, portfolio_id=portfolio_id)
     return [UserListResponse(**user_record.__dict__) for user_record in users]
 
 
 @router.get("/search", response_model=list[UserListResponse])
-def search_users(
+async def search_users(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     q: str = Query(..., min_length=1, description="Search term for username or email"),
     limit: int = Query(10, ge=1, le=100, description="Limit number of results"),
     current_user: User = Depends(deps.get_current_user),
@@ -116,14 +116,14 @@ def search_users(
     """
     Search users by username or email with fuzzy matching
     """
-    users = user.search_users(db, search_term=q, limit=limit)
+    users = await db.run_sync(user.search_users, search_term=q, limit=limit)
     return [UserListResponse(**user_record.__dict__) for user_record in users]
 
 
 @router.get("/", response_model=list[UserListResponse])
-def get_all_users(
+async def get_all_users(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     skip: int = Query(0, ge=0, description="Skip items"),
     limit: int = Query(100, ge=1, le=1000, description="Limit items"),
     current_admin: User = Depends(deps.get_current_admin),
@@ -131,14 +131,14 @@ def get_all_users(
     """
     Get all users (Admin only)
     """
-    users = user.get_all_users(db, skip=skip, limit=limit)
+    users = await db.run_sync(user.get_all_users, skip=skip, limit=limit)
     return [UserListResponse(**user_record.__dict__) for user_record in users]
 
 
 @router.put("/{user_id}", response_model=UserListResponse)
-def update_user_admin(
+async def update_user_admin(
     *,
-    db: Session = Depends(deps.get_db),
+    db: DBSession = Depends(deps.get_db),
     user_id: int,
     user_in: UserAdminUpdate,
     current_admin: User = Depends(deps.get_current_admin),
@@ -146,9 +146,9 @@ def update_user_admin(
     """
     Update user's role and portfolio (Admin only)
     """
-    user_record = user.get_by_id(db, id=user_id)
+    user_record = await db.run_sync(user.get_by_id, id=user_id)
     if not user_record:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_record = user.update_user(db, db_obj=user_record, obj_in=user_in)
+    user_record = await db.run_sync(user.update_user, db_obj=user_record, obj_in=user_in)
     return UserListResponse(**user_record.__dict__)
@@ -1,29 +1,32 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.crud import user
-from app.database.session import SessionLocal
+from app.database.session import DBSession
 from app.models.user import User
 from app.schemas.user import TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/access-token")
 
 
-def get_db() -> Generator:
+async def get_db(request: Request) -> AsyncGenerator[DBSession, None]:
+    db = DBSession()
+    # Kept on the request so the per-request DB time can be reported
+    request.state.db = db
     try:
-        db = SessionLocal()
         yield db
     finally:
-        db.close()
+        await db.close()
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)) -> User:
+async def get_current_user(
+    db: DBSession = Depends(get_db), token: str = Depends(reusable_oauth2)
+) -> User:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         token_data = TokenPayload(**payload)
@@ -37,13 +40,13 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(reusabl
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid token payload",
         )
-    user_record = user.get_by_id(db, id=token_data.sub)
+    user_record = await db.run_sync(user.get_principal, id=token_data.sub)
     if not user_record:
         raise HTTPException(status_code=404, detail="User not found")
     return user_record
 
 
-def get_current_admin(
+async def get_current_admin(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if current_user.role_id != 2:
@@ -51,7 +54,7 @@ def get_current_admin(
     return current_user
 
 
-def get_current_director(
+async def get_current_director(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if current_user.role_id != 3:
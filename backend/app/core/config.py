@@ -13,10 +13,17 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # The expiration time of the access token, 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Cache of authenticated users used by get_current_user, 0 seconds disables it
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+    # Optional Redis URL so the principal cache is shared between workers
+    PRINCIPAL_CACHE_REDIS_URL: str | None = None
     # Allow cross-domain requests from the following domain list
     BACKEND_CORS_ORIGINS: Union[str, list[str]] = "http://localhost:3000"
 
     PROJECT_NAME: str = "AI Society Dashboard"
+    # Add X-DB-Queries and Server-Timing headers with each request's SQL statement count and time
+    DEBUG: bool = False
 
     # Timezone configuration
     DEFAULT_TIMEZONE: str = "Australia/Sydney"  # Project default timezone
@@ -29,6 +36,31 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "ai_society_dashboard_db"
     POSTGRES_PORT: str = "5432"  # default port
     DATABASE_URL: str | None = None  # add optional full connection string
+    # Run crud calls on an AsyncSession (asyncpg / aiosqlite) instead of the worker thread pool
+    DATABASE_ASYNC: bool = False
+
+    # Connection pool settings (not used for SQLite)
+    DB_POOL_SIZE: int = 5  # connections kept open in the pool
+    DB_MAX_OVERFLOW: int = 10  # extra connections opened under burst load
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced, -1 to disable
+    # Ping the server on every checkout; with DB_POOL_RECYCLE below the server idle
+    # timeout this round-trip can usually be switched off
+    DB_POOL_PRE_PING: bool = True
+
+    # Keep per-portfolio counters in the portfolio_stats table, refreshed by every
+    # commit that changes tasks, users or meetings, so statistics are a single read
+    PORTFOLIO_STATS_MATERIALIZED: bool = False
+
+    # Log a probable N+1 when one statement shape runs this many times in a request, 0 disables it
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+    # Fail requests that run more statements than their route's budget (set by @query_budget,
+    # DB_QUERY_BUDGET otherwise, 0 for no limit); meant for tests
+    DB_QUERY_STRICT: bool = False
+    DB_QUERY_BUDGET: int = 0
+
+    # Hours an Idempotency-Key of POST /tasks/group and POST /meeting-records/ is remembered
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
 
     DISCORD_CLIENT_ID: str = ""
     DISCORD_CLIENT_SECRET: str = ""
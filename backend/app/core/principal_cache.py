@@ -0,0 +1,96 @@
+"""
+Principal cache
+
+Short-lived cache of the authenticated user's columns, keyed by the token subject
+(user ID), so deps.get_current_user does not run a SELECT on users for every request.
+Entries are dropped whenever the user's role, portfolio or profile is updated.
+
+By default the cache is a bounded in-process LRU. Set PRINCIPAL_CACHE_REDIS_URL to
+share it between workers, so an invalidation in one worker is seen by all of them.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """TTL + LRU cache of principal data, optionally backed by Redis"""
+
+    def __init__(self, max_size: int, ttl_seconds: int, redis_url: str | None = None) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis_url and ttl_seconds > 0:
+            # Optional dependency, only needed for multi-worker deployments
+            import redis
+
+            self._redis = redis.Redis.from_url(redis_url)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    def get(self, user_id: int) -> dict[str, Any] | None:
+        """Return the cached principal data for a user, or None if missing or expired"""
+        if not self.enabled:
+            return None
+        if self._redis is not None:
+            raw = self._redis.get(self._redis_key(user_id))
+            return json.loads(raw) if raw else None
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return dict(data)
+
+    def set(self, user_id: int, data: dict[str, Any]) -> None:
+        """Cache principal data for a user"""
+        if not self.enabled:
+            return
+        if self._redis is not None:
+            self._redis.setex(self._redis_key(user_id), self.ttl_seconds, json.dumps(data))
+            return
+
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, dict(data))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's cached principal data"""
+        if self._redis is not None:
+            self._redis.delete(self._redis_key(user_id))
+            return
+
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop every cached principal (in-process entries only)"""
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    redis_url=settings.PRINCIPAL_CACHE_REDIS_URL,
+)
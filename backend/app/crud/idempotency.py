@@ -0,0 +1,112 @@
+"""
+Idempotent create requests
+
+A client retrying a create request after a timeout or dropped connection sends
+the same Idempotency-Key header again. The key, the created rows and the saved
+response are committed in one transaction, so they persist or vanish together:
+a retry finds either the key with the first response, which is returned again,
+or no key and runs as a new request. Concurrent requests with one key are serialized by
+the key's primary key; the later one replays or is told to retry shortly.
+"""
+
+import hashlib
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+from app.utils.timezone import tz
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a request with a different body"""
+
+
+class IdempotencyKeyInProgress(RuntimeError):
+    """The first request with the key has not saved its response yet"""
+
+
+def request_hash(body: BaseModel) -> str:
+    """Fingerprint of a request body, to tell a retry from a different request"""
+    return hashlib.sha256(body.model_dump_json().encode()).hexdigest()
+
+
+def _replay(record: IdempotencyKey | None, request_hash: str) -> dict[str, Any]:
+    if record is not None and record.request_hash != request_hash:
+        raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+    if record is None or record.response is None:
+        raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still in progress")
+    return record.response
+
+
+def run_once(
+    db: Session,
+    *,
+    user_id: int,
+    scope: str,
+    key: str | None,
+    request_hash: str,
+    create: Callable[[Session], dict[str, Any]],
+) -> dict[str, Any]:
+    """
+    Run a create at most once per user, scope and key, and commit it
+
+    Args:
+        db: Database session
+        user_id: User sending the request
+        scope: Endpoint the key belongs to, e.g. "POST /tasks/group"
+        key: Idempotency-Key header, None to always run the create
+        request_hash: request_hash() of the request body
+        create: Creates the rows in the session's transaction without committing
+            and returns the JSON-serializable response
+
+    Returns:
+        Response of the create, or the saved response of the earlier request with the key
+
+    Raises:
+        IdempotencyKeyReused: The key belongs to a request with another body
+        IdempotencyKeyInProgress: The earlier request with the key is not finished
+    """
+    if key is None:
+        response = create(db)
+        db.commit()
+        return response
+
+    # Forget this user's expired keys, so a key can be reused after the TTL
+    cutoff = tz.now_utc() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.created_at < cutoff
+        )
+    )
+
+    identity = (user_id, scope, key)
+    existing = db.get(IdempotencyKey, identity)
+    if existing is not None:
+        return _replay(existing, request_hash)
+
+    record = IdempotencyKey(
+        user_id=user_id,
+        scope=scope,
+        key=key,
+        request_hash=request_hash,
+        created_at=tz.now_utc(),
+    )
+    db.add(record)
+    try:
+        # Waits for a concurrent transaction holding the same key to finish
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return _replay(db.get(IdempotencyKey, identity, populate_existing=True), request_hash)
+
+    response = create(db)
+    record.response = response
+    db.commit()
+    return response
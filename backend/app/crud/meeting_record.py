@@ -1,27 +1,50 @@
 from typing import Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Query, Session, joinedload, undefer
+from sqlalchemy import LargeBinary, cast, column, func, and_, literal_column, or_, table
 from datetime import date
 
-from app.models.meeting_record import MeetingRecord
+from app.database.fulltext import (
+    HEADLINE_ALL,
+    HEADLINE_FRAGMENTS,
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    SNIPPET_ELLIPSIS,
+    TS_CONFIG,
+    fts5_query,
+    is_postgresql,
+    render_highlight,
+    websearch_query,
+)
+from app.models.meeting_record import MeetingRecord, meeting_search_vector
 from app.models.user import User
 from app.models.portfolio import Portfolio
 from app.schemas.meeting_record import MeetingRecordCreateRequestBody, MeetingRecordUpdate
+from app.utils.pagination import paginate
+from app.utils.serialization import encode_meeting_list_item
 
+# Stable sort key of meeting lists (newest first), used for keyset pagination cursors
+MEETING_SORT_KEYS = ("meeting_date", "meeting_id")
 
-def get_by_id(db: Session, meeting_id: int) -> MeetingRecord | None:
+# Column loading profiles: auto_caption is deferred on the model so list queries skip
+# the transcript, while detail queries load it in the same SELECT
+LIST_OPTIONS = (joinedload(MeetingRecord.portfolio),)
+DETAIL_OPTIONS = (joinedload(MeetingRecord.portfolio), undefer(MeetingRecord.auto_caption))
+
+
+def get_by_id(db: Session, meeting_id: int, include_transcript: bool = True) -> MeetingRecord | None:
     """Get meeting record by ID"""
-    return db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio)).filter(MeetingRecord.meeting_id == meeting_id).first()
+    options = DETAIL_OPTIONS if include_transcript else LIST_OPTIONS
+    return db.query(MeetingRecord).options(*options).filter(MeetingRecord.meeting_id == meeting_id).first()
 
 
 def get_by_portfolio(db: Session, portfolio_id: int, skip: int = 0, limit: int = 100) -> list[MeetingRecord]:
     """Get meeting records by portfolio ID"""
-    return db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio)).filter(MeetingRecord.portfolio_id == portfolio_id).offset(skip).limit(limit).all()
+    return db.query(MeetingRecord).options(*LIST_OPTIONS).filter(MeetingRecord.portfolio_id == portfolio_id).offset(skip).limit(limit).all()
 
 
 def get_by_date_range(db: Session, start_date: date, end_date: date, skip: int = 0, limit: int = 100) -> list[MeetingRecord]:
     """Get meeting records within date range"""
-    return db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio)).filter(
+    return db.query(MeetingRecord).options(*LIST_OPTIONS).filter(
         and_(
             MeetingRecord.meeting_date >= start_date,
             MeetingRecord.meeting_date <= end_date
@@ -31,14 +54,14 @@ def get_by_date_range(db: Session, start_date: date, end_date: date, skip: int =
 
 def get_with_recordings(db: Session, skip: int = 0, limit: int = 100) -> list[MeetingRecord]:
     """Get meeting records that have recording files"""
-    return db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio)).filter(
+    return db.query(MeetingRecord).options(*LIST_OPTIONS).filter(
         MeetingRecord.recording_file_link.isnot(None)
     ).offset(skip).limit(limit).all()
 
 
 def get_with_summaries(db: Session, skip: int = 0, limit: int = 100) -> list[MeetingRecord]:
     """Get meeting records that have summaries"""
-    return db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio)).filter(
+    return db.query(MeetingRecord).options(*LIST_OPTIONS).filter(
         MeetingRecord.summary.isnot(None)
     ).offset(skip).limit(limit).all()
 
@@ -55,7 +78,7 @@ def get_multi(
     limit: int = 100
 ) -> list[MeetingRecord]:
     """Get multiple meeting records with optional filters"""
-    query = db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio))
+    query = db.query(MeetingRecord).options(*LIST_OPTIONS)
     
     if portfolio_id:
         query = query.filter(MeetingRecord.portfolio_id == portfolio_id)
@@ -85,22 +108,8 @@ def get_multi(
     return query.order_by(MeetingRecord.meeting_date.desc()).offset(skip).limit(limit).all()
 
 
-def get_multi_with_permissions(
-    db: Session,
-    *,
-    current_user: User,
-    portfolio_id: int | None = None,
-    start_date: date | None = None,
-    end_date: date | None = None,
-    has_recording: bool | None = None,
-    has_summary: bool | None = None,
-    skip: int = 0,
-    limit: int = 100
-) -> list[MeetingRecord]:
-    """Get multiple meeting records with permission-based filtering"""
-    query = db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio))
-    
-    # Apply permission-based filtering based on user role
+def _filter_visible_to(query: Query, current_user: User) -> Query:
+    """Restrict a meeting record query to the records the user's role may see"""
     if current_user.role_id == 2:  # Admin - can see all meetings
         pass  # No additional filtering needed
     elif current_user.role_id == 3:  # Director - can see all meetings in their portfolios
@@ -123,6 +132,27 @@ def get_multi_with_permissions(
         else:
             # If user has no portfolio assigned, they can't see any meetings
             query = query.filter(MeetingRecord.meeting_id == -1)  # Always false
+    return query
+
+
+def get_multi_with_permissions(
+    db: Session,
+    *,
+    current_user: User,
+    portfolio_id: int | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    has_recording: bool | None = None,
+    has_summary: bool | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None
+) -> list[MeetingRecord]:
+    """Get multiple meeting records with permission-based filtering, newest first"""
+    query = db.query(MeetingRecord).options(*LIST_OPTIONS)
+    
+    # Apply permission-based filtering based on user role
+    query = _filter_visible_to(query, current_user)
     
     # Apply additional filters
     if portfolio_id:
@@ -150,12 +180,22 @@ def get_multi_with_permissions(
     elif has_summary is False:
         query = query.filter(MeetingRecord.summary.is_(None))
     
-    return query.order_by(MeetingRecord.meeting_date.desc()).offset(skip).limit(limit).all()
+    return paginate(
+        query,
+        (MeetingRecord.meeting_date, MeetingRecord.meeting_id),
+        MEETING_SORT_KEYS,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        descending=True
+    ).all()
 
 
-def get_by_id_with_permissions(db: Session, meeting_id: int, current_user: User) -> MeetingRecord | None:
+def get_by_id_with_permissions(
+    db: Session, meeting_id: int, current_user: User, include_transcript: bool = True
+) -> MeetingRecord | None:
     """Get meeting record by ID with permission check"""
-    meeting = db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio)).filter(MeetingRecord.meeting_id == meeting_id).first()
+    meeting = get_by_id(db, meeting_id=meeting_id, include_transcript=include_transcript)
     
     if not meeting:
         return None
@@ -177,8 +217,10 @@ def get_by_id_with_permissions(db: Session, meeting_id: int, current_user: User)
             return None
 
 
-def create_meeting_record(db: Session, *, obj_in: MeetingRecordCreateRequestBody) -> MeetingRecord:
-    """Create new meeting record"""
+def create_meeting_record(
+    db: Session, *, obj_in: MeetingRecordCreateRequestBody, commit: bool = True
+) -> MeetingRecord:
+    """Create new meeting record; with commit=False it is only flushed, for the caller to commit"""
     db_obj = MeetingRecord()
     db_obj.meeting_date = obj_in.meeting_date
     db_obj.meeting_name = obj_in.meeting_name
@@ -189,7 +231,10 @@ def create_meeting_record(db: Session, *, obj_in: MeetingRecordCreateRequestBody
     db_obj.user_can_see = obj_in.user_can_see
 
     db.add(db_obj)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
     db.refresh(db_obj)
     return db_obj
 
@@ -222,7 +267,7 @@ def delete_meeting_record(db: Session, *, meeting_id: int) -> bool:
 
 def search_meeting_records(db: Session, *, search_term: str, portfolio_id: int | None = None) -> list[MeetingRecord]:
     """Search meeting records by name or summary"""
-    query = db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio))
+    query = db.query(MeetingRecord).options(*LIST_OPTIONS)
     
     if portfolio_id:
         query = query.filter(MeetingRecord.portfolio_id == portfolio_id)
@@ -241,40 +286,89 @@ def search_meeting_records_with_permissions(
     *, 
     search_term: str, 
     current_user: User,
-    portfolio_id: int | None = None
-) -> list[MeetingRecord]:
-    """Search meeting records by name or summary with permission filtering"""
-    query = db.query(MeetingRecord).options(joinedload(MeetingRecord.portfolio))
+    portfolio_id: int | None = None,
+    skip: int = 0,
+    limit: int = 20
+) -> list[dict[str, Any]]:
+    """Full-text search meeting records by name, summary or transcript with permission filtering
+
+    Results are ranked by relevance and carry highlighted snippets instead of the
+    full transcript, which is never loaded.
+    """
+    query = db.query(MeetingRecord).options(*LIST_OPTIONS)
     
     # Apply permission-based filtering based on user role
-    if current_user.role_id == 2:  # Admin - can see all meetings
-        pass  # No additional filtering needed
-    elif current_user.role_id == 3:  # Director - can see all meetings in their portfolios
-        if current_user.portfolio_id:
-            query = query.filter(MeetingRecord.portfolio_id == current_user.portfolio_id)
-        else:
-            query = query.filter(MeetingRecord.meeting_id == -1)  # Always false
-    else:  # Regular user - can only see meetings in their portfolio where user_can_see is True
-        if current_user.portfolio_id:
-            query = query.filter(
-                and_(
-                    MeetingRecord.portfolio_id == current_user.portfolio_id,
-                    MeetingRecord.user_can_see == True
-                )
-            )
-        else:
-            query = query.filter(MeetingRecord.meeting_id == -1)  # Always false
+    query = _filter_visible_to(query, current_user)
     
     if portfolio_id:
         query = query.filter(MeetingRecord.portfolio_id == portfolio_id)
     
-    search_filter = or_(
-        MeetingRecord.meeting_name.ilike(f"%{search_term}%"),
-        MeetingRecord.summary.ilike(f"%{search_term}%"),
-        MeetingRecord.auto_caption.ilike(f"%{search_term}%")
+    if is_postgresql(db):
+        ts_query = websearch_query(search_term)
+        rank = func.ts_rank(meeting_search_vector, ts_query)
+        name_highlight = func.ts_headline(TS_CONFIG, MeetingRecord.meeting_name, ts_query, HEADLINE_ALL)
+        summary_snippet = func.ts_headline(TS_CONFIG, MeetingRecord.summary, ts_query, HEADLINE_FRAGMENTS)
+        caption_snippet = func.ts_headline(TS_CONFIG, MeetingRecord.auto_caption, ts_query, HEADLINE_FRAGMENTS)
+        query = query.filter(meeting_search_vector.op("@@")(ts_query))
+    else:
+        match = fts5_query(search_term)
+        if not match:
+            return []
+        fts = table("meeting_records_fts", column("rowid"))
+        fts_ref = literal_column("meeting_records_fts")
+        # bm25() is lower-is-better; negate it so rank sorts the same way on both backends
+        rank = -func.bm25(fts_ref, 10.0, 4.0, 1.0)
+        name_highlight = func.highlight(fts_ref, 0, HIGHLIGHT_START, HIGHLIGHT_STOP)
+        summary_snippet = func.snippet(fts_ref, 1, HIGHLIGHT_START, HIGHLIGHT_STOP, SNIPPET_ELLIPSIS, 24)
+        caption_snippet = func.snippet(fts_ref, 2, HIGHLIGHT_START, HIGHLIGHT_STOP, SNIPPET_ELLIPSIS, 24)
+        query = query.join(fts, fts.c.rowid == MeetingRecord.meeting_id).filter(fts_ref.op("MATCH")(match))
+    
+    rows = (
+        query.add_columns(
+            rank.label("rank"),
+            name_highlight.label("name_highlight"),
+            summary_snippet.label("summary_snippet"),
+            caption_snippet.label("caption_snippet"),
+        )
+        .order_by(rank.desc(), MeetingRecord.meeting_date.desc(), MeetingRecord.meeting_id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
     )
     
-    return query.filter(search_filter).order_by(MeetingRecord.meeting_date.desc()).all()
+    results = []
+    for meeting, meeting_rank, name_hl, summary_hl, caption_hl in rows:
+        results.append({
+            **encode_meeting_list_item(meeting),
+            "rank": meeting_rank,
+            "name_highlight": render_highlight(name_hl),
+            # Only return snippets that actually contain a match
+            "summary_snippet": render_highlight(summary_hl) if summary_hl and HIGHLIGHT_START in summary_hl else None,
+            "caption_snippet": render_highlight(caption_hl) if caption_hl and HIGHLIGHT_START in caption_hl else None,
+        })
+    return results
+
+
+def get_transcript_size(db: Session, meeting_id: int) -> int | None:
+    """Get the size in UTF-8 bytes of a meeting's transcript, or None if it has none"""
+    if is_postgresql(db):
+        # Stored size of the text, which is its UTF-8 size in a UTF8 database
+        size = func.octet_length(MeetingRecord.auto_caption)
+    else:
+        size = func.length(cast(MeetingRecord.auto_caption, LargeBinary))
+    return db.query(size).filter(MeetingRecord.meeting_id == meeting_id).scalar()
+
+
+def get_transcript_text(db: Session, meeting_id: int, *, offset: int, length: int) -> str:
+    """Get part of a meeting's transcript, by character offset and length
+
+    Slicing the text itself keeps the database from encoding the whole transcript
+    to bytes for every piece; callers count the UTF-8 bytes of what they read.
+    """
+    text = db.query(func.substr(MeetingRecord.auto_caption, offset + 1, length)).filter(
+        MeetingRecord.meeting_id == meeting_id
+    ).scalar()
+    return text or ""
 
 
 def get_related_tasks_count(db: Session, meeting_id: int) -> int:
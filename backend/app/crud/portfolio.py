@@ -2,6 +2,7 @@ from typing import Any
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 
+from app.crud import portfolio_stats
 from app.models.portfolio import Portfolio
 from app.schemas.portfolio import PortfolioCreateRequestBody, PortfolioUpdate
 
@@ -90,10 +91,11 @@ def delete_portfolio(db: Session, *, portfolio_id: int) -> bool:
     if not portfolio:
         return False
     
-    # Check dependencies
-    user_count = get_user_count(db, portfolio_id=portfolio_id)
-    task_count = get_task_count(db, portfolio_id=portfolio_id)
-    meeting_count = get_meeting_count(db, portfolio_id=portfolio_id)
+    # Check dependencies (always against live counts)
+    stats = _statistics(db, Portfolio.portfolio_id == portfolio_id, live=True)[0]
+    user_count = stats["user_count"]
+    task_count = stats["task_count"]
+    meeting_count = stats["meeting_count"]
     
     total_dependencies = user_count + task_count + meeting_count
     if total_dependencies > 0:
@@ -153,39 +155,49 @@ def search_portfolios(db: Session, *, search_term: str) -> list[Portfolio]:
     return db.query(Portfolio).filter(search_filter).all()
 
 
+def _statistics(db: Session, *criteria, live: bool = False) -> list[dict[str, Any]]:
+    """Portfolio columns and counts of the portfolios matching criteria, in one query"""
+    rows = portfolio_stats.statistics_query(db, *criteria, live=live).order_by(Portfolio.portfolio_id).all()
+    statistics = []
+    for portfolio, *counts in rows:
+        stats = {
+            "portfolio_id": portfolio.portfolio_id,
+            "name": portfolio.name,
+            "description": portfolio.description,
+            "channel_id": portfolio.channel_id,
+        }
+        stats.update(zip(portfolio_stats.COUNT_FIELDS, counts))
+        statistics.append(stats)
+    return statistics
+
+
+def get_detail(
+    db: Session, *, portfolio_id: int | None = None, name: str | None = None, channel_id: str | None = None
+) -> dict[str, Any] | None:
+    """Get a portfolio with its statistics by ID, name or Discord channel ID"""
+    if portfolio_id is not None:
+        criterion = Portfolio.portfolio_id == portfolio_id
+    elif name is not None:
+        criterion = Portfolio.name == name
+    else:
+        criterion = Portfolio.channel_id == channel_id
+    statistics = _statistics(db, criterion)
+    return statistics[0] if statistics else None
+
+
 def get_portfolio_statistics(db: Session, portfolio_id: int) -> dict[str, Any]:
     """Get comprehensive statistics for a portfolio"""
-    portfolio = get_by_id(db, portfolio_id=portfolio_id)
-    if not portfolio:
-        return {}
-    
-    user_count = get_user_count(db, portfolio_id=portfolio_id)
-    task_count = get_task_count(db, portfolio_id=portfolio_id)
-    active_task_count = get_active_task_count(db, portfolio_id=portfolio_id)
-    completed_task_count = get_completed_task_count(db, portfolio_id=portfolio_id)
-    meeting_count = get_meeting_count(db, portfolio_id=portfolio_id)
-    
-    return {
-        "portfolio_id": portfolio.portfolio_id,
-        "name": portfolio.name,
-        "user_count": user_count,
-        "task_count": task_count,
-        "active_task_count": active_task_count,
-        "completed_task_count": completed_task_count,
-        "meeting_count": meeting_count,
-    }
+    return get_detail(db, portfolio_id=portfolio_id) or {}
 
 
 def get_all_portfolio_statistics(db: Session) -> list[dict[str, Any]]:
     """Get statistics for all portfolios"""
-    portfolios = get_all(db)
-    statistics = []
-    
-    for portfolio in portfolios:
-        stats = get_portfolio_statistics(db, portfolio_id=portfolio.portfolio_id)
-        statistics.append(stats)
-    
-    return statistics
+    return _statistics(db)
+
+
+def refresh_statistics(db: Session) -> int:
+    """Rebuild materialized statistics of all portfolios"""
+    return portfolio_stats.refresh_all(db)
 
 
 def get_portfolios_with_channels(db: Session) -> list[Portfolio]:
@@ -0,0 +1,261 @@
+"""
+Per-portfolio statistics
+
+All counters of a set of portfolios are computed by one statement that outer joins
+portfolios to task, user and meeting aggregates grouped by portfolio_id.
+
+With PORTFOLIO_STATS_MATERIALIZED enabled the same counters are also kept in the
+portfolio_stats table: session events note which portfolios a flush touched and
+their rows are recomputed just before the transaction commits, so statistics
+reads become a single indexed lookup. On PostgreSQL the rows are locked before
+they are recomputed, so concurrent commits touching the same portfolio take
+turns and each counts the rows the previous one committed. Writes that bypass the ORM unit of work
+(bulk UPDATE/DELETE statements) must call mark_stale() themselves.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import delete, event, func, inspect, select, true
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.models.meeting_record import MeetingRecord
+from app.models.portfolio import Portfolio
+from app.models.portfolio_stats import PortfolioStats
+from app.models.task import Task
+from app.models.user import User
+
+COMPLETED_STATUS = "Completed"
+
+COUNT_FIELDS = (
+    "user_count",
+    "task_count",
+    "active_task_count",
+    "completed_task_count",
+    "meeting_count",
+)
+
+# Attributes whose changes affect the counters of each tracked model
+_TRACKED_ATTRIBUTES = {
+    Task: ("portfolio_id", "status"),
+    User: ("portfolio_id",),
+    MeetingRecord: ("portfolio_id",),
+}
+
+# session.info key holding the portfolio ids to refresh before commit
+_STALE_KEY = "portfolio_stats_stale"
+
+
+def _count_subqueries(*criteria: Any) -> tuple[Any, Any, Any]:
+    """Task, user and meeting aggregates grouped by portfolio_id
+
+    criteria filter portfolios; they are applied inside each aggregate as a
+    semi-join so only the matching portfolios' rows are counted.
+    """
+    portfolio_ids = select(Portfolio.portfolio_id).where(*criteria) if criteria else None
+
+    def grouped(column: Any, *counts: Any) -> Any:
+        stmt = select(column.label("portfolio_id"), *counts).group_by(column)
+        if portfolio_ids is not None:
+            stmt = stmt.where(column.in_(portfolio_ids))
+        return stmt.subquery()
+
+    tasks = grouped(
+        Task.portfolio_id,
+        func.count().label("task_count"),
+        func.count().filter(Task.status != COMPLETED_STATUS).label("active_task_count"),
+        func.count().filter(Task.status == COMPLETED_STATUS).label("completed_task_count"),
+    )
+    users = grouped(User.portfolio_id, func.count().label("user_count"))
+    meetings = grouped(MeetingRecord.portfolio_id, func.count().label("meeting_count"))
+    return tasks, users, meetings
+
+
+def computed_counts(*criteria: Any) -> tuple[list[Any], list[tuple[Any, Any]]]:
+    """Live counter columns and the outer joins they need, for a query on Portfolio"""
+    tasks, users, meetings = _count_subqueries(*criteria)
+    sources = {
+        "user_count": users,
+        "task_count": tasks,
+        "active_task_count": tasks,
+        "completed_task_count": tasks,
+        "meeting_count": meetings,
+    }
+    columns = [func.coalesce(sources[name].c[name], 0).label(name) for name in COUNT_FIELDS]
+    joins = [
+        (subquery, subquery.c.portfolio_id == Portfolio.portfolio_id)
+        for subquery in (tasks, users, meetings)
+    ]
+    return columns, joins
+
+
+def statistics_query(db: Session, *criteria: Any, live: bool = False) -> Query:
+    """Query of (Portfolio, *COUNT_FIELDS) rows for the portfolios matching criteria
+
+    Reads the materialized table when it is enabled, unless live counts are asked for.
+    """
+    if settings.PORTFOLIO_STATS_MATERIALIZED and not live:
+        columns = [
+            func.coalesce(getattr(PortfolioStats, name), 0).label(name) for name in COUNT_FIELDS
+        ]
+        query = db.query(Portfolio, *columns).outerjoin(
+            PortfolioStats, PortfolioStats.portfolio_id == Portfolio.portfolio_id
+        )
+    else:
+        columns, joins = computed_counts(*criteria)
+        query = db.query(Portfolio, *columns)
+        for target, onclause in joins:
+            query = query.outerjoin(target, onclause)
+    return query.filter(*criteria)
+
+
+def refresh(db: Session, portfolio_ids: Iterable[int] | None = None) -> int:
+    """Recompute materialized rows for the given portfolios (all when None)
+
+    Returns the number of portfolios refreshed. Does not commit.
+    """
+    criteria = []
+    if portfolio_ids is not None:
+        portfolio_ids = sorted(set(portfolio_ids))
+        if not portfolio_ids:
+            return 0
+        criteria.append(Portfolio.portfolio_id.in_(portfolio_ids))
+    else:
+        # SQLite needs a WHERE clause to parse INSERT ... SELECT ... ON CONFLICT
+        criteria.append(true())
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        _lock_rows(db, criteria)
+
+    columns, joins = computed_counts(*criteria)
+    source = select(Portfolio.portfolio_id, *columns, func.now().label("updated_at"))
+    for target, onclause in joins:
+        source = source.outerjoin(target, onclause)
+    source = source.where(*criteria)
+
+    target_columns = ["portfolio_id", *COUNT_FIELDS, "updated_at"]
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert(PortfolioStats).from_select(target_columns, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PortfolioStats.portfolio_id],
+            set_={name: stmt.excluded[name] for name in target_columns[1:]},
+        )
+    else:
+        stale = delete(PortfolioStats)
+        if portfolio_ids is not None:
+            stale = stale.where(PortfolioStats.portfolio_id.in_(portfolio_ids))
+        db.execute(stale)
+        stmt = PortfolioStats.__table__.insert().from_select(target_columns, source)
+    result = db.execute(stmt)
+
+    # Drop rows of portfolios that no longer exist
+    orphans = delete(PortfolioStats).where(
+        PortfolioStats.portfolio_id.not_in(select(Portfolio.portfolio_id))
+    )
+    if portfolio_ids is not None:
+        orphans = orphans.where(PortfolioStats.portfolio_id.in_(portfolio_ids))
+    db.execute(orphans)
+
+    return result.rowcount
+
+
+def _lock_rows(db: Session, criteria: list[Any]) -> None:
+    """Lock the materialized rows of the portfolios matching criteria until commit
+
+    A transaction committing after another one that changed the same portfolio
+    waits here for that commit. Under READ COMMITTED the recount that follows is
+    a new statement with a new snapshot, so it includes the other transaction's
+    rows instead of overwriting its counts with stale ones. Missing rows are
+    created first so there is always a row to lock; rows are locked in
+    portfolio_id order so overlapping refreshes cannot deadlock.
+    """
+    portfolio_ids = select(Portfolio.portfolio_id).where(*criteria).order_by(Portfolio.portfolio_id)
+    db.execute(
+        postgresql_insert(PortfolioStats)
+        .from_select(["portfolio_id"], portfolio_ids)
+        .on_conflict_do_nothing(index_elements=[PortfolioStats.portfolio_id])
+    )
+    db.execute(
+        select(PortfolioStats.portfolio_id)
+        .where(PortfolioStats.portfolio_id.in_(portfolio_ids))
+        .order_by(PortfolioStats.portfolio_id)
+        .with_for_update()
+    )
+
+
+def refresh_all(db: Session) -> int:
+    """Rebuild the whole materialized table and commit"""
+    db.info.pop(_STALE_KEY, None)
+    count = refresh(db)
+    db.commit()
+    return count
+
+
+def mark_stale(db: Session, portfolio_ids: Iterable[int | None]) -> None:
+    """Schedule portfolios for a refresh when the current transaction commits"""
+    if not settings.PORTFOLIO_STATS_MATERIALIZED:
+        return
+    db.info.setdefault(_STALE_KEY, set()).update(
+        portfolio_id for portfolio_id in portfolio_ids if portfolio_id is not None
+    )
+
+
+def _touched_portfolio_ids(obj: Any, changed_only: bool) -> set[int]:
+    """Old and new portfolio ids of an instance whose tracked attributes changed"""
+    state = inspect(obj)
+    attributes = _TRACKED_ATTRIBUTES[type(obj)]
+    if changed_only and not any(state.attrs[name].history.has_changes() for name in attributes):
+        return set()
+    history = state.attrs.portfolio_id.history
+    return {
+        portfolio_id
+        for portfolio_id in (*history.added, *history.unchanged, *history.deleted)
+        if portfolio_id is not None
+    }
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    # new/dirty/deleted and attribute history still reflect the pre-flush state here
+    touched: set[int] = set()
+    for objects, changed_only in (
+        (session.new, False),
+        (session.deleted, False),
+        (session.dirty, True),
+    ):
+        for obj in objects:
+            if type(obj) in _TRACKED_ATTRIBUTES:
+                touched |= _touched_portfolio_ids(obj, changed_only)
+            elif isinstance(obj, Portfolio) and obj in session.deleted:
+                touched.add(obj.portfolio_id)
+    if touched:
+        session.info.setdefault(_STALE_KEY, set()).update(touched)
+
+
+def _before_commit(session: Session) -> None:
+    # Pending changes are flushed by the commit only after this hook, so flush them
+    # now to learn which portfolios they touch
+    session.flush()
+    stale = session.info.pop(_STALE_KEY, None)
+    if stale:
+        refresh(session, stale)
+        session.info.pop(_STALE_KEY, None)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_STALE_KEY, None)
+
+
+def listen(target: Any = Session) -> None:
+    """Keep the materialized table up to date in sessions of target (Session or a sessionmaker)"""
+    event.listen(target, "after_flush", _after_flush)
+    event.listen(target, "before_commit", _before_commit)
+    event.listen(target, "after_rollback", _after_rollback)
+
+
+if settings.PORTFOLIO_STATS_MATERIALIZED:
+    listen()
@@ -1,22 +1,92 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 
 import pytz
-from sqlalchemy import or_
-from sqlalchemy.orm import Session, joinedload, selectinload
-
-from app.models.portfolio import Portfolio
-from app.models.task import Task
+from sqlalchemy import (
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    table,
+    update,
+)
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+
+from app.crud import portfolio_stats, task_closure
+from app.database.fulltext import (
+    HEADLINE_ALL,
+    HEADLINE_FRAGMENTS,
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    SNIPPET_ELLIPSIS,
+    TS_CONFIG,
+    fts5_query,
+    is_postgresql,
+    render_highlight,
+    websearch_query,
+)
+from app.models.task import Task, task_search_vector
 from app.models.task_assignment import TaskAssignment
+from app.models.task_closure import TaskClosure
 from app.models.user import User
-from app.schemas.task import TaskCreateRequestBody, TaskResponse, TaskUpdate
+from app.schemas.task import (
+    DueWindow,
+    TaskBatchUpdateItem,
+    TaskCreateRequestBody,
+    TaskResponse,
+    TaskUpdate,
+)
+from app.utils.pagination import paginate
 from app.utils.timezone import tz
 
+# Stable sort key of task lists, used for keyset pagination cursors
+TASK_SORT_KEYS = ("deadline", "task_id")
+
+# Deepest level below a task that get_task_tree will load
+MAX_TREE_DEPTH = 32
+
 
 def get_by_id(db: Session, task_id: int) -> Task | None:
     """Get task by ID"""
     return db.query(Task).filter(Task.task_id == task_id).first()
 
 
+def get_created_by_user(db: Session, task_id: int) -> User | None:
+    """Get the user who created a task"""
+    return (
+        db.query(User)
+        .join(Task, Task.created_by == User.user_id)
+        .filter(Task.task_id == task_id)
+        .first()
+    )
+
+
+def list_load_options(include_subtasks: bool = True) -> list:
+    """Loader options for tasks serialized with _build_task_list_response_data
+
+    Portfolio and creator are joined, assignees with their users and subtasks with
+    theirs are each loaded by one SELECT ... IN, so a page of tasks costs a fixed
+    number of statements however many rows and subtasks it has.
+    """
+    options = [
+        joinedload(Task.portfolio),
+        joinedload(Task.created_by_user),
+        selectinload(Task.task_assignments).joinedload(TaskAssignment.user),
+    ]
+    if include_subtasks:
+        options.append(
+            selectinload(Task.subtasks).options(
+                joinedload(Task.portfolio),
+                joinedload(Task.created_by_user),
+                selectinload(Task.task_assignments).joinedload(TaskAssignment.user),
+            )
+        )
+    return options
+
+
 def _build_task_list_response_data(task: Task, include_subtasks: bool = True) -> dict:
     """Helper function to build TaskListResponse data from Task model"""
     task_data = {
@@ -74,16 +144,22 @@ def get_by_portfolio(
     skip: int = 0,
     limit: int = 100,
     include_subtasks: bool = True,
+    cursor: str | None = None,
 ) -> list[dict]:
-    """Get tasks by portfolio ID"""
-    tasks = (
+    """Get tasks by portfolio ID, ordered by deadline"""
+    query = (
         db.query(Task)
-        .options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
+        .options(*list_load_options(include_subtasks))
         .filter(Task.portfolio_id == portfolio_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    tasks = paginate(
+        query,
+        (Task.deadline, Task.task_id),
+        TASK_SORT_KEYS,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    ).all()
 
     return [_build_task_list_response_data(task, include_subtasks) for task in tasks]
 
@@ -99,17 +175,27 @@ def get_by_priority(db: Session, priority: str, skip: int = 0, limit: int = 100)
 
 
 def get_by_created_by(
-    db: Session, user_id: int, skip: int = 0, limit: int = 100, include_subtasks: bool = True
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    include_subtasks: bool = True,
+    cursor: str | None = None,
 ) -> list[dict]:
-    """Get tasks created by a specific user"""
-    tasks = (
+    """Get tasks created by a specific user, ordered by deadline"""
+    query = (
         db.query(Task)
-        .options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
+        .options(*list_load_options(include_subtasks))
         .filter(Task.created_by == user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    tasks = paginate(
+        query,
+        (Task.deadline, Task.task_id),
+        TASK_SORT_KEYS,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    ).all()
 
     return [_build_task_list_response_data(task, include_subtasks) for task in tasks]
 
@@ -118,7 +204,7 @@ def get_subtasks(db: Session, parent_task_id: int, include_subtasks: bool = True
     """Get subtasks of a parent task"""
     tasks = (
         db.query(Task)
-        .options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
+        .options(*list_load_options(include_subtasks))
         .filter(Task.parent_task_id == parent_task_id)
         .all()
     )
@@ -126,11 +212,61 @@ def get_subtasks(db: Session, parent_task_id: int, include_subtasks: bool = True
     return [_build_task_list_response_data(task, include_subtasks) for task in tasks]
 
 
+def get_task_tree(db: Session, task_id: int, max_depth: int = MAX_TREE_DEPTH) -> list[dict]:
+    """Get a task and all its descendants down to max_depth levels below it
+
+    The subtree is found by one recursive CTE over parent_task_id and loaded with
+    portfolio, creator and assignees in two queries regardless of its size. Nodes
+    are returned in pre-order (parents before children, siblings by deadline) with
+    their depth and their children nested under subtasks, which is None for nodes
+    at the depth limit. Returns an empty list if the task does not exist.
+    """
+    max_depth = min(max_depth, MAX_TREE_DEPTH)
+    tree = (
+        select(Task.task_id, literal(0).label("depth"))
+        .where(Task.task_id == task_id)
+        .cte("task_tree", recursive=True)
+    )
+    # The depth bound also stops the recursion on a (corrupt) cyclic hierarchy
+    tree = tree.union_all(
+        select(Task.task_id, tree.c.depth + 1)
+        .join(tree, Task.parent_task_id == tree.c.task_id)
+        .where(tree.c.depth < max_depth)
+    )
+
+    rows = (
+        db.query(Task, tree.c.depth)
+        .join(tree, Task.task_id == tree.c.task_id)
+        .options(*list_load_options(include_subtasks=False))
+        .order_by(tree.c.depth, Task.deadline, Task.task_id)
+        .all()
+    )
+    if not rows:
+        return []
+
+    nodes = {}
+    for task, depth in rows:
+        node = _build_task_list_response_data(task, include_subtasks=False)
+        node["depth"] = depth
+        node["subtasks"] = [] if depth < max_depth else None
+        nodes[task.task_id] = node
+        if depth > 0:
+            nodes[task.parent_task_id]["subtasks"].append(node)
+
+    ordered = []
+    stack = [nodes[rows[0][0].task_id]]
+    while stack:
+        node = stack.pop()
+        ordered.append(node)
+        stack.extend(reversed(node["subtasks"] or []))
+    return ordered
+
+
 def get_by_meeting(db: Session, meeting_id: int, include_subtasks: bool = True) -> list[dict]:
     """Get tasks created from a specific meeting"""
     tasks = (
         db.query(Task)
-        .options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
+        .options(*list_load_options(include_subtasks))
         .filter(Task.source_meeting_id == meeting_id)
         .all()
     )
@@ -144,7 +280,7 @@ def get_pending_tasks_by_meeting(
     """Get pending tasks created from a specific meeting"""
     tasks = (
         db.query(Task)
-        .options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
+        .options(*list_load_options(include_subtasks))
         .filter(Task.source_meeting_id == meeting_id, Task.status == "Pending")
         .all()
     )
@@ -161,17 +297,14 @@ def get_multi(
     skip: int = 0,
     limit: int = 100,
     include_subtasks: bool = True,
+    cursor: str | None = None,
 ) -> list[dict]:
-    """Get multiple tasks with optional filters, including portfolio and user info"""
-    query = db.query(Task).options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
+    """Get multiple tasks with optional filters, including portfolio and user info
 
-    # If include subtasks, use selectinload to preload subtasks
-    if include_subtasks:
-        query = query.options(
-            selectinload(Task.subtasks).options(
-                joinedload(Task.portfolio), joinedload(Task.created_by_user)
-            )
-        )
+    Tasks are ordered by deadline; pass cursor to continue after a previous page
+    instead of using skip.
+    """
+    query = db.query(Task).options(*list_load_options(include_subtasks))
 
     if portfolio_id:
         query = query.filter(Task.portfolio_id == portfolio_id)
@@ -180,7 +313,14 @@ def get_multi(
     if priority:
         query = query.filter(Task.priority == priority)
 
-    tasks = query.offset(skip).limit(limit).all()
+    tasks = paginate(
+        query,
+        (Task.deadline, Task.task_id),
+        TASK_SORT_KEYS,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    ).all()
 
     return [_build_task_list_response_data(task, include_subtasks) for task in tasks]
 
@@ -226,6 +366,38 @@ def _build_task_response_data(task: Task | None) -> dict:
     }
 
 
+def get_detail(db: Session, task_id: int) -> dict | None:
+    """Get a task with portfolio, creator, assignees and subtasks for TaskDetailResponse
+
+    Loaded in two queries: the task with its portfolio, creator and assignees
+    joined, then its subtasks with theirs.
+    """
+    task = (
+        db.query(Task)
+        .options(
+            joinedload(Task.portfolio),
+            joinedload(Task.created_by_user),
+            joinedload(Task.task_assignments).joinedload(TaskAssignment.user),
+            selectinload(Task.subtasks).options(
+                joinedload(Task.portfolio),
+                joinedload(Task.created_by_user),
+                joinedload(Task.task_assignments).joinedload(TaskAssignment.user),
+            ),
+        )
+        .filter(Task.task_id == task_id)
+        .one_or_none()
+    )
+    if not task:
+        return None
+
+    task_data = _build_task_response_data(task)
+    task_data["subtasks"] = [
+        _build_task_list_response_data(subtask, include_subtasks=False)
+        for subtask in sorted(task.subtasks, key=lambda subtask: subtask.task_id)
+    ]
+    return task_data
+
+
 def create_task(db: Session, *, obj_in: TaskCreateRequestBody, created_by: int) -> TaskResponse:
     """Create new task"""
     db_obj = Task()
@@ -249,6 +421,8 @@ def create_task(db: Session, *, obj_in: TaskCreateRequestBody, created_by: int)
     db_obj.updated_at = tz.now_utc()
 
     db.add(db_obj)
+    db.flush()
+    task_closure.add_tasks(db, [db_obj.task_id])
     db.commit()
     db.refresh(db_obj)
 
@@ -289,10 +463,19 @@ def update_task(db: Session, *, db_obj: Task, obj_in: dict | TaskUpdate) -> Task
     # Always update the updated_at timestamp
     update_data["updated_at"] = tz.now_utc()
 
+    # Re-parenting moves the whole subtree, which must not end up below itself
+    moved = (
+        "parent_task_id" in update_data and update_data["parent_task_id"] != db_obj.parent_task_id
+    )
+    if moved:
+        task_closure.check_parent(db, db_obj.task_id, update_data["parent_task_id"])
+
     for field in update_data:
         setattr(db_obj, field, update_data[field])
 
     db.add(db_obj)
+    if moved:
+        task_closure.move_subtree(db, db_obj.task_id, update_data["parent_task_id"])
     db.commit()
     db.refresh(db_obj)
 
@@ -313,14 +496,146 @@ def update_task(db: Session, *, db_obj: Task, obj_in: dict | TaskUpdate) -> Task
     return TaskResponse(**task_data)
 
 
-def delete_task(db: Session, *, task_id: int) -> bool:
-    """Delete task by ID"""
-    task = db.query(Task).filter(Task.task_id == task_id).first()
-    if task:
-        db.delete(task)
-        db.commit()
-        return True
-    return False
+# Most tasks a single batch update may change
+MAX_BATCH_UPDATE = 500
+
+# Task columns a batch update may set
+BATCH_UPDATE_FIELDS = ("status", "priority", "deadline")
+
+
+def update_tasks_batch(db: Session, *, updates: list[TaskBatchUpdateItem]) -> list[dict]:
+    """Apply different field changes to many tasks in one transaction
+
+    Each changed column is set by a single UPDATE with a CASE over task_id, so the
+    statement count does not grow with the batch. Returns the updated tasks in
+    TaskListResponse format (without subtasks), in request order. Raises
+    ValueError for duplicate or unknown task IDs and oversized batches.
+    """
+    if len(updates) > MAX_BATCH_UPDATE:
+        raise ValueError(f"At most {MAX_BATCH_UPDATE} tasks can be updated at once")
+    task_ids = [item.task_id for item in updates]
+    if len(set(task_ids)) != len(task_ids):
+        raise ValueError("Each task may appear only once in a batch")
+    if not task_ids:
+        return []
+
+    existing = select(Task.task_id, Task.portfolio_id).where(Task.task_id.in_(task_ids))
+    portfolio_ids = dict(db.execute(existing).tuples().all())
+    missing = [task_id for task_id in task_ids if task_id not in portfolio_ids]
+    if missing:
+        raise ValueError(f"Tasks not found: {missing}")
+
+    # Normalize all deadlines to UTC and take one timestamp for the whole batch
+    changes: dict[str, dict[int, object]] = {field: {} for field in BATCH_UPDATE_FIELDS}
+    for item in updates:
+        for field, value in item.model_dump(exclude_unset=True, exclude={"task_id"}).items():
+            if value is None:
+                continue
+            changes[field][item.task_id] = tz.to_utc(value) if field == "deadline" else value
+    now = tz.now_utc()
+
+    values = {
+        field: case(
+            {
+                task_id: literal(value, getattr(Task, field).type)
+                for task_id, value in by_id.items()
+            },
+            value=Task.task_id,
+            else_=getattr(Task, field),
+        )
+        for field, by_id in changes.items()
+        if by_id
+    }
+    changed_ids = {task_id for by_id in changes.values() for task_id in by_id}
+    if changed_ids:
+        db.execute(
+            update(Task)
+            .where(Task.task_id.in_(changed_ids))
+            .values(**values, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if changes["status"]:
+            portfolio_stats.mark_stale(
+                db, {portfolio_ids[task_id] for task_id in changes["status"]}
+            )
+    db.commit()
+
+    tasks = (
+        db.query(Task)
+        .options(*list_load_options(include_subtasks=False))
+        .filter(Task.task_id.in_(task_ids))
+        .populate_existing()
+        .all()
+    )
+    by_id = {task_obj.task_id: task_obj for task_obj in tasks}
+    return [
+        _build_task_list_response_data(by_id[task_id], include_subtasks=False)
+        for task_id in task_ids
+    ]
+
+
+def delete_tasks(db: Session, *, task_ids: list[int]) -> int:
+    """Delete tasks with all of their subtasks and assignments in one transaction
+
+    Uses one DELETE per table over the whole subtrees. Returns the number of
+    deleted tasks, subtasks included; unknown IDs are ignored.
+    """
+    if not task_ids:
+        return 0
+
+    subtree = (
+        select(Task.task_id, Task.portfolio_id)
+        .join(TaskClosure, TaskClosure.descendant_id == Task.task_id)
+        .where(TaskClosure.ancestor_id.in_(task_ids))
+        .distinct()
+    )
+    portfolio_ids = dict(db.execute(subtree).tuples().all())
+    if not portfolio_ids:
+        return 0
+
+    deleted_ids = list(portfolio_ids)
+    db.execute(
+        delete(TaskAssignment)
+        .where(TaskAssignment.task_id.in_(deleted_ids))
+        .execution_options(synchronize_session=False)
+    )
+    task_closure.remove_subtrees(db, deleted_ids)
+    db.execute(
+        delete(Task)
+        .where(Task.task_id.in_(deleted_ids))
+        .execution_options(synchronize_session=False)
+    )
+    portfolio_stats.mark_stale(db, portfolio_ids.values())
+    db.commit()
+    return len(deleted_ids)
+
+
+def delete_task(db: Session, *, task_id: int) -> int:
+    """Delete task by ID with its subtasks and assignments, return count of deleted tasks"""
+    return delete_tasks(db, task_ids=[task_id])
+
+
+def delete_pending_tasks_by_meeting(
+    db: Session, *, meeting_id: int, task_ids: list[int] | None = None
+) -> int:
+    """Delete pending tasks created from a meeting, e.g. a rejected AI-generated task group
+
+    Deletes the given pending tasks, or all of them when task_ids is None, with
+    their subtasks. Returns the count of deleted tasks; raises ValueError if a
+    given task is not a pending task of the meeting.
+    """
+    pending = select(Task.task_id).where(
+        Task.source_meeting_id == meeting_id, Task.status == "Pending"
+    )
+    if task_ids is not None:
+        pending = pending.where(Task.task_id.in_(task_ids))
+    pending_ids = list(db.execute(pending).scalars())
+
+    if task_ids is not None:
+        invalid = sorted(set(task_ids) - set(pending_ids))
+        if invalid:
+            raise ValueError(f"Tasks are not pending tasks of meeting {meeting_id}: {invalid}")
+    return delete_tasks(db, task_ids=pending_ids)
 
 
 def search_tasks(
@@ -328,48 +643,113 @@ def search_tasks(
     search_term: str,
     portfolio_id: int | None = None,
     include_subtasks: bool = True,
+    skip: int = 0,
+    limit: int = 20,
 ) -> list[dict]:
-    """Search tasks by title or description"""
-    query = (
-        db.query(Task)
-        .options(joinedload(Task.portfolio), joinedload(Task.created_by_user))
-        .filter(
-            or_(Task.title.ilike(f"%{search_term}%"), Task.description.ilike(f"%{search_term}%"))
+    """Full-text search tasks by title or description, best matches first
+
+    Each result includes its relevance rank and the title and description with
+    matched terms highlighted.
+    """
+    query = db.query(Task).options(*list_load_options(include_subtasks))
+
+    if is_postgresql(db):
+        ts_query = websearch_query(search_term)
+        rank = func.ts_rank(task_search_vector, ts_query)
+        title_highlight = func.ts_headline(TS_CONFIG, Task.title, ts_query, HEADLINE_ALL)
+        description_highlight = func.ts_headline(
+            TS_CONFIG, Task.description, ts_query, HEADLINE_FRAGMENTS
         )
-    )
+        query = query.filter(task_search_vector.op("@@")(ts_query))
+    else:
+        match = fts5_query(search_term)
+        if not match:
+            return []
+        fts = table("tasks_fts", column("rowid"))
+        fts_ref = literal_column("tasks_fts")
+        # bm25() is lower-is-better; negate it so rank sorts the same way on both backends
+        rank = -func.bm25(fts_ref, 10.0, 1.0)
+        title_highlight = func.highlight(fts_ref, 0, HIGHLIGHT_START, HIGHLIGHT_STOP)
+        description_highlight = func.snippet(
+            fts_ref, 1, HIGHLIGHT_START, HIGHLIGHT_STOP, SNIPPET_ELLIPSIS, 24
+        )
+        query = query.join(fts, fts.c.rowid == Task.task_id).filter(fts_ref.op("MATCH")(match))
 
     if portfolio_id:
         query = query.filter(Task.portfolio_id == portfolio_id)
 
-    tasks = query.all()
-    return [_build_task_list_response_data(task, include_subtasks) for task in tasks]
+    rows = (
+        query.add_columns(
+            rank.label("rank"),
+            title_highlight.label("title_highlight"),
+            description_highlight.label("description_highlight"),
+        )
+        .order_by(rank.desc(), Task.task_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
 
+    results = []
+    for task, task_rank, title_hl, description_hl in rows:
+        task_data = _build_task_list_response_data(task, include_subtasks)
+        task_data["rank"] = task_rank
+        task_data["title_highlight"] = render_highlight(title_hl)
+        task_data["description_highlight"] = render_highlight(description_hl or None)
+        results.append(task_data)
+    return results
 
-def get_tomorrow_reminders(db: Session, portfolio_id: int | None = None) -> list[dict]:
-    """Get tasks due tomorrow and not completed with portfolio and user info (project timezone)"""
 
-    # Get current project timezone time
-    now_local = tz.now_local()
+# Statuses of tasks that still need reminders
+REMINDER_STATUSES = ["Not Started", "In Progress"]
 
-    # Calculate tomorrow's date range (project timezone)
-    tomorrow_start = (now_local + timedelta(days=1)).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-    tomorrow_end = tomorrow_start + timedelta(days=1)
 
-    # Convert to UTC time for database query
-    tomorrow_start_utc = tz.to_utc(tomorrow_start)
-    tomorrow_end_utc = tz.to_utc(tomorrow_end)
+def get_due_window(window: DueWindow) -> tuple[datetime | None, datetime]:
+    """UTC (start, end) bounds of a named due window, in the project timezone
 
-    # Query tasks with join to get portfolio info
-    query = db.query(Task).join(Portfolio)
+    overdue has no start; the other windows cover whole local days except
+    next_7_days, which runs from now.
+    """
+    now = tz.now_utc()
+    today = tz.now_local().date()
+
+    def local_midnight(days: int) -> datetime:
+        # Localize naive midnights so DST changes between today and the target are honoured
+        return tz.to_utc(datetime.combine(today + timedelta(days=days), time.min))
+
+    if window == DueWindow.OVERDUE:
+        return None, now
+    if window == DueWindow.TODAY:
+        return local_midnight(0), local_midnight(1)
+    if window == DueWindow.TOMORROW:
+        return local_midnight(1), local_midnight(2)
+    return now, now + timedelta(days=7)
+
+
+def get_due_reminders(
+    db: Session,
+    *,
+    start: datetime | None,
+    end: datetime,
+    portfolio_id: int | None = None,
+) -> list[dict]:
+    """Get not completed tasks due in [start, end) with portfolio and assignee info
 
-    # Use UTC time range for query (since deadline is now stored with timezone in UTC)
-    query = query.filter(
-        Task.deadline >= tomorrow_start_utc,
-        Task.deadline < tomorrow_end_utc,
-        Task.status.in_(["Not Started", "In Progress"]),
+    Portfolios are joined and assignees loaded in one batched query, so the number
+    of queries does not grow with the number of tasks. A start of None includes
+    everything due before end.
+    """
+    query = (
+        db.query(Task)
+        .join(Task.portfolio)
+        .options(
+            contains_eager(Task.portfolio),
+            selectinload(Task.task_assignments).joinedload(TaskAssignment.user),
+        )
+        .filter(Task.status.in_(REMINDER_STATUSES), Task.deadline < end)
     )
+    if start is not None:
+        query = query.filter(Task.deadline >= start)
 
     # Optional portfolio filter
     if portfolio_id:
@@ -378,15 +758,8 @@ def get_tomorrow_reminders(db: Session, portfolio_id: int | None = None) -> list
     tasks = query.order_by(Task.priority.desc(), Task.deadline.asc()).all()
 
     # Build result with portfolio and user info
-    result = []
-    for task in tasks:
-        # Get assigned users for this task
-        assigned_users = (
-            db.query(User).join(TaskAssignment).filter(TaskAssignment.task_id == task.task_id).all()
-        )
-
-        # Build task data with portfolio and user info
-        task_data = {
+    return [
+        {
             "task_id": task.task_id,
             "title": task.title,
             "description": task.description,
@@ -398,13 +771,42 @@ def get_tomorrow_reminders(db: Session, portfolio_id: int | None = None) -> list
             "portfolio_channel": task.portfolio.channel_id,
             "created_by": task.created_by,
             "assigned_users": [
-                {"user_id": user.user_id, "username": user.username, "discord_id": user.discord_id}
-                for user in assigned_users
+                {
+                    "user_id": assignment.user.user_id,
+                    "username": assignment.user.username,
+                    "discord_id": assignment.user.discord_id,
+                }
+                for assignment in task.task_assignments
             ],
         }
-        result.append(task_data)
+        for task in tasks
+    ]
+
+
+def get_tomorrow_reminders(db: Session, portfolio_id: int | None = None) -> list[dict]:
+    """Get tasks due tomorrow and not completed with portfolio and user info (project timezone)"""
+    start, end = get_due_window(DueWindow.TOMORROW)
+    return get_due_reminders(db, start=start, end=end, portfolio_id=portfolio_id)
+
 
-    return result
+# Deadline of task group items that do not give one
+DEFAULT_GROUP_DEADLINE = "2025-12-31"
+
+
+def _parse_group_deadlines(values: set[str]) -> dict[str, datetime | None]:
+    """Parse distinct YYYY-MM-DD deadlines to the end of that day in project time
+
+    Values that are not valid dates map to None.
+    """
+    parsed = {}
+    for value in values:
+        try:
+            day = datetime.strptime(value, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            parsed[value] = None
+        else:
+            parsed[value] = tz.to_utc(day.replace(hour=23, minute=59, second=59))
+    return parsed
 
 
 def create_task_group(
@@ -414,92 +816,123 @@ def create_task_group(
     portfolio_id: int | None = None,
     source_meeting_id: int | None = None,
     created_by: int,
-) -> list[int]:
+    commit: bool = True,
+) -> dict:
     """
     Create a group of tasks with hierarchical structure (parent-child relationships)
 
+    Tasks are inserted one hierarchy level at a time with a single multi-row
+    INSERT ... RETURNING per level, so the number of statements grows with the
+    depth of the tree rather than the number of tasks. Items that fail
+    validation are reported by their path (e.g. "tasks[0].subtasks[2]") and
+    skipped together with their subtasks; the rest of the group is created.
+
     Args:
         db: Database session
         tasks_data: List of task dictionaries with potential subtasks
         portfolio_id: Optional portfolio ID for all tasks
         source_meeting_id: Optional meeting ID these tasks come from
         created_by: User ID of the person creating the tasks
+        commit: Commit the tasks; False leaves the transaction open for the caller
 
     Returns:
-        List of created task IDs
+        Dict with the IDs of the created top-level tasks, the number of tasks
+        created at all levels and the per-item validation errors
     """
+    portfolio_id = portfolio_id or 100  # 100 is the No Portfolio ID
+    now = tz.now_utc()
+    deadlines = _parse_group_deadlines({DEFAULT_GROUP_DEADLINE})
     created_task_ids = []
+    total_created = 0
+    errors = []
 
-    def create_single_task(task_data: dict, parent_task_id: int | None = None) -> int | None:
-        """
-        Create a single task and its subtasks recursively
-        """
-        try:
-            # Create the main task
-            db_obj = Task()
-            db_obj.title = task_data.get("title", "Untitled Task")
-            db_obj.description = task_data.get("description", "")
-            db_obj.status = "Pending"  # Force status to be Pending as required
-            db_obj.priority = task_data.get("priority", "Medium")
-
-            # Handle deadline - convert string to datetime
-            deadline_str = task_data.get("deadline", "2025-12-31")
-            if isinstance(deadline_str, str):
-                try:
-                    # Parse date string and set time to end of day
-                    deadline_date = datetime.strptime(deadline_str, "%Y-%m-%d")
-                    deadline_with_time = deadline_date.replace(hour=23, minute=59, second=59)
-                    db_obj.deadline = tz.to_utc(deadline_with_time)
-                except ValueError:
-                    # Fallback to default if parsing fails
-                    default_deadline = datetime.strptime("2025-12-31", "%Y-%m-%d").replace(
-                        hour=23, minute=59, second=59
-                    )
-                    db_obj.deadline = tz.to_utc(default_deadline)
-            else:
-                # If it's already a datetime object
-                db_obj.deadline = tz.to_utc(deadline_str)
-
-            db_obj.portfolio_id = portfolio_id or 100  # 100 is the No Portfolio ID
-            db_obj.parent_task_id = parent_task_id
-            db_obj.source_meeting_id = source_meeting_id
-            db_obj.created_by = created_by
-            db_obj.created_at = tz.now_utc()
-            db_obj.updated_at = tz.now_utc()
-
-            db.add(db_obj)
-            db.flush()  # Flush to get the ID without committing
-
-            task_id = db_obj.task_id
+    # (path, item, parent task ID) of every item on the current level
+    level = [(f"tasks[{index}]", item, None) for index, item in enumerate(tasks_data)]
 
-            # Handle subtasks if they exist
-            subtasks = task_data.get("subtasks", [])
-            if subtasks and isinstance(subtasks, list):
-                for subtask_data in subtasks:
-                    if isinstance(subtask_data, dict) and subtask_data.get("title"):
-                        create_single_task(subtask_data, parent_task_id=task_id)
-
-            return task_id
+    try:
+        while level:
+            # Parse this level's distinct deadlines in one pass
+            deadlines.update(
+                _parse_group_deadlines(
+                    {
+                        item["deadline"]
+                        for _, item, _ in level
+                        if isinstance(item, dict) and item.get("deadline") is not None
+                    }
+                    - deadlines.keys()
+                )
+            )
 
-        except Exception as e:
-            print(f"Error creating task {task_data.get('title', 'Unknown')}: {e}")
-            db.rollback()
-            return None
+            rows = []
+            accepted = []
+            for path, item, parent_task_id in level:
+                if not isinstance(item, dict) or not (item.get("title") or "").strip():
+                    errors.append({"path": path, "detail": "Task title is required"})
+                    continue
+                deadline_str = item.get("deadline")
+                if deadline_str is None:
+                    deadline_str = DEFAULT_GROUP_DEADLINE
+                deadline = deadlines.get(deadline_str) if isinstance(deadline_str, str) else None
+                if deadline is None:
+                    errors.append(
+                        {
+                            "path": path,
+                            "detail": f"Invalid deadline {deadline_str!r}, expected YYYY-MM-DD",
+                        }
+                    )
+                    continue
+
+                rows.append(
+                    {
+                        "title": item["title"],
+                        "description": item.get("description") or "",
+                        "status": "Pending",  # Force status to be Pending as required
+                        "priority": item.get("priority") or "Medium",
+                        "deadline": deadline,
+                        "portfolio_id": portfolio_id,
+                        "parent_task_id": parent_task_id,
+                        "source_meeting_id": source_meeting_id,
+                        "created_by": created_by,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+                accepted.append((path, item))
+
+            if not rows:
+                break
+
+            task_ids = (
+                db.execute(insert(Task).returning(Task.task_id, sort_by_parameter_order=True), rows)
+                .scalars()
+                .all()
+            )
+            task_closure.add_tasks(db, task_ids)
+            if not total_created:
+                created_task_ids = list(task_ids)  # The first level holds the top-level tasks
+            total_created += len(task_ids)
+
+            level = [
+                (f"{path}.subtasks[{index}]", subtask, task_id)
+                for (path, item), task_id in zip(accepted, task_ids)
+                for index, subtask in enumerate(item.get("subtasks") or [])
+            ]
 
-    try:
-        # Create all top-level tasks
-        for task_data in tasks_data:
-            if isinstance(task_data, dict) and task_data.get("title"):
-                task_id = create_single_task(task_data)
-                if task_id:
-                    created_task_ids.append(task_id)
+        # Bulk inserts bypass the unit of work, so flag the counters explicitly
+        if total_created:
+            portfolio_stats.mark_stale(db, [portfolio_id])
 
         # Commit all changes at once
-        db.commit()
+        if commit:
+            db.commit()
 
     except Exception as e:
         print(f"Error in task group creation: {e}")
         db.rollback()
         raise
 
-    return created_task_ids
+    return {
+        "created_task_ids": created_task_ids,
+        "total_created": total_created,
+        "errors": errors,
+    }
@@ -1,7 +1,10 @@
+from collections.abc import Iterable
 from typing import Any
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, delete, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
 
 from app.models.task import Task
 from app.models.task_assignment import TaskAssignment
@@ -10,6 +13,10 @@ from app.schemas.task_assignment import (
     TaskAssignmentCreateRequestBody,
     TaskAssignmentUpdate,
 )
+from app.utils.pagination import paginate
+
+# Pairs per INSERT statement, well below the bind parameter limits of the drivers
+INSERT_BATCH_SIZE = 1000
 
 
 def get_by_id(db: Session, assignment_id: int) -> TaskAssignment | None:
@@ -85,52 +92,93 @@ def get_multi(
     return query.offset(skip).limit(limit).all()
 
 
-def create_task_assignment(
-    db: Session, *, obj_in: TaskAssignmentCreateRequestBody
-) -> TaskAssignment:
-    """Create new task assignment"""
-    # Check if assignment already exists
-    existing = get_by_task_and_user(db, task_id=obj_in.task_id, user_id=obj_in.user_id)
-    if existing:
-        return existing  # Return existing assignment instead of creating duplicate
+def _check_ids_exist(db: Session, task_ids: list[int], user_ids: list[int]) -> None:
+    """Raise ValueError naming any task or user IDs that do not exist"""
+    missing_tasks = set(task_ids) - set(
+        db.execute(select(Task.task_id).where(Task.task_id.in_(task_ids))).scalars()
+    )
+    missing_users = set(user_ids) - set(
+        db.execute(select(User.user_id).where(User.user_id.in_(user_ids))).scalars()
+    )
+    if missing_tasks:
+        raise ValueError(f"Tasks not found: {sorted(missing_tasks)}")
+    if missing_users:
+        raise ValueError(f"Users not found: {sorted(missing_users)}")
 
-    db_obj = TaskAssignment()
-    db_obj.task_id = obj_in.task_id
-    db_obj.user_id = obj_in.user_id
 
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+def _insert_missing(db: Session, pairs: list[tuple[int, int]]) -> list[int]:
+    """Insert (task_id, user_id) pairs that are not assigned yet, return the new assignment IDs
 
+    Uses INSERT ... ON CONFLICT DO NOTHING on the unique (task_id, user_id) index, so
+    concurrent requests assigning the same users cannot create duplicates.
+    """
+    if not pairs:
+        return []
 
-def create_bulk_task_assignments(
-    db: Session, *, task_id: int, user_ids: list[int]
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        assigned = select(TaskAssignment.task_id, TaskAssignment.user_id).where(
+            tuple_(TaskAssignment.task_id, TaskAssignment.user_id).in_(pairs)
+        )
+        existing = set(db.execute(assigned).tuples())
+        pairs = [pair for pair in pairs if pair not in existing]
+
+    assignment_ids = []
+    for start in range(0, len(pairs), INSERT_BATCH_SIZE):
+        rows = [
+            {"task_id": task_id, "user_id": user_id}
+            for task_id, user_id in pairs[start : start + INSERT_BATCH_SIZE]
+        ]
+        if dialect in ("postgresql", "sqlite"):
+            insert_stmt = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            stmt = (
+                insert_stmt(TaskAssignment)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["task_id", "user_id"])
+            )
+        else:
+            stmt = insert(TaskAssignment).values(rows)
+        assignment_ids += db.execute(stmt.returning(TaskAssignment.assignment_id)).scalars()
+    return assignment_ids
+
+
+def assign_users(
+    db: Session, *, task_ids: Iterable[int], user_ids: Iterable[int]
 ) -> list[TaskAssignment]:
-    """Create multiple task assignments for a single task"""
-    assignments = []
+    """Assign every user to every task with set-based INSERTs, skipping existing assignments
 
-    for user_id in user_ids:
-        # Check if assignment already exists
-        existing = get_by_task_and_user(db, task_id=task_id, user_id=user_id)
-        if existing:
-            assignments.append(existing)
-            continue
-
-        db_obj = TaskAssignment()
-        db_obj.task_id = task_id
-        db_obj.user_id = user_id
-        db.add(db_obj)
-        assignments.append(db_obj)
+    Returns the assignments of all requested pairs, existing ones included,
+    ordered by task and user. Raises ValueError if a task or user does not exist.
+    """
+    task_ids = list(dict.fromkeys(task_ids))
+    user_ids = list(dict.fromkeys(user_ids))
+    if not task_ids or not user_ids:
+        return []
 
+    _check_ids_exist(db, task_ids, user_ids)
+    _insert_missing(db, [(task_id, user_id) for task_id in task_ids for user_id in user_ids])
     db.commit()
 
-    # Refresh all new objects
-    for assignment in assignments:
-        if assignment.assignment_id is None:  # Only refresh new objects
-            db.refresh(assignment)
+    return (
+        db.query(TaskAssignment)
+        .filter(TaskAssignment.task_id.in_(task_ids), TaskAssignment.user_id.in_(user_ids))
+        .order_by(TaskAssignment.task_id, TaskAssignment.user_id)
+        .all()
+    )
+
 
-    return assignments
+def create_task_assignment(
+    db: Session, *, obj_in: TaskAssignmentCreateRequestBody
+) -> TaskAssignment:
+    """Create new task assignment, or return the existing one"""
+    return assign_users(db, task_ids=[obj_in.task_id], user_ids=[obj_in.user_id])[0]
+
+
+def create_bulk_task_assignments(
+    db: Session, *, task_id: int, user_ids: list[int]
+) -> list[TaskAssignment]:
+    """Create multiple task assignments for a single task"""
+    return assign_users(db, task_ids=[task_id], user_ids=user_ids)
 
 
 def update_task_assignment(
@@ -153,80 +201,60 @@ def update_task_assignment(
 
 def delete_task_assignment(db: Session, *, assignment_id: int) -> bool:
     """Delete task assignment by ID"""
-    assignment = (
-        db.query(TaskAssignment).filter(TaskAssignment.assignment_id == assignment_id).first()
+    result = db.execute(
+        delete(TaskAssignment).where(TaskAssignment.assignment_id == assignment_id)
     )
-    if assignment:
-        db.delete(assignment)
-        db.commit()
-        return True
-    return False
+    db.commit()
+    return result.rowcount > 0
 
 
 def delete_by_task_and_user(db: Session, *, task_id: int, user_id: int) -> bool:
     """Delete task assignment by task ID and user ID"""
-    assignment = get_by_task_and_user(db, task_id=task_id, user_id=user_id)
-    if assignment:
-        db.delete(assignment)
-        db.commit()
-        return True
-    return False
+    result = db.execute(
+        delete(TaskAssignment).where(
+            TaskAssignment.task_id == task_id, TaskAssignment.user_id == user_id
+        )
+    )
+    db.commit()
+    return result.rowcount > 0
 
 
 def delete_all_task_assignments(db: Session, *, task_id: int) -> int:
     """Delete all assignments for a specific task, return count of deleted assignments"""
-    assignments = get_by_task(db, task_id=task_id)
-    count = len(assignments)
-
-    for assignment in assignments:
-        db.delete(assignment)
-
+    result = db.execute(delete(TaskAssignment).where(TaskAssignment.task_id == task_id))
     db.commit()
-    return count
+    return result.rowcount
 
 
 def delete_all_user_assignments(db: Session, *, user_id: int) -> int:
     """Delete all assignments for a specific user, return count of deleted assignments"""
-    assignments = get_by_user(db, user_id=user_id)
-    count = len(assignments)
-
-    for assignment in assignments:
-        db.delete(assignment)
-
+    result = db.execute(delete(TaskAssignment).where(TaskAssignment.user_id == user_id))
     db.commit()
-    return count
+    return result.rowcount
 
 
 def get_user_assigned_tasks(
-    db: Session, user_id: int, skip: int = 0, limit: int = 100
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: str | None = None
 ) -> list[dict]:
-    """Get user's assigned tasks in TaskListResponse format"""
+    """Get user's assigned tasks in TaskListResponse format, ordered by deadline"""
+    from app.crud.task import TASK_SORT_KEYS, _build_task_list_response_data, list_load_options
+
     # Join TaskAssignment to Task and preload related data
     query = (
         db.query(Task)
         .join(TaskAssignment, Task.task_id == TaskAssignment.task_id)
-        .options(
-            joinedload(Task.portfolio),
-            joinedload(Task.created_by_user),
-            selectinload(Task.task_assignments).joinedload(
-                TaskAssignment.user
-            ),  # 预加载所有assignees
-            selectinload(Task.subtasks).options(
-                joinedload(Task.portfolio),
-                joinedload(Task.created_by_user),
-                selectinload(Task.task_assignments).joinedload(
-                    TaskAssignment.user
-                ),  # subtasks的assignees
-            ),
-        )
+        .options(*list_load_options())
         .filter(TaskAssignment.user_id == user_id)
-        .offset(skip)
-        .limit(limit)
     )
 
-    tasks = query.all()
-
-    from app.crud.task import _build_task_list_response_data
+    tasks = paginate(
+        query,
+        (Task.deadline, Task.task_id),
+        TASK_SORT_KEYS,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    ).all()
 
     return [_build_task_list_response_data(task) for task in tasks]
 
@@ -285,25 +313,20 @@ def update_task_users_smart(
 ) -> list[dict[str, Any]]:
     """
     Smart update: only add/remove users that have changed
+    Applies the difference with one DELETE and one INSERT in a single transaction
     """
-    # Get current assignments
-    current_assignments = get_by_task(db, task_id=task_id)
-    current_user_ids = {assignment.user_id for assignment in current_assignments}
-    new_user_ids = set(user_ids)
+    user_ids = list(dict.fromkeys(user_ids))
+    if user_ids:
+        _check_ids_exist(db, [task_id], user_ids)
 
     # Remove users no longer assigned
-    users_to_remove = current_user_ids - new_user_ids
-    for assignment in current_assignments:
-        if assignment.user_id in users_to_remove:
-            db.delete(assignment)
-
-    # Add new users
-    users_to_add = new_user_ids - current_user_ids
-    for user_id in users_to_add:
-        db_obj = TaskAssignment()
-        db_obj.task_id = task_id
-        db_obj.user_id = user_id
-        db.add(db_obj)
+    db.execute(
+        delete(TaskAssignment).where(
+            TaskAssignment.task_id == task_id, TaskAssignment.user_id.not_in(user_ids)
+        )
+    )
+    # Add new users; users already assigned are skipped by the unique index
+    _insert_missing(db, [(task_id, user_id) for user_id in user_ids])
 
     db.commit()
     return get_task_user_details(db, task_id=task_id)
@@ -0,0 +1,173 @@
+"""
+Task hierarchy closure table
+
+task_closure holds one (ancestor, descendant, depth) row for every pair of tasks
+on the same root-to-leaf path, including a depth 0 row per task, so subtree and
+ancestor questions are answered by a single indexed query instead of walking
+parent_task_id. The task CRUD functions keep it in sync within their own
+transaction; none of these functions commit.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import delete, func, insert, select, true
+from sqlalchemy.orm import Session, aliased
+
+from app.models.task import Task
+from app.models.task_closure import TaskClosure
+
+CLOSURE_COLUMNS = ["ancestor_id", "descendant_id", "depth"]
+
+
+def add_tasks(db: Session, task_ids: Iterable[int]) -> None:
+    """Link newly flushed tasks to themselves and to their parents' ancestors
+
+    Parents are read from tasks.parent_task_id and must already be in the closure,
+    so a hierarchy is added one level at a time.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+
+    db.execute(
+        insert(TaskClosure),
+        [{"ancestor_id": task_id, "descendant_id": task_id, "depth": 0} for task_id in task_ids],
+    )
+    ancestors = (
+        select(TaskClosure.ancestor_id, Task.task_id, TaskClosure.depth + 1)
+        .join(Task, Task.parent_task_id == TaskClosure.descendant_id)
+        .where(Task.task_id.in_(task_ids))
+    )
+    db.execute(insert(TaskClosure).from_select(CLOSURE_COLUMNS, ancestors))
+
+
+def _detach_subtree(db: Session, task_id: int) -> None:
+    """Remove the links between a task's subtree and the task's ancestors"""
+    subtree = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task_id)
+    db.execute(
+        delete(TaskClosure).where(
+            TaskClosure.descendant_id.in_(subtree),
+            TaskClosure.ancestor_id.not_in(subtree),
+        )
+    )
+
+
+def move_subtree(db: Session, task_id: int, new_parent_task_id: int | None) -> None:
+    """Re-link a task and its descendants under a new parent (None for a root)
+
+    Call check_parent first; moving a task below one of its descendants would
+    corrupt the closure.
+    """
+    _detach_subtree(db, task_id)
+    if new_parent_task_id is None:
+        return
+
+    above = aliased(TaskClosure)
+    below = aliased(TaskClosure)
+    links = (
+        select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+        .join(below, true())
+        .where(above.descendant_id == new_parent_task_id, below.ancestor_id == task_id)
+    )
+    db.execute(insert(TaskClosure).from_select(CLOSURE_COLUMNS, links))
+
+
+def remove_subtrees(db: Session, task_ids: Iterable[int]) -> None:
+    """Drop tasks about to be deleted together with all of their descendants
+
+    task_ids must contain every descendant of each task, as returned by
+    get_descendant_ids(include_self=True); their rows are then exactly those
+    whose descendant is in the set.
+    """
+    task_ids = list(task_ids)
+    if task_ids:
+        db.execute(delete(TaskClosure).where(TaskClosure.descendant_id.in_(task_ids)))
+
+
+def is_ancestor(db: Session, ancestor_id: int, descendant_id: int) -> bool:
+    """Whether ancestor_id is a (possibly indirect) parent of descendant_id"""
+    query = select(TaskClosure.depth).where(
+        TaskClosure.ancestor_id == ancestor_id,
+        TaskClosure.descendant_id == descendant_id,
+        TaskClosure.depth > 0,
+    )
+    return db.execute(query.limit(1)).first() is not None
+
+
+def check_parent(db: Session, task_id: int, parent_task_id: int | None) -> None:
+    """Raise ValueError if making parent_task_id the parent of task_id would form a cycle"""
+    if parent_task_id is None:
+        return
+    if parent_task_id == task_id or is_ancestor(db, task_id, parent_task_id):
+        raise ValueError(
+            f"Task {parent_task_id} cannot be the parent of task {task_id} "
+            "because it is the task itself or one of its subtasks"
+        )
+
+
+def get_root_id(db: Session, task_id: int) -> int | None:
+    """ID of the top-level task of a task's hierarchy (the task itself for roots)"""
+    query = (
+        select(TaskClosure.ancestor_id)
+        .where(TaskClosure.descendant_id == task_id)
+        .order_by(TaskClosure.depth.desc())
+        .limit(1)
+    )
+    return db.execute(query).scalar()
+
+
+def get_descendant_ids(db: Session, task_id: int, include_self: bool = False) -> list[int]:
+    """IDs of all tasks below a task, nearest levels first"""
+    query = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task_id)
+    if not include_self:
+        query = query.where(TaskClosure.depth > 0)
+    return list(db.execute(query.order_by(TaskClosure.depth)).scalars())
+
+
+def get_subtree_progress(db: Session, task_ids: Iterable[int]) -> dict[int, dict]:
+    """Progress of the subtasks (at any depth) below each task, in one query
+
+    Returns, per task ID, the number of subtasks, how many are completed, the
+    completed percentage (None without subtasks), the subtree height and a count
+    per status.
+    """
+    task_ids = list(task_ids)
+    progress = {
+        task_id: {
+            "task_id": task_id,
+            "subtask_count": 0,
+            "completed_count": 0,
+            "completed_percent": None,
+            "max_depth": 0,
+            "status_counts": {},
+        }
+        for task_id in task_ids
+    }
+    if not task_ids:
+        return progress
+
+    query = (
+        select(
+            TaskClosure.ancestor_id,
+            Task.status,
+            func.count(),
+            func.max(TaskClosure.depth),
+        )
+        .join(Task, Task.task_id == TaskClosure.descendant_id)
+        .where(TaskClosure.ancestor_id.in_(task_ids), TaskClosure.depth > 0)
+        .group_by(TaskClosure.ancestor_id, Task.status)
+    )
+    for ancestor_id, status, count, max_depth in db.execute(query):
+        stats = progress[ancestor_id]
+        stats["subtask_count"] += count
+        stats["max_depth"] = max(stats["max_depth"], max_depth)
+        stats["status_counts"][status or "Unknown"] = count
+        if status == "Completed":
+            stats["completed_count"] += count
+
+    for stats in progress.values():
+        if stats["subtask_count"]:
+            stats["completed_percent"] = round(
+                100 * stats["completed_count"] / stats["subtask_count"], 1
+            )
+    return progress
@@ -1,7 +1,8 @@
 from typing import Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.principal_cache import principal_cache
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
 from app.schemas.user import (
@@ -20,6 +21,25 @@ def get_by_id(db: Session, id: int) -> User | None:
     return db.query(User).filter(User.user_id == id).first()
 
 
+# Columns kept in the principal cache (never the password hash)
+PRINCIPAL_FIELDS = ("user_id", "email", "username", "role_id", "discord_id", "portfolio_id")
+
+
+def get_principal(db: Session, id: int) -> User | None:
+    """Get the authenticated user by ID, served from the principal cache when possible"""
+    cached = principal_cache.get(id)
+    if cached is not None:
+        # Attach the cached row to this session without a SELECT
+        user_obj = User(**cached)
+        make_transient_to_detached(user_obj)
+        return db.merge(user_obj, load=False)
+
+    user_obj = get_by_id(db, id=id)
+    if user_obj:
+        principal_cache.set(id, {field: getattr(user_obj, field) for field in PRINCIPAL_FIELDS})
+    return user_obj
+
+
 def get_by_discord_id(db: Session, discord_id: str) -> User | None:
     return db.query(User).filter(User.discord_id == discord_id).first()
 
@@ -64,6 +84,7 @@ def update_user(db: Session, *, db_obj: User, obj_in: UserUpdate | dict[str, Any
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    principal_cache.invalidate(db_obj.user_id)
     return db_obj
 
 
@@ -119,4 +140,5 @@ def update_user_self(db: Session, *, db_obj: User, obj_in: UserSelfUpdate) -> Us
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    principal_cache.invalidate(db_obj.user_id)
     return db_obj
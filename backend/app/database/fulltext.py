@@ -0,0 +1,121 @@
+"""
+Full-text search helpers
+
+PostgreSQL searches use weighted tsvector documents backed by GIN indexes (see the
+Alembic migrations). SQLite, used for local development and testing, falls back to
+FTS5 external-content tables that are kept in sync with their source table by
+triggers created alongside it.
+"""
+
+import html
+import re
+from collections.abc import Sequence
+
+from sqlalchemy import DDL, Table, event, func, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+# Text search configuration used for both indexing and querying
+TS_CONFIG = text("'english'")
+
+# Markers the database wraps around matched terms in highlights and snippets. They
+# are Unicode private-use characters, not HTML, so that render_highlight() can
+# escape the user's text before turning them into <mark> tags.
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+SNIPPET_ELLIPSIS = "…"
+
+# ts_headline options for short fields (whole value) and long fields (fragments)
+HEADLINE_ALL = f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}", HighlightAll=true'
+HEADLINE_FRAGMENTS = (
+    f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}", '
+    f"MaxFragments=2, MaxWords=24, MinWords=8, FragmentDelimiter=' {SNIPPET_ELLIPSIS} '"
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_postgresql(db: Session) -> bool:
+    """Whether the session is bound to PostgreSQL (otherwise the FTS5 fallback is used)"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def search_vector(*weighted_columns: tuple[ColumnElement, str]) -> ColumnElement:
+    """Weighted tsvector document over (column, weight) pairs
+
+    Only constants are used so the expression can back an expression index and be
+    matched by the planner when the same expression appears in a query.
+    """
+    document = None
+    for column, weight in weighted_columns:
+        vector = func.setweight(
+            func.to_tsvector(TS_CONFIG, func.coalesce(column, text("''"))),
+            text(f"'{weight}'"),
+        )
+        document = vector if document is None else document.op("||")(vector)
+    return document
+
+
+def websearch_query(search_term: str) -> ColumnElement:
+    """tsquery for free-form user input (quoted phrases, OR, -exclusion)"""
+    return func.websearch_to_tsquery(TS_CONFIG, search_term)
+
+
+def fts5_query(search_term: str) -> str:
+    """FTS5 MATCH expression for free-form user input
+
+    Every word is quoted so FTS5 operators typed by users are matched literally; the
+    last word is matched as a prefix to support search-as-you-type.
+    """
+    tokens = _TOKEN_RE.findall(search_term)
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def render_highlight(value: str | None) -> str | None:
+    """HTML for a highlight or snippet: the text escaped, matched terms in <mark> tags
+
+    Titles, descriptions and transcripts are user content, so everything the
+    database returned is escaped and only the highlight markers become markup.
+    """
+    if value is None:
+        return None
+    return html.escape(value).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+
+def attach_fts5_index(table: Table, key: str, columns: Sequence[str]) -> None:
+    """Create and maintain an FTS5 index named <table>_fts over columns on SQLite
+
+    The index is external-content, so it stores only the inverted index and reads
+    column values from the source table, using key as its rowid.
+    """
+    name = f"{table.name}_fts"
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    insert_new = f"INSERT INTO {name}(rowid, {column_list}) VALUES (new.{key}, {new_values});"
+    delete_old = (
+        f"INSERT INTO {name}({name}, rowid, {column_list}) "
+        f"VALUES ('delete', old.{key}, {old_values});"
+    )
+
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"{column_list}, content='{table.name}', content_rowid='{key}')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table.name} "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table.name} "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {column_list} ON {table.name} "
+        f"BEGIN {delete_old} {insert_new} END",
+        # Index any rows already present
+        f"INSERT INTO {name}({name}) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(
+        table, "before_drop", DDL(f"DROP TABLE IF EXISTS {name}").execute_if(dialect="sqlite")
+    )
@@ -0,0 +1,126 @@
+"""
+Instrumented connection pools
+
+QueuePool subclasses that record how long each checkout waited, how often the
+overflow connections were needed and how many checkouts timed out, so the pool
+settings in app.core.config can be sized from real numbers.
+"""
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+# Upper bounds (in seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0)
+
+
+class PoolMetrics:
+    """Running checkout counters for a single pool"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record_checkout(self, wait: float, checked_out: int, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if overflow:
+                self.overflow_checkouts += 1
+            self.wait_histogram[self._bucket(wait)] += 1
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_max = max(self.wait_max, wait)
+            self.wait_histogram[self._bucket(wait)] += 1
+
+    @staticmethod
+    def _bucket(wait: float) -> int:
+        for index, bound in enumerate(WAIT_BUCKETS):
+            if wait < bound:
+                return index
+        return len(WAIT_BUCKETS)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            labels = [f"<{int(bound * 1000)}ms" for bound in WAIT_BUCKETS]
+            labels.append(f">={int(WAIT_BUCKETS[-1] * 1000)}ms")
+            return {
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "checkout_wait_avg_ms": (
+                    self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0
+                ),
+                "checkout_wait_max_ms": self.wait_max * 1000,
+                "checkout_wait_histogram": dict(zip(labels, self.wait_histogram)),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time, overflow use and timeouts"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        checked_out = self.checkedout()
+        self.metrics.record_checkout(
+            time.perf_counter() - start, checked_out, overflow=checked_out > self.size()
+        )
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        # Keep the counters across engine.dispose()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> dict[str, Any]:
+        """Current pool state plus the recorded checkout metrics"""
+        return {
+            "pool_class": type(self).__name__,
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout": self.timeout(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            **self.metrics.snapshot(),
+        }
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Instrumented pool for the asyncio engine"""
+
+
+def get_pool_stats(engine_name: str, pool: Any) -> dict[str, Any]:
+    """Describe a pool, including checkout metrics when it is instrumented"""
+    if isinstance(pool, InstrumentedQueuePool):
+        return {"engine": engine_name, "instrumented": True, **pool.stats()}
+    return {
+        "engine": engine_name,
+        "instrumented": False,
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
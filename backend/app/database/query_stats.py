@@ -0,0 +1,176 @@
+"""
+Per-request SQL statement statistics
+
+Cursor execute events on the engines record the duration of every statement into
+the QueryStats of the current request, found through a context variable, so the
+thread pool and AsyncSession paths are both counted. QueryStatsMiddleware tracks
+each HTTP request, logs statement shapes repeated often enough to be a probable
+N+1 pattern, adds X-DB-Queries / Server-Timing headers in debug mode and, in
+strict mode, fails requests that run more statements than their route's budget.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Bind parameter markers of the supported drivers: qmark, pyformat, numeric_dollar
+_PARAM = r"(?:\?|%s|%\(\w+\)s|\$\d+)"
+# Parenthesized lists of parameters, as in expanded IN clauses and VALUES rows
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+# Consecutive VALUES rows of a multi-row INSERT, once collapsed to (?)
+_REPEATED_ROWS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request runs more statements than its budget"""
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace, IN lists and VALUES rows normalized
+
+    Statements that differ only in how many values were bound share a shape, so
+    the same query issued per row of a result is recognized as a repeat.
+    """
+    shape = " ".join(statement.split())
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _REPEATED_ROWS.sub("(?)", shape)
+
+
+class QueryStats:
+    """Statements run while tracking was active, with their total duration"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0  # Seconds spent executing statements
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes run at least threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record the statements run within the block, including in worker threads it starts
+
+    Also usable in tests to assert on the statement count of a call.
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    start = getattr(context, "_query_stats_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record the statements of an engine (the sync_engine of an AsyncEngine) while tracking"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """Set the most statements a route may run in strict mode
+
+    Apply below the router decorator:
+
+        @router.get("/{task_id}")
+        @query_budget(3)
+        async def read_task(...): ...
+    """
+
+    def decorator(endpoint: F) -> F:
+        endpoint.query_budget = max_queries
+        return endpoint
+
+    return decorator
+
+
+class QueryStatsMiddleware:
+    """Track the statements of each HTTP request and report them before the response starts"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        headers: bool = False,
+        strict: bool = False,
+        default_budget: int = 0,
+        n_plus_one_threshold: int = 0,
+    ) -> None:
+        self.app = app
+        self.headers = headers
+        self.strict = strict
+        self.default_budget = default_budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    self._report(scope, stats)
+                    if self.headers:
+                        headers = MutableHeaders(scope=message)
+                        headers.append("X-DB-Queries", str(stats.count))
+                        headers.append(
+                            "Server-Timing",
+                            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+                        )
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        route = f"{scope['method']} {scope['path']}"
+        if self.n_plus_one_threshold:
+            for shape, count in stats.repeated(self.n_plus_one_threshold):
+                logger.warning(
+                    "Probable N+1 in %s: statement ran %d times: %.200s", route, count, shape
+                )
+
+        if self.strict:
+            # The router leaves the matched endpoint in the scope
+            endpoint = scope.get("endpoint")
+            budget = getattr(endpoint, "query_budget", self.default_budget)
+            if budget and stats.count > budget:
+                raise QueryBudgetExceeded(
+                    f"{route} ran {stats.count} queries, its budget is {budget}"
+                )
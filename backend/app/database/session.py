@@ -1,20 +1,131 @@
+import time
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from anyio import to_thread
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.database.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from app.database.query_stats import instrument_engine
+
+T = TypeVar("T")
+
+# asyncio drivers used in place of the sync driver when DATABASE_ASYNC is enabled
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
 
 database_url = settings.DATABASE_URL or "sqlite://"
 
-engine = create_engine(database_url, pool_pre_ping=True)
+
+def get_pool_options(url: str, *, use_async: bool = False) -> dict[str, Any]:
+    """Connection pool arguments for create_engine, taken from settings"""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite uses its own single-file pools; the QueuePool sizing does not apply
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if use_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(database_url, **get_pool_options(database_url))
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(url: str) -> URL:
+    """Swap the sync driver of a database URL for its asyncio counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver available for database backend '{backend}'")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+# Async engine, only built when enabled so the async drivers stay optional
+async_engine = (
+    create_async_engine(
+        get_async_database_url(database_url), **get_pool_options(database_url, use_async=True)
+    )
+    if settings.DATABASE_ASYNC
+    else None
+)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+# expire_on_commit is off because expired attributes cannot be lazily
+# reloaded once control is back on the event loop
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
 Base = declarative_base()
 
-# Dependency, used in API
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close() 
\ No newline at end of file
+
+class DBSession:
+    """Request-scoped database session handed to endpoints by deps.get_db
+
+    Endpoints call run_sync() with a crud function, which runs on an AsyncSession
+    when DATABASE_ASYNC is enabled and in the worker thread pool otherwise.
+
+    The underlying session is only created on the first run_sync() call, and its
+    transaction is ended after every call so the pooled connection is returned as
+    soon as the handler's DB work is done, not after the response is serialized.
+    Loaded objects stay usable afterwards since expire_on_commit is off.
+    """
+
+    def __init__(self) -> None:
+        self._session: AsyncSession | Session | None = None
+        # Seconds spent in run_sync() calls and how many were made
+        self.db_time = 0.0
+        self.db_calls = 0
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        start = time.perf_counter()
+        try:
+            if AsyncSessionLocal is not None:
+                return await self._run_async(fn, *args, **kwargs)
+            return await to_thread.run_sync(partial(self._run_threaded, fn, *args, **kwargs))
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_calls += 1
+
+    async def _run_async(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._session is None:
+            self._session = AsyncSessionLocal()
+        try:
+            result = await self._session.run_sync(fn, *args, **kwargs)
+            await self._session.commit()
+        except BaseException:
+            await self._session.rollback()
+            raise
+        return result
+
+    def _run_threaded(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._session is None:
+            self._session = SessionLocal(expire_on_commit=False)
+        try:
+            result = fn(self._session, *args, **kwargs)
+            self._session.commit()
+        except BaseException:
+            self._session.rollback()
+            raise
+        return result
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+        if isinstance(self._session, AsyncSession):
+            await self._session.close()
+        else:
+            await to_thread.run_sync(self._session.close)
+        self._session = None
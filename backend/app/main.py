@@ -4,14 +4,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.api_v1.endpoints.discord import router as discord_router
 from app.api.api_v1.endpoints.login import router as login_router
 from app.api.api_v1.endpoints.meeting_records import router as meeting_records_router
+from app.api.api_v1.endpoints.metrics import router as metrics_router
 from app.api.api_v1.endpoints.portfolios import router as portfolios_router
 from app.api.api_v1.endpoints.roles import router as roles_router
 from app.api.api_v1.endpoints.task_assignments import router as task_assignments_router
 from app.api.api_v1.endpoints.tasks import router as tasks_router
 from app.api.api_v1.endpoints.users import router as user_router
 from app.core.config import settings
+from app.database.query_stats import QueryStatsMiddleware
+from app.utils.serialization import FastJSONResponse
 
-app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
+)
 
 # Convert CORS origins to list if it's a string
 cors_origins = settings.BACKEND_CORS_ORIGINS
@@ -25,8 +32,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers read the keyset pagination cursor of list endpoints and the debug timings
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "Server-Timing"],
 )
 
+# Count SQL statements and DB time per request
+if settings.DEBUG or settings.DB_N_PLUS_ONE_THRESHOLD or settings.DB_QUERY_STRICT:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        headers=settings.DEBUG,
+        strict=settings.DB_QUERY_STRICT,
+        default_budget=settings.DB_QUERY_BUDGET,
+        n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD,
+    )
+
 # Authentication and user management
 app.include_router(login_router, prefix=settings.API_V1_STR, tags=["Login"])
 app.include_router(user_router, prefix=settings.API_V1_USERS_STR, tags=["Users"])
@@ -49,6 +68,9 @@ app.include_router(
     tags=["Task Assignments"],
 )
 
+# Operations
+app.include_router(metrics_router, prefix=f"{settings.API_V1_STR}/metrics", tags=["Metrics"])
+
 
 @app.get("/")
 def root():
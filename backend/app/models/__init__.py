@@ -2,15 +2,21 @@
 from app.models.user import User
 from app.models.role import Role
 from app.models.portfolio import Portfolio
+from app.models.portfolio_stats import PortfolioStats
 from app.models.task import Task
+from app.models.task_closure import TaskClosure
 from app.models.meeting_record import MeetingRecord
 from app.models.task_assignment import TaskAssignment
+from app.models.idempotency_key import IdempotencyKey
 
 __all__ = [
     "User",
     "Role", 
     "Portfolio",
+    "PortfolioStats",
     "Task",
+    "TaskClosure",
     "MeetingRecord",
     "TaskAssignment",
+    "IdempotencyKey",
 ] 
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import ForeignKey, String, Text, DateTime, Boolean
+from sqlalchemy import DDL, ForeignKey, String, Text, DateTime, Boolean, Index, event, literal_column
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
+from app.database.fulltext import attach_fts5_index
 from app.database.session import Base
 
 if TYPE_CHECKING:
@@ -10,16 +11,48 @@ if TYPE_CHECKING:
 
 class MeetingRecord(Base):
     __tablename__ = "meeting_records"
+    # Composite indexes matching the (meeting_date, meeting_id) keyset pagination order
+    __table_args__ = (
+        Index("ix_meeting_records_meeting_date_meeting_id", "meeting_date", "meeting_id"),
+        Index("ix_meeting_records_portfolio_id_meeting_date_meeting_id", "portfolio_id", "meeting_date", "meeting_id"),
+    )
 
     meeting_id: Mapped[int] = mapped_column(primary_key=True, index=True)
     meeting_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     meeting_name: Mapped[str] = mapped_column(String, nullable=False)
     recording_file_link: Mapped[str | None] = mapped_column(Text, nullable=True)
-    auto_caption: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Full meeting transcript; deferred so list queries never load it
+    auto_caption: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     portfolio_id: Mapped[int] = mapped_column(ForeignKey("portfolios.portfolio_id"), nullable=False)
     user_can_see: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
     # Relationships
     portfolio: Mapped["Portfolio"] = relationship("Portfolio", back_populates="meeting_records")
-    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="source_meeting") 
\ No newline at end of file
+    tasks: Mapped[list["Task"]] = relationship("Task", back_populates="source_meeting") 
+
+
+# Weighted full-text document (name > summary > transcript) kept by PostgreSQL in a
+# stored generated column with a GIN index. It is not mapped so it is never loaded;
+# SQLite searches the meeting_records_fts FTS5 table instead
+meeting_search_vector = literal_column("meeting_records.search_vector")
+MEETING_SEARCH_VECTOR_DDL = """
+    ALTER TABLE meeting_records ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(meeting_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(auto_caption, '')), 'C')
+    ) STORED
+"""
+event.listen(
+    MeetingRecord.__table__,
+    "after_create",
+    DDL(MEETING_SEARCH_VECTOR_DDL).execute_if(dialect="postgresql"),
+)
+event.listen(
+    MeetingRecord.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_meeting_records_search_vector ON meeting_records USING gin (search_vector)"
+    ).execute_if(dialect="postgresql"),
+)
+attach_fts5_index(MeetingRecord.__table__, "meeting_id", ("meeting_name", "summary", "auto_caption"))
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.session import Base
+
+
+class PortfolioStats(Base):
+    """Materialized per-portfolio counters, see crud.portfolio_stats"""
+
+    __tablename__ = "portfolio_stats"
+
+    portfolio_id: Mapped[int] = mapped_column(
+        ForeignKey("portfolios.portfolio_id", ondelete="CASCADE"), primary_key=True
+    )
+    user_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    active_task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    meeting_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.database.fulltext import attach_fts5_index, search_vector
 from app.database.session import Base
 
 if TYPE_CHECKING:
@@ -15,6 +16,14 @@ if TYPE_CHECKING:
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Composite indexes matching the (deadline, task_id) keyset pagination order
+    __table_args__ = (
+        Index("ix_tasks_deadline_task_id", "deadline", "task_id"),
+        Index("ix_tasks_portfolio_id_deadline_task_id", "portfolio_id", "deadline", "task_id"),
+        Index("ix_tasks_created_by_deadline_task_id", "created_by", "deadline", "task_id"),
+        # Reminder lookups filter open statuses within a deadline window
+        Index("ix_tasks_status_deadline", "status", "deadline"),
+    )
 
     task_id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -50,3 +59,12 @@ class Task(Base):
     task_assignments: Mapped[list["TaskAssignment"]] = relationship(
         "TaskAssignment", back_populates="task"
     )
+
+
+# Weighted full-text document of a task (title ranks above description), GIN indexed
+# on PostgreSQL; SQLite searches the tasks_fts FTS5 table instead
+task_search_vector = search_vector((Task.title, "A"), (Task.description, "B"))
+Index("ix_tasks_search_vector", task_search_vector, postgresql_using="gin").ddl_if(
+    dialect="postgresql"
+)
+attach_fts5_index(Task.__table__, "task_id", ("title", "description"))
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database.session import Base
@@ -12,6 +12,11 @@ if TYPE_CHECKING:
 
 class TaskAssignment(Base):
     __tablename__ = "task_assignments"
+    __table_args__ = (
+        Index("ix_task_assignments_user_id_task_id", "user_id", "task_id"),
+        # A user is assigned to a task at most once; also the conflict target of bulk inserts
+        Index("uq_task_assignments_task_id_user_id", "task_id", "user_id", unique=True),
+    )
 
     assignment_id: Mapped[int] = mapped_column(primary_key=True, index=True)
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.task_id"), nullable=False)
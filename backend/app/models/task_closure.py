@@ -0,0 +1,24 @@
+from sqlalchemy import ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.session import Base
+
+
+class TaskClosure(Base):
+    """Transitive closure of the task hierarchy, see crud.task_closure
+
+    Every task has a (task, task, 0) row plus one row per ancestor, with depth
+    being the number of levels between the two.
+    """
+
+    __tablename__ = "task_closure"
+    # Ancestor lookups (root of a task, ancestor checks) go through descendant_id
+    __table_args__ = (Index("ix_task_closure_descendant_id_depth", "descendant_id", "depth"),)
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -57,6 +57,17 @@ class MeetingRecordListResponse(BaseModel):
         from_attributes = True
 
 
+# Used for full-text search results (snippets instead of the full transcript)
+class MeetingRecordSearchResponse(MeetingRecordListResponse):
+    rank: float  # Relevance, higher is better
+    name_highlight: str | None = None  # Meeting name with matched terms wrapped in <mark>
+    summary_snippet: str | None = None  # Matching fragments of the summary
+    caption_snippet: str | None = None  # Matching fragments of the transcript
+    
+    class Config:
+        from_attributes = True
+
+
 # Used for meeting record detail with related tasks
 class MeetingRecordDetailResponse(MeetingRecordResponse):
     # Include related tasks if needed (imported from task schemas)
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+
+# Used for connection pool usage reports
+class PoolStatsResponse(BaseModel):
+    engine: str  # "sync" or "async"
+    instrumented: bool
+    pool_class: str
+    status: str | None = None  # Only for pools without instrumentation (SQLite)
+
+    # Current pool state
+    size: int | None = None
+    max_overflow: int | None = None
+    timeout: float | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+
+    # Counters since startup
+    checkouts: int | None = None
+    overflow_checkouts: int | None = None
+    timeouts: int | None = None
+    peak_checked_out: int | None = None
+    checkout_wait_avg_ms: float | None = None
+    checkout_wait_max_ms: float | None = None
+    checkout_wait_histogram: dict[str, int] | None = None
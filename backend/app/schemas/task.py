@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, computed_field
 
@@ -29,6 +30,18 @@ class TaskUpdate(BaseModel):
     source_meeting_id: int | None = None
 
 
+# One task's changes in a batch update; unset or None fields are left unchanged
+class TaskBatchUpdateItem(BaseModel):
+    task_id: int
+    status: str | None = None
+    priority: str | None = None
+    deadline: datetime | None = None  # Naive values are in the project timezone
+
+
+class TaskBatchUpdateRequest(BaseModel):
+    updates: list[TaskBatchUpdateItem]
+
+
 class TaskCreatedByResponse(BaseModel):
     user_id: int
     username: str
@@ -81,6 +94,53 @@ class TaskListResponse(BaseModel):
 TaskListResponse.model_rebuild()
 
 
+# Used for full-text search results
+class TaskSearchResponse(TaskListResponse):
+    rank: float  # Relevance, higher is better
+    title_highlight: str | None = None  # Title with matched terms wrapped in <mark>
+    description_highlight: str | None = None  # Matching fragments of the description
+
+    class Config:
+        from_attributes = True
+
+
+# Output layouts of a task subtree
+class TaskTreeFormat(str, Enum):
+    FLAT = "flat"  # Every node in one list, parents before children, linked by parent_task_id
+    NESTED = "nested"  # The root with descendants nested under subtasks
+
+
+# Node of a task subtree; subtasks is None for nodes at the depth limit
+class TaskTreeNodeResponse(TaskListResponse):
+    depth: int  # Distance from the root task
+    subtasks: list["TaskTreeNodeResponse"] | None = None
+
+    class Config:
+        from_attributes = True
+
+
+TaskTreeNodeResponse.model_rebuild()
+
+
+# Used for a task's whole subtree
+class TaskTreeResponse(BaseModel):
+    root_task_id: int
+    format: TaskTreeFormat
+    max_depth: int
+    total_count: int
+    tasks: list[TaskTreeNodeResponse]  # All nodes when flat, only the root when nested
+
+
+# Completion rollup of all subtasks below a task
+class TaskProgressResponse(BaseModel):
+    task_id: int
+    subtask_count: int  # Subtasks at any depth, excluding the task itself
+    completed_count: int
+    completed_percent: float | None = None  # None when the task has no subtasks
+    max_depth: int  # Levels of subtasks below the task
+    status_counts: dict[str, int]
+
+
 # Used for task detail with relationships
 class TaskDetailResponse(TaskResponse):
     # Include subtasks if needed
@@ -146,6 +206,20 @@ class TomorrowRemindersResponse(BaseModel):
     total_count: int
 
 
+# Named due windows for reminders, evaluated in the project timezone
+class DueWindow(str, Enum):
+    OVERDUE = "overdue"
+    TODAY = "today"
+    TOMORROW = "tomorrow"
+    NEXT_7_DAYS = "next_7_days"
+
+
+# Response for reminders in any due window
+class DueRemindersResponse(TomorrowRemindersResponse):
+    window_start: datetime | None = None  # UTC, None for overdue (no lower bound)
+    window_end: datetime  # UTC, exclusive
+
+
 # Task Group schemas for bulk operations
 class TaskGroupItem(BaseModel):
     """Single task item in a task group"""
@@ -171,12 +245,20 @@ class TaskGroupCreateRequest(BaseModel):
         from_attributes = True
 
 
+class TaskGroupItemError(BaseModel):
+    """Validation error of a task group item, which was skipped with its subtasks"""
+
+    path: str  # e.g. "tasks[0].subtasks[2]"
+    detail: str
+
+
 class TaskGroupCreateResponse(BaseModel):
     """Response for task group creation"""
 
-    created_task_ids: list[int]
-    total_created: int
+    created_task_ids: list[int]  # Top-level tasks
+    total_created: int  # Tasks created at all levels
     message: str
+    errors: list[TaskGroupItemError] = []
 
     class Config:
         from_attributes = True
@@ -46,6 +46,12 @@ class BulkTaskAssignmentCreate(BaseModel):
     user_ids: list[int]
 
 
+# Used to assign every listed user to every listed task, e.g. after creating a task group
+class MultiTaskAssignmentCreate(BaseModel):
+    task_ids: list[int]
+    user_ids: list[int]
+
+
 # Used for user's task assignments view
 class UserTaskAssignmentResponse(BaseModel):
     assignment_id: int
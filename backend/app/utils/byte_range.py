@@ -0,0 +1,49 @@
+"""
+HTTP byte range utilities
+
+Parses single-range Range headers (RFC 9110) for endpoints that serve large text
+fields in pieces. Multi-range requests are not supported.
+"""
+
+import re
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a requested range lies outside the resource"""
+
+
+def parse_byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a Range header into an inclusive (start, end) byte range
+
+    Args:
+        header: Range header value, e.g. "bytes=0-1023", "bytes=1024-" or "bytes=-500"
+        size: total size of the resource in bytes
+
+    Returns:
+        (start, end) clamped to the resource, or None if the header is malformed or
+        uses an unsupported form, in which case the whole resource should be served
+
+    Raises:
+        RangeNotSatisfiable: if the range does not overlap the resource
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.group(1), match.group(2)
+    if first == "":
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination utilities
+
+List endpoints return the sort key of the last row of a full page as an opaque
+cursor in the X-Next-Cursor response header. Passing it back as ?cursor= fetches
+the rows after it with a WHERE on the sort key, so deep pages cost the same as
+the first one and rows do not shift between pages when data changes.
+"""
+
+import base64
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import Response
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def encode_cursor(row: Any, keys: Sequence[str]) -> str:
+    """Build the cursor pointing after a row (ORM object or dict) for the given sort keys"""
+    if isinstance(row, dict):
+        values = [row[key] for key in keys]
+    else:
+        values = [getattr(row, key) for key in keys]
+    payload = {"k": list(keys), "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> list[Any]:
+    """Decode a cursor into sort key values, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["k"] != list(keys) or len(payload["v"]) != len(keys):
+            raise ValueError
+        return [_decode_value(value) for value in payload["v"]]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor") from None
+
+
+def next_cursor(rows: Sequence[Any], keys: Sequence[str], limit: int) -> str | None:
+    """Cursor of the page after rows, or None when this was the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    return encode_cursor(rows[-1], keys)
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence[Any], keys: Sequence[str], limit: int
+) -> None:
+    """Expose the cursor of the next page, if any, in the response headers"""
+    cursor = next_cursor(rows, keys, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[Any],
+    keys: Sequence[str],
+    *,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+) -> Query:
+    """Order a query by its sort key columns and apply keyset or offset pagination
+
+    The cursor takes precedence over skip; without one the query falls back to
+    offset pagination on the same stable ordering.
+    """
+    if descending:
+        query = query.order_by(*(column.desc() for column in columns))
+    else:
+        query = query.order_by(*columns)
+
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        key = tuple_(*columns)
+        after = tuple_(*(literal(value, column.type) for column, value in zip(columns, values)))
+        query = query.filter(key < after if descending else key > after)
+    elif skip:
+        query = query.offset(skip)
+
+    return query.limit(limit)
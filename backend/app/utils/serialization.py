@@ -0,0 +1,57 @@
+"""
+Fast JSON serialization for list endpoints
+
+Returning a response model from an endpoint costs three passes per object:
+building the model, validating it again against response_model and encoding the
+result. List endpoints instead encode ORM rows straight into plain dicts shaped
+like their response schema and return them in a FastJSONResponse, which FastAPI
+sends as-is. response_model is kept on those routes for the OpenAPI schema, so
+the encoders below must stay in sync with the schemas they mirror.
+
+Run benchmarks/serialization.py to compare both paths.
+"""
+
+from datetime import datetime
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.models.meeting_record import MeetingRecord
+from app.models.portfolio import Portfolio
+
+# UTC datetimes end in "Z", matching Pydantic's JSON output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON response rendered by orjson with the same datetime format as Pydantic"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def encode_meeting_list_item(meeting: MeetingRecord) -> dict:
+    """MeetingRecordListResponse fields of a meeting record with its portfolio loaded"""
+    meeting_date = meeting.meeting_date
+    return {
+        "meeting_id": meeting.meeting_id,
+        "meeting_date": meeting_date.date() if isinstance(meeting_date, datetime) else meeting_date,
+        "meeting_name": meeting.meeting_name,
+        "portfolio_id": meeting.portfolio_id,
+        "user_can_see": meeting.user_can_see,
+        "has_recording": bool(meeting.recording_file_link),
+        "has_summary": bool(meeting.summary),
+        "summary": meeting.summary,
+        "portfolio_name": meeting.portfolio.name if meeting.portfolio else None,
+    }
+
+
+def encode_portfolio_list_item(portfolio: Portfolio) -> dict:
+    """PortfolioListResponse fields of a portfolio"""
+    return {
+        "portfolio_id": portfolio.portfolio_id,
+        "name": portfolio.name,
+        "description": portfolio.description,
+        "has_channel": bool(portfolio.channel_id),
+    }
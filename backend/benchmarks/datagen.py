@@ -0,0 +1,240 @@
+"""
+Seeded synthetic data for benchmarks
+
+Fills an empty database through the application models: portfolios, users with
+the three roles, nested task trees with assignments, and meetings whose
+transcripts are as long as a real recorded meeting. The same seed and size
+always produce the same rows, so runs on different commits are comparable.
+
+    cd backend
+    DATABASE_URL=sqlite:///benchmark.db python -m benchmarks.datagen --size small --reset
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import portfolio_stats, task_closure
+from app.database.session import Base, SessionLocal, engine
+from app.models import MeetingRecord, Portfolio, Role, Task, TaskAssignment, User
+
+# Role and portfolio IDs the application relies on
+ROLE_NAMES = {1: "user", 2: "admin", 3: "director"}
+NO_PORTFOLIO_ID = 100
+
+TASK_STATUSES = ("Not Started", "In Progress", "Completed", "Pending")
+TASK_STATUS_WEIGHTS = (4, 3, 3, 1)
+TASK_PRIORITIES = ("Low", "Medium", "High")
+
+WORDS = (
+    "agenda action budget sponsor workshop event venue speaker marketing poster social "
+    "launch review deadline design website backend frontend database deploy model dataset "
+    "training paper reading group hackathon prize judge volunteer roster survey feedback "
+    "newsletter email discord channel meeting minutes recording summary task owner update "
+    "progress blocker risk timeline schedule week term semester members committee director"
+).split()
+SPEAKERS = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie")
+
+
+@dataclass(frozen=True)
+class DataSize:
+    """Row counts of a generated data set"""
+
+    portfolios: int
+    users: int
+    root_tasks: int
+    max_subtasks: int  # Each task gets 0..max_subtasks children
+    max_depth: int  # Levels of subtasks below each root task
+    max_assignees: int  # Each task gets 0..max_assignees assigned users
+    meetings: int
+    transcript_words: int  # Average transcript length, about 130 words per spoken minute
+
+
+SIZES = {
+    "small": DataSize(
+        portfolios=5,
+        users=50,
+        root_tasks=200,
+        max_subtasks=2,
+        max_depth=2,
+        max_assignees=2,
+        meetings=20,
+        transcript_words=2_000,
+    ),
+    "medium": DataSize(
+        portfolios=12,
+        users=300,
+        root_tasks=2_000,
+        max_subtasks=3,
+        max_depth=3,
+        max_assignees=3,
+        meetings=200,
+        transcript_words=8_000,
+    ),
+    "large": DataSize(
+        portfolios=20,
+        users=1_000,
+        root_tasks=10_000,
+        max_subtasks=3,
+        max_depth=4,
+        max_assignees=3,
+        meetings=1_000,
+        transcript_words=8_000,
+    ),
+}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _transcript(rng: random.Random, words: int) -> str:
+    """Speaker-labelled lines adding up to about the given number of words"""
+    lines = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(5, 40))
+        lines.append(f"{rng.choice(SPEAKERS)}: {_sentence(rng, length)}")
+        remaining -= length
+    return "\n".join(lines)
+
+
+def generate(db: Session, size: DataSize, *, seed: int = 0) -> dict[str, int]:
+    """Insert a data set into an empty database and commit, return the row counts
+
+    Deadlines are spread from 30 days ago to 60 days ahead of today, so every
+    reminder window has tasks. User 1 is an admin and user 2 a director, both
+    with assigned tasks.
+    """
+    rng = random.Random(seed)
+    today = datetime.combine(datetime.utcnow().date(), time.min)
+
+    db.add_all(Role(role_id=role_id, role_name=name) for role_id, name in ROLE_NAMES.items())
+    portfolios = [Portfolio(portfolio_id=NO_PORTFOLIO_ID, name="No Portfolio")]
+    portfolios += [
+        Portfolio(
+            portfolio_id=NO_PORTFOLIO_ID + index,
+            name=f"Portfolio {index}",
+            description=_sentence(rng, 12),
+            channel_id=str(10**17 + index) if index % 3 else None,
+        )
+        for index in range(1, size.portfolios + 1)
+    ]
+    db.add_all(portfolios)
+    db.flush()
+
+    users = [
+        User(
+            user_id=index,
+            email=f"user{index}@example.com",
+            username=f"user{index}",
+            role_id=2 if index == 1 else 3 if index == 2 else rng.choice((1, 1, 1, 3)),
+            discord_id=str(2 * 10**17 + index) if rng.random() < 0.8 else None,
+            portfolio_id=rng.choice(portfolios[1:]).portfolio_id,
+        )
+        for index in range(1, size.users + 1)
+    ]
+    db.add_all(users)
+    db.flush()
+
+    meetings = []
+    for index in range(size.meetings):
+        portfolio = rng.choice(portfolios[1:])
+        words = max(1, int(size.transcript_words * rng.uniform(0.5, 1.5)))
+        meetings.append(
+            MeetingRecord(
+                meeting_date=today - timedelta(days=rng.randint(0, 365)),
+                meeting_name=f"{portfolio.name} meeting {index + 1}: {_sentence(rng, 4)}",
+                recording_file_link=f"recordings/meeting_{index + 1}.mp3",
+                auto_caption=_transcript(rng, words),
+                summary=_sentence(rng, rng.randint(40, 120)),
+                portfolio_id=portfolio.portfolio_id,
+                user_can_see=rng.random() < 0.9,
+            )
+        )
+    db.add_all(meetings)
+    db.flush()
+
+    def new_task(parent: Task | None) -> Task:
+        portfolio_id = parent.portfolio_id if parent else rng.choice(portfolios[1:]).portfolio_id
+        meeting = rng.choice(meetings) if meetings and rng.random() < 0.3 else None
+        created = today - timedelta(days=rng.randint(30, 90))
+        return Task(
+            title=_sentence(rng, rng.randint(3, 8)).rstrip("."),
+            description=_sentence(rng, rng.randint(10, 60)),
+            status=rng.choices(TASK_STATUSES, TASK_STATUS_WEIGHTS)[0],
+            priority=rng.choice(TASK_PRIORITIES),
+            deadline=today + timedelta(days=rng.randint(-30, 60), hours=rng.randint(0, 23)),
+            portfolio_id=portfolio_id,
+            parent_task_id=parent.task_id if parent else None,
+            source_meeting_id=meeting.meeting_id if meeting else None,
+            created_by=rng.choice(users).user_id,
+            created_at=created,
+            updated_at=created,
+        )
+
+    # Insert one tree level at a time so parent IDs exist and the closure can follow
+    level = [new_task(None) for _ in range(size.root_tasks)]
+    tasks = []
+    for depth in range(size.max_depth + 1):
+        db.add_all(level)
+        db.flush()
+        task_closure.add_tasks(db, [task.task_id for task in level])
+        tasks += level
+        if depth == size.max_depth:
+            break
+        level = [
+            new_task(parent) for parent in level for _ in range(rng.randint(0, size.max_subtasks))
+        ]
+
+    assignments = []
+    for task in tasks:
+        assignees = rng.sample(users, rng.randint(0, min(size.max_assignees, len(users))))
+        if task.task_id % 10 == 0:
+            # Keep the admin and director's own task lists populated
+            assignees += [user for user in users[:2] if user not in assignees]
+        assignments += [
+            TaskAssignment(task_id=task.task_id, user_id=user.user_id) for user in assignees
+        ]
+    db.add_all(assignments)
+    db.flush()
+
+    if settings.PORTFOLIO_STATS_MATERIALIZED:
+        portfolio_stats.refresh(db)
+    db.commit()
+
+    return {
+        "portfolios": len(portfolios),
+        "users": len(users),
+        "tasks": len(tasks),
+        "task_assignments": len(assignments),
+        "meetings": len(meetings),
+    }
+
+
+def reset_schema() -> None:
+    """Drop and recreate all tables of the configured database"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="medium")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset_schema()
+    with SessionLocal() as db:
+        counts = generate(db, SIZES[args.size], seed=args.seed)
+    print(", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
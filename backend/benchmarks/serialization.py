@@ -0,0 +1,176 @@
+"""
+Per-row cost of serializing list responses
+
+Compares the previous path of list endpoints (build a dict or response model per
+row, let FastAPI validate the list against response_model and encode it with the
+standard json module) with the current one (encode ORM rows into plain dicts and
+render them with orjson through FastJSONResponse).
+
+Runs on transient ORM objects, so no database is needed:
+
+    cd backend
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from app.crud.task import _build_task_list_response_data
+from app.models import MeetingRecord, Portfolio, Task, TaskAssignment, User
+from app.schemas.meeting_record import MeetingRecordListResponse
+from app.schemas.portfolio import PortfolioListResponse
+from app.schemas.task import TaskListResponse
+from app.utils.serialization import (
+    FastJSONResponse,
+    encode_meeting_list_item,
+    encode_portfolio_list_item,
+)
+
+
+def build_rows(count: int) -> tuple[list[Task], list[MeetingRecord], list[Portfolio]]:
+    """Transient tasks (each with two subtasks and two assignees), meetings and portfolios"""
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    portfolios = [
+        Portfolio(
+            portfolio_id=index,
+            name=f"Portfolio {index}",
+            description="Benchmark portfolio",
+            channel_id=str(10**17 + index) if index % 2 else None,
+        )
+        for index in range(count)
+    ]
+    users = [
+        User(user_id=index, username=f"user{index}", email=f"user{index}@example.com")
+        for index in range(10)
+    ]
+
+    def make_task(task_id: int, parent_task_id: int | None) -> Task:
+        task = Task(
+            task_id=task_id,
+            title=f"Task {task_id}",
+            description="Benchmark task with a short description",
+            status="In Progress",
+            priority="Medium",
+            deadline=now + timedelta(days=task_id % 30),
+            parent_task_id=parent_task_id,
+            portfolio_id=portfolios[task_id % count].portfolio_id,
+            created_by=users[task_id % 10].user_id,
+            created_at=now,
+            updated_at=now,
+        )
+        task.portfolio = portfolios[task_id % count]
+        task.created_by_user = users[task_id % 10]
+        task.task_assignments = [
+            TaskAssignment(
+                assignment_id=task_id * 10 + offset,
+                task_id=task_id,
+                user_id=users[(task_id + offset) % 10].user_id,
+                user=users[(task_id + offset) % 10],
+            )
+            for offset in range(2)
+        ]
+        return task
+
+    tasks = []
+    for index in range(count):
+        task = make_task(index * 3, None)
+        task.subtasks = [make_task(index * 3 + offset, task.task_id) for offset in (1, 2)]
+        tasks.append(task)
+
+    meetings = []
+    for index in range(count):
+        meeting = MeetingRecord(
+            meeting_id=index,
+            meeting_date=date(2025, 6, 1) + timedelta(days=index % 90),
+            meeting_name=f"Meeting {index}",
+            portfolio_id=portfolios[index].portfolio_id,
+            user_can_see=True,
+            recording_file_link="https://example.com/recording" if index % 2 else None,
+            summary="Benchmark meeting summary",
+        )
+        meeting.portfolio = portfolios[index]
+        meetings.append(meeting)
+
+    return tasks, meetings, portfolios
+
+
+def response_model_render(schema: type) -> Callable[[list], bytes]:
+    """The previous path: validate against response_model, then encode with json"""
+    adapter = TypeAdapter(list[schema])
+
+    def render(content: list) -> bytes:
+        validated = adapter.validate_python(content, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+    return render
+
+
+def fast_render(content: list) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def measure(serialize: Callable[[], bytes], rows: int, repeat: int) -> float:
+    """Best time per row in microseconds over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize()
+        best = min(best, time.perf_counter() - started)
+    return best / rows * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per path, best is kept")
+    args = parser.parse_args()
+
+    tasks, meetings, portfolios = build_rows(args.rows)
+    render_tasks = response_model_render(TaskListResponse)
+    render_meetings = response_model_render(MeetingRecordListResponse)
+    render_portfolios = response_model_render(PortfolioListResponse)
+
+    cases = [
+        (
+            "TaskListResponse",
+            lambda: render_tasks([_build_task_list_response_data(task) for task in tasks]),
+            lambda: fast_render([_build_task_list_response_data(task) for task in tasks]),
+        ),
+        (
+            "MeetingRecordListResponse",
+            lambda: render_meetings(
+                [
+                    MeetingRecordListResponse(**encode_meeting_list_item(meeting))
+                    for meeting in meetings
+                ]
+            ),
+            lambda: fast_render([encode_meeting_list_item(meeting) for meeting in meetings]),
+        ),
+        (
+            "PortfolioListResponse",
+            lambda: render_portfolios(
+                [
+                    PortfolioListResponse(**encode_portfolio_list_item(portfolio))
+                    for portfolio in portfolios
+                ]
+            ),
+            lambda: fast_render(
+                [encode_portfolio_list_item(portfolio) for portfolio in portfolios]
+            ),
+        ),
+    ]
+
+    print(f"{'schema':<28}{'before µs/row':>15}{'after µs/row':>15}{'speedup':>10}")
+    for name, before, after in cases:
+        before_us = measure(before, args.rows, args.repeat)
+        after_us = measure(after, args.rows, args.repeat)
+        print(f"{name:<28}{before_us:>15.2f}{after_us:>15.2f}{before_us / after_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
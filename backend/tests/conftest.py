@@ -0,0 +1,60 @@
+"""
+Shared test fixtures
+
+Each test gets a fresh SQLite database file, or the database at TEST_DATABASE_URL
+(e.g. a disposable PostgreSQL database) when that is set.
+"""
+
+import os
+
+# The app builds its own engine from DATABASE_URL at import time; keep it in memory
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.database.query_stats import instrument_engine
+from app.database.session import Base
+from app.models import Portfolio, Role, User
+
+
+@pytest.fixture
+def engine(tmp_path):
+    url = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    instrument_engine(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine) -> sessionmaker:
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def db(session_factory) -> Session:
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user(db: Session) -> User:
+    """A user of portfolio 101, with the roles and portfolios tests refer to"""
+    db.add(Role(role_id=1, role_name="user"))
+    db.add_all(
+        [
+            Portfolio(portfolio_id=100, name="No Portfolio"),
+            Portfolio(portfolio_id=101, name="IT", channel_id="555"),
+        ]
+    )
+    db.flush()
+    user = User(user_id=1, email="user@example.com", username="user", role_id=1, portfolio_id=101)
+    db.add(user)
+    db.commit()
+    return user
@@ -0,0 +1,70 @@
+from datetime import date
+from functools import partial
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.api.api_v1.endpoints.meeting_records import _create_meeting_record
+from app.crud import idempotency
+from app.models import IdempotencyKey, MeetingRecord
+from app.schemas.meeting_record import MeetingRecordCreateRequestBody
+
+SCOPE = "POST /meeting-records/"
+
+body = MeetingRecordCreateRequestBody(
+    meeting_date=date(2025, 5, 1), meeting_name="Kickoff", portfolio_id=101
+)
+
+
+def run_once(db, create=None):
+    return idempotency.run_once(
+        db,
+        user_id=1,
+        scope=SCOPE,
+        key="key-1",
+        request_hash=idempotency.request_hash(body),
+        create=create or partial(_create_meeting_record, obj_in=body),
+    )
+
+
+def meeting_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(MeetingRecord))
+
+
+def test_key_rows_and_response_commit_together(db, user):
+    saved_responses = []
+
+    @event.listens_for(db, "before_commit")
+    def record_key(session):
+        key = session.get(IdempotencyKey, (1, SCOPE, "key-1"))
+        saved_responses.append(key.response if key else None)
+
+    response = run_once(db)
+
+    # One commit, by which time the key already holds the response
+    assert saved_responses == [response]
+    assert meeting_count(db) == 1
+
+
+def test_retry_replays_the_saved_response(db, user):
+    first = run_once(db)
+    second = run_once(db)
+
+    assert second == first
+    assert meeting_count(db) == 1
+
+
+def test_failed_create_leaves_no_key_behind(db, user):
+    def create_then_fail(session):
+        _create_meeting_record(session, obj_in=body)
+        raise RuntimeError("worker died")
+
+    with pytest.raises(RuntimeError):
+        run_once(db, create_then_fail)
+    db.rollback()
+
+    assert db.get(IdempotencyKey, (1, SCOPE, "key-1")) is None
+    assert meeting_count(db) == 0
+    # A retry creates the record instead of being told the key is in progress
+    run_once(db)
+    assert meeting_count(db) == 1
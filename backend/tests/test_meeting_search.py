@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from app.crud import meeting_record as crud_meeting_record
+from app.models import MeetingRecord
+
+
+def test_search_highlights_escape_meeting_content(db, user):
+    db.add(
+        MeetingRecord(
+            meeting_date=datetime(2025, 5, 1),
+            meeting_name="<script>alert(1)</script> kickoff",
+            summary="Agreed on the <b>kickoff</b> agenda",
+            auto_caption="welcome to the kickoff <img src=x onerror=alert(1)>",
+            portfolio_id=101,
+        )
+    )
+    db.commit()
+
+    [result] = crud_meeting_record.search_meeting_records_with_permissions(
+        db, search_term="kickoff", current_user=user
+    )
+
+    assert result["name_highlight"] == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>kickoff</mark>"
+    assert (
+        result["summary_snippet"] == "Agreed on the &lt;b&gt;<mark>kickoff</mark>&lt;/b&gt; agenda"
+    )
+    assert result["caption_snippet"] == (
+        "welcome to the <mark>kickoff</mark> &lt;img src=x onerror=alert(1)&gt;"
+    )
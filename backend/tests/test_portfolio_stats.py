@@ -0,0 +1,80 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.crud import portfolio_stats
+from app.models import PortfolioStats, Task
+
+
+@pytest.fixture
+def materialized(monkeypatch, session_factory):
+    """Keep portfolio_stats up to date in the sessions of session_factory"""
+    monkeypatch.setattr(settings, "PORTFOLIO_STATS_MATERIALIZED", True)
+    portfolio_stats.listen(session_factory)
+
+
+def new_task(title: str) -> Task:
+    return Task(
+        title=title,
+        deadline=datetime.utcnow() + timedelta(days=1),
+        portfolio_id=101,
+        created_by=1,
+    )
+
+
+def task_count(session_factory) -> int:
+    with session_factory() as db:
+        return db.get(PortfolioStats, 101).task_count
+
+
+def test_two_sessions_count_each_others_tasks(user, materialized, session_factory):
+    first, second = session_factory(), session_factory()
+    first.add(new_task("First"))
+    second.add(new_task("Second"))
+
+    first.commit()
+    second.commit()
+
+    assert task_count(session_factory) == 2
+    first.close()
+    second.close()
+
+
+def test_concurrent_commits_count_each_others_tasks(user, materialized, engine, session_factory):
+    if engine.dialect.name != "postgresql":
+        pytest.skip("SQLite runs one write transaction at a time")
+
+    first, second = session_factory(), session_factory()
+    first.add(new_task("First"))
+    second.add(new_task("Second"))
+    first.flush()
+    second.flush()
+
+    # Hold the first transaction between its stats refresh and its commit while the
+    # second one refreshes, so the second recount starts before the first commits
+    refreshed, release = threading.Event(), threading.Event()
+
+    def hold(session):
+        refreshed.set()
+        release.wait(10)
+
+    event.listen(first, "before_commit", hold)
+    committer = threading.Thread(target=first.commit)
+    committer.start()
+    refreshed.wait(10)
+
+    def release_soon():
+        time.sleep(0.5)
+        release.set()
+
+    threading.Thread(target=release_soon).start()
+    second.commit()
+    committer.join()
+
+    assert task_count(session_factory) == 2
+    first.close()
+    second.close()
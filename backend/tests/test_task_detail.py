@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from app.crud import task as crud_task
+from app.database.query_stats import track_queries
+from app.models import Task, TaskAssignment, User
+
+
+def test_get_detail_loads_subtasks_and_assignees_in_two_queries(db, user):
+    db.add(User(user_id=2, email="other@example.com", username="other", role_id=1))
+    deadline = datetime.utcnow() + timedelta(days=1)
+    parent = Task(task_id=1, title="Parent", deadline=deadline, portfolio_id=101, created_by=1)
+    subtasks = [
+        Task(
+            task_id=task_id,
+            title=f"Subtask {task_id}",
+            deadline=deadline,
+            portfolio_id=101,
+            created_by=2,
+            parent_task_id=1,
+        )
+        for task_id in (2, 3, 4)
+    ]
+    db.add_all([parent, *subtasks])
+    db.flush()
+    db.add_all(
+        [
+            TaskAssignment(task_id=task_id, user_id=user_id)
+            for task_id in (1, 2, 3, 4)
+            for user_id in (1, 2)
+        ]
+    )
+    db.commit()
+    db.expunge_all()
+
+    with track_queries() as stats:
+        detail = crud_task.get_detail(db, 1)
+
+    assert stats.count <= 2
+    assert [subtask["task_id"] for subtask in detail["subtasks"]] == [2, 3, 4]
+    assert sorted(assignee["username"] for assignee in detail["assignees"]) == ["other", "user"]
+    assert all(len(subtask["assignees"]) == 2 for subtask in detail["subtasks"])
+
+
+def test_get_detail_of_missing_task(db, user):
+    with track_queries() as stats:
+        assert crud_task.get_detail(db, 999) is None
+    assert stats.count == 1
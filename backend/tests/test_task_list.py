@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.crud import task as crud_task
+from app.database.query_stats import track_queries
+from app.models import Task, TaskAssignment, User
+
+PARENT_IDS = (1, 2, 3, 4, 5)
+
+
+@pytest.fixture
+def tasks(db, user):
+    """Five tasks with two subtasks each, every one assigned to both users"""
+    db.add(User(user_id=2, email="other@example.com", username="other", role_id=1))
+    deadline = datetime.utcnow() + timedelta(days=1)
+    rows = []
+    for parent_id in PARENT_IDS:
+        rows.append(
+            Task(
+                task_id=parent_id,
+                title=f"Launch task {parent_id}",
+                deadline=deadline + timedelta(hours=parent_id),
+                portfolio_id=101,
+                created_by=1,
+            )
+        )
+        rows.extend(
+            Task(
+                task_id=parent_id * 10 + index,
+                title=f"Step {index} of task {parent_id}",
+                deadline=deadline + timedelta(hours=parent_id),
+                portfolio_id=101,
+                created_by=2,
+                parent_task_id=parent_id,
+            )
+            for index in (1, 2)
+        )
+    db.add_all(rows)
+    db.flush()
+    db.add_all(
+        [TaskAssignment(task_id=row.task_id, user_id=user_id) for row in rows for user_id in (1, 2)]
+    )
+    db.commit()
+    db.expunge_all()
+
+
+def assert_fully_loaded(results):
+    parents = [result for result in results if result["task_id"] in PARENT_IDS]
+    assert len(parents) == len(PARENT_IDS)
+    for result in parents:
+        assert sorted(assignee["username"] for assignee in result["assignees"]) == [
+            "other",
+            "user",
+        ]
+        assert len(result["subtasks"]) == 2
+        assert all(len(subtask["assignees"]) == 2 for subtask in result["subtasks"])
+
+
+# Tasks, their assignees, subtasks and the subtasks' assignees: one statement each
+def test_get_multi_statement_count(db, tasks):
+    with track_queries() as stats:
+        results = crud_task.get_multi(db)
+
+    assert stats.count <= 4
+    assert_fully_loaded(results)
+
+
+def test_get_by_portfolio_statement_count(db, tasks):
+    with track_queries() as stats:
+        results = crud_task.get_by_portfolio(db, 101)
+
+    assert stats.count <= 4
+    assert_fully_loaded(results)
+
+
+def test_search_tasks_statement_count(db, tasks):
+    with track_queries() as stats:
+        results = crud_task.search_tasks(db, "launch")
+
+    assert stats.count <= 4
+    assert_fully_loaded(results)
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from app.crud import task as crud_task
+from app.models import Task
+
+
+def add_task(db, title, description=None):
+    task = Task(
+        title=title,
+        description=description,
+        deadline=datetime.utcnow() + timedelta(days=1),
+        portfolio_id=101,
+        created_by=1,
+    )
+    db.add(task)
+    db.commit()
+    return task
+
+
+def test_search_highlights_matched_terms(db, user):
+    add_task(db, "Alpha launch", "Prepare the alpha launch checklist")
+
+    [result] = crud_task.search_tasks(db, "alpha")
+
+    assert result["title_highlight"] == "<mark>Alpha</mark> launch"
+    assert "<mark>alpha</mark>" in result["description_highlight"]
+
+
+def test_search_highlights_escape_task_content(db, user):
+    add_task(
+        db,
+        "<script>alert(1)</script> alpha",
+        'alpha <img src=x onerror="alert(1)"> & more',
+    )
+
+    [result] = crud_task.search_tasks(db, "alpha")
+
+    assert result["title_highlight"] == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>alpha</mark>"
+    assert "<img" not in result["description_highlight"]
+    assert result["description_highlight"].startswith(
+        "<mark>alpha</mark> &lt;img src=x onerror=&quot;alert(1)&quot;&gt; &amp; more"
+    )
@@ -10,7 +10,7 @@ import logging
 import asyncio
 from pathlib import Path
 
-from utils import config
+from utils import config, APIClient, AuthManager, MeetingService
 
 # Setup logging
 logging.basicConfig(
@@ -46,6 +46,23 @@ class TaskBot(discord.Bot):
         
         # Store active voice connections
         self.voice_connections = {}
+        
+        # Backend API access shared by all cogs for the lifetime of the bot
+        self.api_client = APIClient(config.api_base_url)
+        self.auth_manager = AuthManager(self.api_client)
+        self.meeting_service = MeetingService(self.auth_manager)
+    
+    async def start(self, *args, **kwargs):
+        """Open the backend connection pool, then connect to Discord"""
+        await self.api_client.start()
+        await super().start(*args, **kwargs)
+    
+    async def close(self):
+        """Disconnect from Discord, then close the backend connection pool"""
+        try:
+            await super().close()
+        finally:
+            await self.api_client.close()
     
     async def on_ready(self):
         """Callback when bot is ready"""
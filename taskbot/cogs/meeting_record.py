@@ -8,9 +8,9 @@ import json
 import logging
 import os
 import subprocess
+import uuid
 from datetime import datetime
 
-import aiohttp
 import asyncio
 from typing import cast
 import discord
@@ -18,8 +18,6 @@ from ai_generation.generate_tasks import generate_tasks_async
 from ai_generation.speech_to_text import speech_to_text_async
 from discord.ext import commands
 from dotenv import load_dotenv
-from utils import MeetingService
-from utils.auth_manager import AuthManager
 from utils.config import config
 from pydub import AudioSegment  # type: ignore
 
@@ -34,40 +32,12 @@ class MeetingRecord(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.meeting_service = MeetingService()
-        self.session = None
-        self.auth_manager = AuthManager(config.api_base_url)
-        self._authenticated = False
+        # Shared with the other cogs, owned and closed by the bot
+        self.meeting_service = bot.meeting_service
+        self.auth_manager = bot.auth_manager
         # Store ongoing recording session information
         self.recording_sessions = {}
 
-    # Ensure aiohttp session is closed when cog is unloaded (avoided duplicating session creation, as it is handled in ensure_session)
-    def cog_unload(self):
-        """Called when the cog is unloaded"""
-        # Close aiohttp session without blocking
-        if self.session:
-            asyncio.create_task(self.session.close())
-
-    async def ensure_session(self):
-        """Ensure HTTP session is initialized"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-            logger.info("Created new HTTP session")
-
-    async def ensure_authenticated(self) -> bool:
-        """Ensure authentication with backend API"""
-        if not self.auth_manager.is_authenticated:
-            success = await self.auth_manager.login(
-                config.api_username, config.api_password
-            )
-            self._authenticated = success
-            if success:
-                logger.info("Successfully authenticated with backend API")
-            else:
-                logger.error("Failed to authenticate with backend API")
-            return success
-        return True
-    
     portfolio_options = [
         discord.OptionChoice(name="IT portfolio", value=101),
         discord.OptionChoice(name="Marketing portfolio", value=102),
@@ -298,8 +268,7 @@ class MeetingRecord(commands.Cog):
         await channel.send(
             f"**Generated Tasks:**\n```json\n{tasks_preview[:1000]}{'...' if len(tasks_preview) > 1800 else ''}\n```."
         )
-        await self.ensure_session()
-        if not await self.ensure_authenticated():
+        if not await self.auth_manager.ensure_authenticated():
             await channel.send(
                 "❌ Could not authenticate with backend API. Tasks not saved."
             )
@@ -308,12 +277,13 @@ class MeetingRecord(commands.Cog):
         await channel.send(
             f"✅ To make any changes to the tasks, access the taskbot website: {config.frontend_base_url}/taskbot/meeting/{meeting_id}/confirm"
         )
-        url = f"{config.api_base_url}/api/v1/tasks/group"
         payload = {"tasks": tasks, "portfolio_id": session["portfolio_id"], "source_meeting_id": meeting_id}
-        headers = self.auth_manager.auth_headers
+        # Retries of this save reuse the key, so the backend creates the task tree only once
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
         try:
-            assert self.session is not None
-            async with self.session.post(url, json=payload, headers=headers) as resp:
+            async with self.auth_manager.request(
+                "POST", "/api/v1/tasks/group", json=payload, headers=headers
+            ) as resp:
                 if resp.status == 200:
                     data = await resp.json()
                     await channel.send(
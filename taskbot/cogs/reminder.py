@@ -1,129 +1,142 @@
 """
 Task Reminder Cog
 
-Automatically checks tasks and sends reminder notifications on the corresponding channel
-one day before a task's deadline at 9:00 AM.
+Checks for due reminders every few minutes and sends them to each portfolio's channel
+at the lead times of its schedule (by default 3 days and 1 day before a deadline at
+9:00 AM in DEFAULT_TIMEZONE, and 1 hour before it). Sent reminders are recorded in a
+ledger, so restarts neither repeat them nor miss the ones due meanwhile; reminders
+a channel failed to receive are retried with backoff until they are given up.
 """
 
 import discord
 from discord.ext import commands, tasks
-import aiohttp
 import logging
-from datetime import time
-from typing import List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
 
 from utils.config import config
-from utils.auth_manager import AuthManager
+from utils.reminder_delivery import DeliveryReport, ReminderFanout, ReminderSections, build_embeds
+from utils.reminder_scheduler import (
+    DeliveryLedger,
+    LeadTime,
+    ReminderPlan,
+    ReminderSchedule,
+    parse_deadline,
+)
 
 logger = logging.getLogger(__name__)
 
+# Due windows served by /api/v1/tasks/reminders/{window} and how they read in messages
+WINDOW_DESCRIPTIONS = {
+    "overdue": "overdue",
+    "today": "due today",
+    "tomorrow": "due tomorrow",
+    "next_7_days": "due in the next 7 days",
+}
+
 
 class ReminderCog(commands.Cog):
     """Cog for handling task reminders"""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.session = None
-        self.auth_manager = AuthManager(config.api_base_url)
-        self._authenticated = False
+        # Shared with the other cogs, owned and closed by the bot
+        self.api_client = bot.api_client
+        self.auth_manager = bot.auth_manager
+        self.fanout = ReminderFanout(bot, concurrency=config.reminder_concurrency)
+        self.schedule = ReminderSchedule.from_config()
+        self.ledger = DeliveryLedger(
+            config.reminder_ledger_path, max_attempts=config.reminder_max_attempts
+        )
         
     async def cog_load(self):
         """Called when the cog is loaded"""
-        # Create aiohttp session
-        self.session = aiohttp.ClientSession()
-        
         # Start the reminder task
-        self.daily_reminder_check.start()
-        logger.info("Reminder cog loaded and daily check started")
+        self.reminder_check.start()
+        logger.info("Reminder cog loaded and reminder check started")
     
     async def cog_unload(self):
         """Called when the cog is unloaded"""
         # Stop the reminder task
-        self.daily_reminder_check.cancel()
-        
-        # Close aiohttp session
-        if self.session:
-            await self.session.close()
+        self.reminder_check.cancel()
+        self.ledger.close()
         
         logger.info("Reminder cog unloaded")
 
-    async def ensure_session(self):
-        """Ensure HTTP session is initialized"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-            logger.info("Created new HTTP session")
-
-    async def ensure_authenticated(self) -> bool:
-        """Ensure authentication with backend API"""
-        if not self._authenticated:
-            success = await self.auth_manager.login(
-                config.api_username, 
-                config.api_password
-            )
-            if success:
-                self._authenticated = True
-                logger.info("Successfully authenticated with backend API")
-            else:
-                logger.error("Failed to authenticate with backend API")
-            return success
-        return True
-
-    @tasks.loop(time=time(hour=9, minute=0))  # Run daily at 9:00 AM
-    async def daily_reminder_check(self):
-        """Check for tasks due tomorrow and send reminders"""
+    @tasks.loop(minutes=config.reminder_tick_minutes)
+    async def reminder_check(self):
+        """Send the reminders that fell due since the last check, including any missed while offline"""
         try:
-            logger.info("Starting daily reminder check...")
-            
-            # Fetch tasks due tomorrow from API
-            tasks_data = await self.fetch_tomorrow_tasks()
+            now = datetime.now(timezone.utc)
             
-            if not tasks_data or not tasks_data.get('tasks'):
-                logger.info("No tasks due tomorrow")
+            # One request covers the lead times of every portfolio
+            start, end = self.schedule.query_window(now)
+            tasks_data = await self.fetch_reminder_window(start, end)
+            if tasks_data is None:
                 return
             
-            # Group tasks by portfolio channel
-            channel_tasks = self.group_tasks_by_channel(tasks_data['tasks'])
+            tasks = tasks_data.get('tasks', [])
+            task_ids = [task['task_id'] for task in tasks]
+            # Failed reminders still backing off are left out like recorded ones
+            recorded = self.ledger.sent(task_ids) | self.ledger.waiting(task_ids, now)
+            plan = self.schedule.plan(tasks, now, recorded)
             
-            # Send reminders to each channel
-            for channel_id, tasks in channel_tasks.items():
-                await self.send_channel_reminder(channel_id, tasks)
+            # Earlier lead times superseded by a more imminent one are not sent any more
+            self.ledger.record(plan.skip, "skipped", now)
+            if plan.send:
+                report = await self.send_scheduled_reminders(plan, now)
+                logger.info(report.summary())
             
-            logger.info(f"Sent reminders for {len(tasks_data['tasks'])} tasks across {len(channel_tasks)} channels")
+            # Only deadlines still ahead are looked up
+            self.ledger.prune(now - timedelta(days=1))
             
         except Exception as e:
-            logger.error(f"Error in daily reminder check: {e}")
+            logger.error(f"Error in reminder check: {e}")
 
-    @daily_reminder_check.before_loop
-    async def before_daily_reminder_check(self):
+    @reminder_check.before_loop
+    async def before_reminder_check(self):
         """Wait for bot to be ready before starting the loop"""
         await self.bot.wait_until_ready()
 
     async def fetch_tomorrow_tasks(self) -> Dict[str, Any]:
         """Fetch tasks due tomorrow from the API"""
+        return await self.fetch_due_tasks("tomorrow")
+
+    async def fetch_due_tasks(self, window: str, portfolio_id: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch not completed tasks in a due window (overdue, today, tomorrow, next_7_days)"""
+        params = {"portfolio_id": portfolio_id} if portfolio_id else None
+        return await self._fetch_reminder_tasks(f"/api/v1/tasks/reminders/{window}", params, f"window '{window}'") or {}
+
+    async def fetch_reminder_window(self, start: datetime, end: datetime) -> Optional[Dict[str, Any]]:
+        """Fetch not completed tasks due from start until end, None if the request failed"""
+        params = {
+            "start": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        return await self._fetch_reminder_tasks(
+            "/api/v1/tasks/reminders/", params, f"{params['start']} - {params['end']}"
+        )
+
+    async def _fetch_reminder_tasks(
+        self, endpoint: str, params: Optional[Dict[str, Any]], label: str
+    ) -> Optional[Dict[str, Any]]:
         try:
-            # Ensure session is initialized
-            await self.ensure_session()
-            
             # Ensure authentication
-            if not await self.ensure_authenticated():
+            if not await self.auth_manager.ensure_authenticated():
                 logger.error("Cannot fetch tasks: authentication failed")
-                return {}
-            
-            url = f"{config.api_base_url}/api/v1/tasks/reminders/tomorrow"
-            logger.info(f"Making request to: {url}")
+                return None
             
-            # Get authentication headers
-            headers = self.auth_manager.auth_headers
+            logger.info(f"Making request to: {endpoint}")
             
-            async with self.session.get(url, headers=headers) as response:
+            async with self.auth_manager.request("GET", endpoint, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
                     # Check if data is None or empty
                     if data is None:
                         logger.warning("API returned None data")
-                        return {}
+                        return None
                     
-                    logger.info(f"Fetched {data.get('total_count', 0)} tasks due tomorrow")
+                    logger.info(f"Fetched {data.get('total_count', 0)} tasks in {label}")
                     return data
                 else:
                     logger.error(f"API request failed with status {response.status}")
@@ -133,11 +146,11 @@ class ReminderCog(commands.Cog):
                         logger.error(f"Error response: {error_text}")
                     except:
                         pass
-                    return {}
+                    return None
                     
         except Exception as e:
-            logger.error(f"Error fetching tomorrow tasks: {e}")
-            return {}
+            logger.error(f"Error fetching tasks in {label}: {e}")
+            return None
 
     def group_tasks_by_channel(self, tasks: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """Group tasks by their portfolio channel"""
@@ -152,34 +165,86 @@ class ReminderCog(commands.Cog):
         
         return channel_tasks
 
-    async def send_channel_reminder(self, channel_id: str, tasks: List[Dict[str, Any]]):
-        """Send reminder message to a specific channel"""
-        try:
-            channel = self.bot.get_channel(int(channel_id))
-            if not channel:
-                logger.warning(f"Channel {channel_id} not found")
-                return
-            
-            # Create reminder embed
-            embed = self.create_reminder_embed(tasks)
-            
-            # Send the reminder
-            await channel.send(embed=embed)
-            logger.info(f"Sent reminder to channel {channel.name} ({channel_id}) for {len(tasks)} tasks")
+    async def send_reminders(self, tasks: List[Dict[str, Any]], window: str = "tomorrow") -> DeliveryReport:
+        """Send reminders to all portfolio channels concurrently and report each channel's outcome"""
+        channel_tasks = self.group_tasks_by_channel(tasks)
+        
+        report = await self.fanout.deliver(
+            channel_tasks,
+            lambda channel_task_list: [
+                (channel_task_list, self.create_reminder_embeds(channel_task_list, window))
+            ]
+        )
+        report.unrouted_task_count = len(tasks) - sum(len(task_list) for task_list in channel_tasks.values())
+        return report
+
+    async def send_scheduled_reminders(self, plan: ReminderPlan, now: datetime) -> DeliveryReport:
+        """Send the reminders of a plan, grouped by how soon tasks are due, and record how each went"""
+        channel_tasks: Dict[str, List[Dict[str, Any]]] = {}
+        leads: Dict[int, LeadTime] = {}
+        unrouted = []
+        for task, lead in plan.send:
+            leads[task['task_id']] = lead
+            channel_id = task.get('portfolio_channel')
+            if channel_id:
+                channel_tasks.setdefault(channel_id, []).append(task)
+            else:
+                unrouted.append((task, lead))
+        
+        def build_channel_sections(channel_task_list: List[Dict[str, Any]]) -> ReminderSections:
+            # Group by the time actually left, which is less than the lead time when
+            # a reminder goes out late; soonest deadlines first
+            by_due_text: Dict[str, List[Dict[str, Any]]] = {}
+            for task in sorted(channel_task_list, key=lambda task: parse_deadline(task['deadline'])):
+                due_text = self.schedule.due_text(
+                    leads[task['task_id']], parse_deadline(task['deadline']), now
+                )
+                by_due_text.setdefault(due_text, []).append(task)
+            return [
+                (due_tasks, self.create_reminder_embeds(due_tasks, due_text=due_text))
+                for due_text, due_tasks in by_due_text.items()
+            ]
+        
+        report = await self.fanout.deliver(channel_tasks, build_channel_sections)
+        report.unrouted_task_count = len(unrouted)
+        
+        for delivery in report.deliveries:
+            delivered = [(task, leads[task['task_id']]) for task in delivery.sent_tasks]
+            self.ledger.record(delivered, "sent", now)
+            if delivery.ok:
+                continue
             
-        except Exception as e:
-            logger.error(f"Error sending reminder to channel {channel_id}: {e}")
+            # Only the tasks of the messages that did not go out are sent again
+            delivered_ids = {task['task_id'] for task in delivery.sent_tasks}
+            undelivered = [
+                (task, leads[task['task_id']])
+                for task in channel_tasks[delivery.channel_id]
+                if task['task_id'] not in delivered_ids
+            ]
+            if delivery.terminal:
+                self.ledger.record(undelivered, "failed", now)
+                given_up = undelivered
+            else:
+                given_up = self.ledger.record_failure(undelivered, delivery.error, now)
+            if given_up:
+                logger.warning(
+                    f"Gave up on {len(given_up)} reminders for channel {delivery.channel_id}: "
+                    f"{delivery.error}"
+                )
+        self.ledger.record(unrouted, "unrouted", now)
+        return report
 
-    def create_reminder_embed(self, tasks: List[Dict[str, Any]]) -> discord.Embed:
-        """Create a Discord embed for task reminders"""
+    def create_reminder_embeds(
+        self,
+        tasks: List[Dict[str, Any]],
+        window: str = "tomorrow",
+        due_text: Optional[str] = None,
+    ) -> List[discord.Embed]:
+        """Create the Discord embeds for task reminders, split to stay within Discord's limits"""
+        due_text = due_text or WINDOW_DESCRIPTIONS.get(window, 'due soon')
         portfolio_name = tasks[0].get('portfolio_name', 'Unknown Portfolio')
         
-        embed = discord.Embed(
-            title="🔔 Task Reminder",
-            description=f"**{portfolio_name}** has tasks due tomorrow!",
-            color=discord.Color.orange()
-        )
-        
+        fields = []
         for task in tasks:
             # Get assigned users
             assigned_users = task.get('assigned_users', [])
@@ -203,7 +268,7 @@ class ReminderCog(commands.Cog):
                 'high': '🔴',
                 'medium': '🟡',
                 'low': '🟢'
-            }.get(task.get('priority', '').lower(), '⚪')
+            }.get((task.get('priority') or '').lower(), '⚪')
             
             # Status emoji
             status_emoji = {
@@ -211,51 +276,63 @@ class ReminderCog(commands.Cog):
                 'in progress': '▶️',
                 'completed': '✅',
                 'on hold': '⏸️'
-            }.get(task.get('status', '').lower(), '❓')
+            }.get((task.get('status') or '').lower(), '❓')
+            
+            # The API sends null for a task without a description
+            description = task.get('description') or ''
+            if not description:
+                description = 'No description'
+            elif len(description) > 100:
+                description = f"{description[:100]}..."
             
             field_value = (
                 f"**Assigned to:** {users_text}\n"
                 f"**Deadline:** {deadline_local} at {deadline_time}\n"
                 f"**Priority:** {priority_emoji} {task.get('priority', 'Unknown')}\n"
                 f"**Status:** {status_emoji} {task.get('status', 'Unknown')}\n"
-                f"**Description:** {task.get('description', 'No description')[:100]}{'...' if len(task.get('description', '')) > 100 else ''}"
+                f"**Description:** {description}"
             )
             
-            embed.add_field(
-                name=f"📋 {task.get('title', 'Untitled Task')}",
-                value=field_value,
-                inline=False
-            )
+            fields.append((f"📋 {task.get('title', 'Untitled Task')}", field_value))
         
-        embed.set_footer(text="Don't forget to complete your tasks on time! 💪")
-        
-        return embed
+        return build_embeds(
+            title="🔔 Task Reminder",
+            description=f"**{portfolio_name}** has tasks {due_text}!",
+            fields=fields,
+            footer="Don't forget to complete your tasks on time! 💪",
+            color=discord.Color.orange()
+        )
 
     @discord.slash_command(description="Manually trigger reminder check (Admin only)")
     @commands.has_permissions(administrator=True)
-    async def check_reminders(self, ctx: discord.ApplicationContext):
+    async def check_reminders(
+        self,
+        ctx: discord.ApplicationContext,
+        window = discord.Option(
+            str,
+            "Which tasks to remind about",
+            required=False,
+            default="tomorrow",
+            choices=list(WINDOW_DESCRIPTIONS),
+        ),
+    ):
         """Manually trigger the reminder check"""
         await ctx.defer()
         
         try:
-            # Fetch tasks due tomorrow
-            tasks_data = await self.fetch_tomorrow_tasks()
+            # Fetch tasks in the chosen due window
+            tasks_data = await self.fetch_due_tasks(window)
             
             if not tasks_data or not tasks_data.get('tasks'):
-                await ctx.followup.send("No tasks due tomorrow found.", ephemeral=True)
+                await ctx.followup.send(f"No tasks {WINDOW_DESCRIPTIONS[window]} found.", ephemeral=True)
                 return
             
-            # Group tasks by channel
-            channel_tasks = self.group_tasks_by_channel(tasks_data['tasks'])
-            
-            # Send reminders
-            sent_count = 0
-            for channel_id, tasks in channel_tasks.items():
-                await self.send_channel_reminder(channel_id, tasks)
-                sent_count += len(tasks)
+            # Send reminders to every portfolio channel
+            report = await self.send_reminders(tasks_data['tasks'], window)
+            logger.info(report.summary())
             
             await ctx.followup.send(
-                f"✅ Sent reminders for {sent_count} tasks across {len(channel_tasks)} channels.",
+                f"{'✅' if not report.failed else '⚠️'} {report.summary()}"[:2000],
                 ephemeral=True
             )
             
@@ -265,14 +342,15 @@ class ReminderCog(commands.Cog):
 
     @discord.slash_command(description="Show next reminder time")
     async def next_reminder(self, ctx: discord.ApplicationContext):
-        """Show when the next reminder check will occur"""
-        if self.daily_reminder_check.is_running():
-            next_iteration = self.daily_reminder_check.next_iteration
+        """Show when the next daily reminders go out and when the next reminder check will occur"""
+        if self.reminder_check.is_running():
+            send_at = int(self.schedule.next_send_time(datetime.now(timezone.utc)).timestamp())
+            message = f"Next daily reminders: <t:{send_at}:F> (<t:{send_at}:R>)"
+            next_iteration = self.reminder_check.next_iteration
             if next_iteration:
                 timestamp = int(next_iteration.timestamp())
-                await ctx.respond(f"Next reminder check: <t:{timestamp}:F> (<t:{timestamp}:R>)", ephemeral=True)
-            else:
-                await ctx.respond("Next reminder time is not available.", ephemeral=True)
+                message += f"\nNext reminder check: <t:{timestamp}:F> (<t:{timestamp}:R>)"
+            await ctx.respond(message, ephemeral=True)
         else:
             await ctx.respond("Reminder task is not running.", ephemeral=True)
 
@@ -283,20 +361,15 @@ class ReminderCog(commands.Cog):
         await ctx.defer()
         
         try:
-            # Ensure session is initialized
-            await self.ensure_session()
-            
             # Ensure authentication
-            if not await self.ensure_authenticated():
+            if not await self.auth_manager.ensure_authenticated():
                 await ctx.followup.send("❌ API authentication failed", ephemeral=True)
                 return
             
-            url = f"{config.api_base_url}/api/v1/tasks/reminders/tomorrow"
-            
-            # Get authentication headers
-            headers = self.auth_manager.auth_headers
+            endpoint = "/api/v1/tasks/reminders/tomorrow"
+            url = f"{self.api_client.base_url}{endpoint}"
             
-            async with self.session.get(url, headers=headers) as response:
+            async with self.auth_manager.request("GET", endpoint) as response:
                 status = response.status
                 headers = dict(response.headers)
                 
@@ -335,9 +408,18 @@ class ReminderCog(commands.Cog):
         )
         
         embed.add_field(name="API Base URL", value=config.api_base_url, inline=False)
-        embed.add_field(name="Session Status", value="✅ Initialized" if self.session else "❌ Not Initialized", inline=True)
-        embed.add_field(name="Auth Status", value="✅ Authenticated" if self._authenticated else "❌ Not Authenticated", inline=True)
-        embed.add_field(name="Daily Task Status", value="✅ Running" if self.daily_reminder_check.is_running() else "❌ Stopped", inline=True)
+        embed.add_field(name="Session Status", value="✅ Initialized" if self.api_client.is_started else "❌ Not Initialized", inline=True)
+        embed.add_field(name="Auth Status", value="✅ Authenticated" if self.auth_manager.is_authenticated else "❌ Not Authenticated", inline=True)
+        embed.add_field(name="Reminder Status", value="✅ Running" if self.reminder_check.is_running() else "❌ Stopped", inline=True)
+        embed.add_field(
+            name="Reminder Schedule",
+            value=(
+                f"{self.schedule.default.send_time.strftime('%H:%M')} {self.schedule.zone.zone}, "
+                f"{', '.join(lead.label for lead in self.schedule.default.lead_times)} before deadlines"
+                f" ({len(self.schedule.portfolios)} portfolio overrides)"
+            ),
+            inline=False
+        )
         
         await ctx.respond(embed=embed, ephemeral=True)
 
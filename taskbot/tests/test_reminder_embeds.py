@@ -0,0 +1,61 @@
+"""
+Tests for the reminder embeds of the reminder cog
+
+Run from the taskbot directory with python -m pytest tests
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+
+from cogs.reminder import ReminderCog
+
+
+@pytest.fixture
+def cog(tmp_path, monkeypatch):
+    monkeypatch.setenv("REMINDER_LEDGER_PATH", str(tmp_path / "ledger.sqlite3"))
+    cog = ReminderCog(SimpleNamespace(api_client=None, auth_manager=None))
+    yield cog
+    cog.ledger.close()
+
+
+def make_task(**overrides):
+    task = {
+        "task_id": 1,
+        "title": "Prepare the launch",
+        "description": "Book the room",
+        "priority": "High",
+        "status": "In Progress",
+        "portfolio_name": "IT",
+        "assigned_users": [{"username": "user", "discord_id": None}],
+        "deadline_local_date": "2025-07-01",
+        "deadline_local_time": "17:00",
+    }
+    task.update(overrides)
+    return task
+
+
+def field_value(embeds):
+    [embed] = embeds
+    [field] = embed.fields
+    return field.value
+
+
+def test_null_description(cog):
+    embeds = cog.create_reminder_embeds([make_task(description=None)], due_text="due tomorrow")
+    
+    assert "**Description:** No description" in field_value(embeds)
+
+
+def test_long_description_is_shortened(cog):
+    embeds = cog.create_reminder_embeds([make_task(description="x" * 150)])
+    
+    assert f"**Description:** {'x' * 100}..." in field_value(embeds)
+
+
+def test_null_priority_and_status(cog):
+    embeds = cog.create_reminder_embeds([make_task(priority=None, status=None)])
+    
+    assert "**Description:** Book the room" in field_value(embeds)
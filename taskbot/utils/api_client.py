@@ -1,35 +1,285 @@
 """
 Backend API Communication Client
 
-Provides basic HTTP communication functionality with FastAPI backend service
+Provides basic HTTP communication functionality with FastAPI backend service.
+One client is owned by the bot for its whole lifetime and shared by all cogs and
+services, so connections to the backend are pooled and kept alive instead of
+being set up again for every call.
+
+Transient failures (connection errors, timeouts, 408/429/502/503/504) are retried
+with jittered exponential backoff, but only for requests that are safe to repeat:
+anything but POST/PATCH, or a POST/PATCH carrying an Idempotency-Key header. A
+circuit breaker stops sending requests for a while once the backend keeps failing,
+so a backend outage fails every caller fast instead of stalling each one.
 """
 
-import aiohttp
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
 from typing import Any
 
+import aiohttp
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: the backend or a proxy in front of it was briefly unavailable
+RETRY_STATUSES = {408, 429, 502, 503, 504}
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stops requests to a failing backend, then lets a single trial request through"""
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        Initialize circuit breaker
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit, 0 disables the breaker
+            reset_timeout: Seconds the circuit stays open before a trial request is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._trial_started_at: float | None = None
+    
+    @property
+    def state(self) -> str:
+        """closed, open or half-open"""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+    
+    def before_request(self) -> None:
+        """
+        Check that a request may be sent
+        
+        Raises:
+            CircuitOpenError: If the circuit is open or its trial request is still running
+        """
+        state = self.state
+        if state == "closed":
+            return
+        
+        now = time.monotonic()
+        if state == "open":
+            retry_in = self.reset_timeout - (now - self._opened_at)
+            raise CircuitOpenError(f"Backend API unavailable, retrying in {retry_in:.0f}s")
+        
+        # Half-open: one trial at a time, a new one if the last never reported back
+        if self._trial_started_at is not None and now - self._trial_started_at < self.reset_timeout:
+            raise CircuitOpenError("Backend API unavailable, waiting for a trial request")
+        self._trial_started_at = now
+    
+    def record_success(self) -> None:
+        """Close the circuit after a response from a working backend"""
+        if self._opened_at is not None:
+            logger.info("Backend API recovered, circuit closed")
+        self.failures = 0
+        self._opened_at = None
+        self._trial_started_at = None
+    
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold"""
+        self.failures += 1
+        self._trial_started_at = None
+        if self.failure_threshold and (
+            self._opened_at is not None or self.failures >= self.failure_threshold
+        ):
+            if self._opened_at is None:
+                logger.warning(
+                    f"Backend API failed {self.failures} times in a row, "
+                    f"pausing requests for {self.reset_timeout:.0f}s"
+                )
+            self._opened_at = time.monotonic()
+
 
 class APIClient:
     """Backend API communication client"""
     
-    def __init__(self, base_url: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float | None = None,
+        connect_timeout: float | None = None,
+        pool_limit: int | None = None,
+        pool_limit_per_host: int | None = None,
+        dns_cache_ttl: int | None = None,
+        keepalive_timeout: float | None = None,
+        max_retries: int | None = None,
+        retry_backoff: float | None = None,
+        retry_backoff_max: float | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ) -> None:
         """
         Initialize API client
         
         Args:
             base_url: Base URL of the backend API
+            timeout: Total seconds allowed per request, defaults to API_TIMEOUT
+            connect_timeout: Seconds allowed to connect, defaults to API_CONNECT_TIMEOUT
+            pool_limit: Most open connections, defaults to API_POOL_LIMIT
+            pool_limit_per_host: Most open connections per host, defaults to API_POOL_LIMIT_PER_HOST
+            dns_cache_ttl: Seconds DNS lookups are cached, defaults to API_DNS_CACHE_TTL
+            keepalive_timeout: Seconds idle connections are kept, defaults to API_KEEPALIVE_TIMEOUT
+            max_retries: Retries of a failed request that is safe to repeat, defaults to API_MAX_RETRIES
+            retry_backoff: Seconds of the first retry delay, doubled per retry, defaults to API_RETRY_BACKOFF
+            retry_backoff_max: Longest retry delay in seconds, defaults to API_RETRY_BACKOFF_MAX
+            circuit_breaker: Breaker shared by all requests, defaults to one from the API_CIRCUIT_* settings
         """
         self.base_url = base_url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(
+            total=timeout if timeout is not None else config.api_timeout,
+            connect=connect_timeout if connect_timeout is not None else config.api_connect_timeout,
+        )
+        self.pool_limit = pool_limit if pool_limit is not None else config.api_pool_limit
+        self.pool_limit_per_host = (
+            pool_limit_per_host if pool_limit_per_host is not None else config.api_pool_limit_per_host
+        )
+        self.dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else config.api_dns_cache_ttl
+        self.keepalive_timeout = (
+            keepalive_timeout if keepalive_timeout is not None else config.api_keepalive_timeout
+        )
+        self.max_retries = max_retries if max_retries is not None else config.api_max_retries
+        self.retry_backoff = retry_backoff if retry_backoff is not None else config.api_retry_backoff
+        self.retry_backoff_max = (
+            retry_backoff_max if retry_backoff_max is not None else config.api_retry_backoff_max
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            config.api_circuit_failure_threshold, config.api_circuit_reset_timeout
+        )
         self.session: aiohttp.ClientSession | None = None
+        self._headers: dict[str, str] = {}
+        self._owned_by_context = False
+    
+    @property
+    def is_started(self) -> bool:
+        """Whether the connection pool is open"""
+        return self.session is not None and not self.session.closed
+    
+    async def start(self) -> None:
+        """Open the connection pool; must be called from the running event loop"""
+        if self.is_started:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_limit,
+            limit_per_host=self.pool_limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+    
+    async def close(self) -> None:
+        """Close the connection pool"""
+        if self.session:
+            await self.session.close()
+        self.session = None
     
     async def __aenter__(self) -> 'APIClient':
-        """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        """Async context manager entry, opens the pool unless it is already open"""
+        if not self.is_started:
+            await self.start()
+            self._owned_by_context = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Async context manager exit"""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit, closes the pool only if the entry opened it"""
+        if self._owned_by_context:
+            self._owned_by_context = False
+            await self.close()
+    
+    def retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Seconds to wait before a retry: full jitter over an exponential backoff
+        
+        Args:
+            attempt: Number of the failed attempt, starting at 0
+            retry_after: Retry-After header of the failed response, if any
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.retry_backoff_max)
+            except ValueError:
+                pass  # HTTP date form, fall back to the backoff
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * 2 ** attempt))
+    
+    @asynccontextmanager
+    async def request(self, method: str, endpoint: str, *, idempotent: bool | None = None, **kwargs):
+        """
+        Send a request and yield the aiohttp response, retrying transient failures
+        
+        For callers that inspect the status or body themselves:
+        
+            async with client.request("GET", "/api/v1/...") as response:
+                ...
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            idempotent: Whether the request may be repeated, by default true unless it
+                is a POST/PATCH without an Idempotency-Key header
+            **kwargs: Other request parameters
+        
+        Raises:
+            CircuitOpenError: If the backend is failing and requests are paused
+        """
+        if not self.is_started:
+            raise RuntimeError("APIClient is not started; call start() or use it as async context manager")
+        
+        headers = {**self._headers, **(kwargs.pop("headers", None) or {})}
+        if idempotent is None:
+            idempotent = method.upper() not in ("POST", "PATCH") or "Idempotency-Key" in headers
+        attempts = self.max_retries + 1 if idempotent else 1
+        url = f"{self.base_url}{endpoint}"
+        
+        for attempt in range(attempts):
+            self.circuit_breaker.before_request()
+            last_attempt = attempt == attempts - 1
+            
+            try:
+                response = await self.session.request(method, url, headers=headers, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.circuit_breaker.record_failure()
+                if last_attempt:
+                    raise
+                delay = self.retry_delay(attempt)
+                logger.warning(f"{method} {endpoint} failed ({e!r}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            if response.status >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            
+            # 409 with Retry-After: the first request with this Idempotency-Key is still running
+            retryable = response.status in RETRY_STATUSES or (
+                response.status == 409 and "Retry-After" in response.headers
+            )
+            if retryable and not last_attempt:
+                delay = self.retry_delay(attempt, response.headers.get("Retry-After"))
+                response.release()
+                logger.warning(f"{method} {endpoint} returned {response.status}, retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            try:
+                yield response
+            finally:
+                response.release()
+            return
     
     async def _request(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
         """
@@ -39,28 +289,22 @@ class APIClient:
             method: HTTP method
             endpoint: API endpoint
             **kwargs: Other request parameters
-            
+        
         Returns:
             JSON data from response
         """
-        if not self.session:
-            raise RuntimeError("APIClient must be used as async context manager")
-        
-        url = f"{self.base_url}{endpoint}"
-        
-        async with self.session.request(method, url, **kwargs) as response:
+        async with self.request(method, endpoint, **kwargs) as response:
             response.raise_for_status()
             return await response.json()
     
     def set_auth_headers(self, headers: dict[str, str]) -> None:
         """
-        Set authentication headers
+        Set authentication headers sent with every request
         
         Args:
             headers: Authentication headers
         """
-        if self.session:
-            self.session.headers.update(headers)
+        self._headers.update(headers)
     
     async def get(self, endpoint: str, **kwargs) -> dict[str, Any]:
         """GET request"""
@@ -76,4 +320,4 @@ class APIClient:
     
     async def delete(self, endpoint: str, **kwargs) -> dict[str, Any]:
         """DELETE request"""
-        return await self._request("DELETE", endpoint, **kwargs) 
\ No newline at end of file
+        return await self._request("DELETE", endpoint, **kwargs)
\ No newline at end of file
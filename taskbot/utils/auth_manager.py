@@ -2,42 +2,100 @@
 Authentication Token Manager
 
 Responsible for managing authentication tokens with backend API, including acquisition, storage, refresh and validation
+
+Every login costs the backend a bcrypt password check, so the token is shared by
+all cogs, refreshed only shortly before the expiry encoded in the JWT, obtained
+by at most one login at a time, and saved to disk to be reused after a restart.
 """
 
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import json
 import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
 
 from .api_client import APIClient
+from .config import config
 
 logger = logging.getLogger(__name__)
 
 
+class AuthenticationError(RuntimeError):
+    """Raised when no valid token can be obtained from the backend API"""
+
+
+def token_expiry(token: str) -> datetime | None:
+    """
+    Read the expiry time from the payload of a JWT without verifying it
+    
+    Args:
+        token: Encoded JWT
+    
+    Returns:
+        Expiry time in UTC, None if the token has no readable exp claim
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload))["exp"]
+        return datetime.fromtimestamp(exp, tz=timezone.utc)
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
 class AuthManager:
     """Authentication manager"""
     
-    def __init__(self, base_url: str) -> None:
+    def __init__(
+        self,
+        api_client: APIClient,
+        *,
+        refresh_margin: float | None = None,
+        token_cache_path: Path | None = None,
+    ) -> None:
         """
         Initialize authentication manager
         
         Args:
-            base_url: Base URL of the backend API
+            api_client: Shared backend API client used to log in
+            refresh_margin: Seconds before expiry a token is replaced, defaults to API_TOKEN_REFRESH_MARGIN
+            token_cache_path: File the token is saved to, defaults to API_TOKEN_CACHE_PATH
         """
-        self.base_url = base_url
+        self.api_client = api_client
+        self.refresh_margin = timedelta(
+            seconds=refresh_margin if refresh_margin is not None else config.api_token_refresh_margin
+        )
+        self.token_cache_path = (
+            token_cache_path if token_cache_path is not None else config.api_token_cache_path
+        )
         self._token: str | None = None
         self._token_type: str = "Bearer"
         self._expires_at: datetime | None = None
+        # Login in progress, awaited by every caller that needs a token meanwhile
+        self._login_task: asyncio.Task | None = None
         
+        self._load_token()
+    
     @property
     def is_authenticated(self) -> bool:
-        """Check if authenticated and token is not expired"""
+        """Check if authenticated and token is not about to expire"""
         if not self._token:
             return False
         
-        if self._expires_at and datetime.now() >= self._expires_at:
+        if self._expires_at and datetime.now(timezone.utc) >= self._expires_at - self.refresh_margin:
             return False
-            
+        
         return True
     
+    @property
+    def expires_at(self) -> datetime | None:
+        """Expiry time of the current token"""
+        return self._expires_at
+    
     @property
     def auth_headers(self) -> dict[str, str]:
         """Get authentication headers"""
@@ -55,48 +113,197 @@ class AuthManager:
         Args:
             username: Username (email)
             password: Password
-            
+        
         Returns:
             Whether login was successful
         """
         try:
-            async with APIClient(self.base_url) as client:
-                # Prepare login data
-                login_data = {
-                    "username": username,
-                    "password": password,
-                    "grant_type": "password"
-                }
-                
-                # Send login request
-                response = await client.post(
-                    "/api/v1/login/access-token",
-                    data=login_data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
-                
-                # Save token information
-                self._token = response["access_token"]
-                self._token_type = response.get("token_type", "Bearer")
-                
-                # Set expiration time (assume token is valid for 1 hour)
-                self._expires_at = datetime.now() + timedelta(hours=1)
-                
-                logger.info("Successfully authenticated")
-                return True
-                
+            # Prepare login data
+            login_data = {
+                "username": username,
+                "password": password,
+                "grant_type": "password"
+            }
+            
+            # Send login request, safe to retry since it changes nothing
+            response = await self.api_client.post(
+                "/api/v1/login/access-token",
+                data=login_data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                idempotent=True
+            )
+            
+            # Save token information
+            self._token = response["access_token"]
+            self._token_type = response.get("token_type", "Bearer")
+            
+            # Expiration time from the token itself, assume 1 hour if it has none
+            self._expires_at = token_expiry(self._token) or (
+                datetime.now(timezone.utc) + timedelta(hours=1)
+            )
+            self._save_token()
+            
+            logger.info(f"Successfully authenticated, token valid until {self._expires_at.isoformat()}")
+            return True
+        
         except Exception as e:
             logger.error(f"Login failed: {e}")
             self._clear_auth()
             return False
     
+    async def ensure_authenticated(self) -> bool:
+        """
+        Log in with the configured API credentials unless a valid token is held
+        
+        Concurrent callers share one login instead of each starting their own.
+        
+        Returns:
+            Whether a valid token is available
+        """
+        if self.is_authenticated:
+            return True
+        
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.create_task(
+                self.login(config.api_username, config.api_password)
+            )
+        # Shielded so a cancelled caller does not cancel the login the others wait on
+        success = await asyncio.shield(self._login_task)
+        if not success:
+            logger.error("Failed to authenticate with backend API")
+        return success
+    
+    def invalidate(self, token_headers: dict[str, str]) -> None:
+        """
+        Drop the token sent with a request the backend rejected
+        
+        A token obtained by another caller in the meantime is kept.
+        
+        Args:
+            token_headers: Authentication headers the rejected request was sent with
+        """
+        if self._token and token_headers == {"Authorization": f"{self._token_type} {self._token}"}:
+            logger.info("Backend API rejected the token, logging in again")
+            self._clear_auth()
+    
+    @asynccontextmanager
+    async def request(self, method: str, endpoint: str, **kwargs):
+        """
+        Send an authenticated request and yield the aiohttp response
+        
+        A 401 response is retried once with a freshly obtained token.
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            **kwargs: Other request parameters
+        
+        Raises:
+            AuthenticationError: If no token could be obtained
+        """
+        headers = kwargs.pop("headers", None) or {}
+        
+        for attempt in range(2):
+            if not await self.ensure_authenticated():
+                raise AuthenticationError("Could not authenticate with backend API")
+            token_headers = self.auth_headers
+            
+            async with self.api_client.request(
+                method, endpoint, headers={**headers, **token_headers}, **kwargs
+            ) as response:
+                if response.status != 401 or attempt == 1:
+                    yield response
+                    return
+            
+            self.invalidate(token_headers)
+    
+    async def request_json(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
+        """
+        Send an authenticated request and return the JSON response
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            **kwargs: Other request parameters
+        
+        Returns:
+            JSON data from response
+        """
+        async with self.request(method, endpoint, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json()
+    
     def logout(self) -> None:
         """Logout and clear authentication information"""
         self._clear_auth()
         logger.info("Logged out")
     
     def _clear_auth(self) -> None:
-        """Clear authentication information"""
+        """Clear authentication information, including the saved token"""
         self._token = None
         self._token_type = "Bearer"
-        self._expires_at = None 
\ No newline at end of file
+        self._expires_at = None
+        
+        if self.token_cache_path:
+            try:
+                self.token_cache_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove saved token: {e}")
+    
+    def _cache_owner(self) -> dict[str, str]:
+        """Backend and account a saved token belongs to"""
+        return {
+            "base_url": self.api_client.base_url,
+            "username": os.getenv("API_USERNAME", ""),
+        }
+    
+    def _save_token(self) -> None:
+        """Save the token so it survives a restart, readable by the bot user only"""
+        if not self.token_cache_path:
+            return
+        
+        data = {
+            **self._cache_owner(),
+            "access_token": self._token,
+            "token_type": self._token_type,
+        }
+        temp_path = self.token_cache_path.with_name(self.token_cache_path.name + ".tmp")
+        try:
+            self.token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.token_cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save token: {e}")
+    
+    def _load_token(self) -> None:
+        """Reuse a saved token of the same backend and account if it is still valid"""
+        if not self.token_cache_path or not self.token_cache_path.exists():
+            return
+        
+        try:
+            with open(self.token_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read saved token: {e}")
+            return
+        
+        if not isinstance(data, dict) or any(
+            data.get(key) != value for key, value in self._cache_owner().items()
+        ):
+            return
+        
+        token = data.get("access_token")
+        expires_at = token_expiry(token) if isinstance(token, str) else None
+        if expires_at is None:
+            return
+        
+        self._token = token
+        self._token_type = data.get("token_type", "Bearer")
+        self._expires_at = expires_at
+        if self.is_authenticated:
+            logger.info(f"Reusing saved token valid until {expires_at.isoformat()}")
+        else:
+            self._token = None
+            self._expires_at = None
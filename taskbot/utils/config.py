@@ -4,6 +4,7 @@ Configuration Manager
 Responsible for reading and managing environment variable configurations
 """
 
+import json
 import os
 from pathlib import Path
 
@@ -61,6 +62,119 @@ class Config:
             raise ValueError("API_PASSWORD not found in environment variables")
         return password
     
+    @property
+    def api_timeout(self) -> float:
+        """Total seconds allowed for one backend API request"""
+        return float(os.getenv("API_TIMEOUT", "60"))
+    
+    @property
+    def api_connect_timeout(self) -> float:
+        """Seconds allowed to open a connection to the backend API"""
+        return float(os.getenv("API_CONNECT_TIMEOUT", "10"))
+    
+    @property
+    def api_pool_limit(self) -> int:
+        """Most connections the shared HTTP client keeps open"""
+        return int(os.getenv("API_POOL_LIMIT", "100"))
+    
+    @property
+    def api_pool_limit_per_host(self) -> int:
+        """Most connections the shared HTTP client keeps open to one host"""
+        return int(os.getenv("API_POOL_LIMIT_PER_HOST", "20"))
+    
+    @property
+    def api_dns_cache_ttl(self) -> int:
+        """Seconds a resolved backend API address is cached"""
+        return int(os.getenv("API_DNS_CACHE_TTL", "300"))
+    
+    @property
+    def api_keepalive_timeout(self) -> float:
+        """Seconds an idle connection to the backend API is kept open"""
+        return float(os.getenv("API_KEEPALIVE_TIMEOUT", "30"))
+    
+    @property
+    def api_max_retries(self) -> int:
+        """Retries of a failed backend API request that is safe to repeat"""
+        return int(os.getenv("API_MAX_RETRIES", "3"))
+    
+    @property
+    def api_retry_backoff(self) -> float:
+        """Seconds of the first retry delay, doubled for every further retry"""
+        return float(os.getenv("API_RETRY_BACKOFF", "0.5"))
+    
+    @property
+    def api_retry_backoff_max(self) -> float:
+        """Longest delay in seconds between two retries"""
+        return float(os.getenv("API_RETRY_BACKOFF_MAX", "10"))
+    
+    @property
+    def api_circuit_failure_threshold(self) -> int:
+        """Consecutive backend API failures that pause all requests, 0 to never pause"""
+        return int(os.getenv("API_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    
+    @property
+    def api_circuit_reset_timeout(self) -> float:
+        """Seconds requests stay paused before one trial request is sent"""
+        return float(os.getenv("API_CIRCUIT_RESET_TIMEOUT", "30"))
+    
+    @property
+    def api_token_refresh_margin(self) -> float:
+        """Seconds before its expiry the backend API token is replaced"""
+        return float(os.getenv("API_TOKEN_REFRESH_MARGIN", "3600"))
+    
+    @property
+    def api_token_cache_path(self) -> Path | None:
+        """File the backend API token is saved to across restarts, None when disabled"""
+        path_str = os.getenv("API_TOKEN_CACHE_PATH", "./data/.api_token.json")
+        return Path(path_str) if path_str else None
+    
+    @property
+    def reminder_concurrency(self) -> int:
+        """Most channels the reminder check sends to at the same time"""
+        return int(os.getenv("REMINDER_CONCURRENCY", "5"))
+    
+    @property
+    def default_timezone(self) -> str:
+        """Timezone of reminder days and times, matching the backend's DEFAULT_TIMEZONE"""
+        return os.getenv("DEFAULT_TIMEZONE", "Australia/Sydney")
+    
+    @property
+    def reminder_time(self) -> str:
+        """Local time of day (HH:MM) reminders with day lead times go out"""
+        return os.getenv("REMINDER_TIME", "09:00")
+    
+    @property
+    def reminder_lead_times(self) -> list[str]:
+        """How long before deadlines tasks are reminded, e.g. 3d, 1d, 1h"""
+        lead_times = os.getenv("REMINDER_LEAD_TIMES", "3d,1d,1h")
+        return [lead_time.strip() for lead_time in lead_times.split(",") if lead_time.strip()]
+    
+    @property
+    def reminder_schedules(self) -> dict[str, dict]:
+        """Per-portfolio reminder time and lead times by portfolio ID, from JSON"""
+        schedules = os.getenv("REMINDER_SCHEDULES", "")
+        if not schedules:
+            return {}
+        try:
+            return json.loads(schedules)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"REMINDER_SCHEDULES is not valid JSON: {e}") from None
+    
+    @property
+    def reminder_tick_minutes(self) -> float:
+        """Minutes between reminder checks"""
+        return float(os.getenv("REMINDER_TICK_MINUTES", "5"))
+    
+    @property
+    def reminder_ledger_path(self) -> Path:
+        """SQLite file recording the reminders sent"""
+        return Path(os.getenv("REMINDER_LEDGER_PATH", "./reminder_ledger.sqlite3"))
+    
+    @property
+    def reminder_max_attempts(self) -> int:
+        """Sends of a reminder that fails before it is given up, backing off between them"""
+        return max(1, int(os.getenv("REMINDER_MAX_ATTEMPTS", "5")))
+    
     @property
     def recording_save_path(self) -> Path:
         """Recording file save path"""
@@ -5,9 +5,9 @@ Responsible for handling meeting record related API calls
 """
 
 import logging
+import uuid
 from datetime import date
 
-from .api_client import APIClient
 from .auth_manager import AuthManager
 from .config import config
 
@@ -17,25 +17,14 @@ logger = logging.getLogger(__name__)
 class MeetingService:
     """Meeting record service"""
     
-    def __init__(self) -> None:
-        """Initialize meeting record service"""
-        self.auth_manager = AuthManager(config.api_base_url)
-        self._authenticated = False
-    
-    async def ensure_authenticated(self) -> bool:
-        """Ensure authenticated"""
-        if not self.auth_manager.is_authenticated:
-            success = await self.auth_manager.login(
-                config.api_username,
-                config.api_password,
-            )
-            self._authenticated = success
-            if success:
-                logger.info("Successfully authenticated with backend API")
-            else:
-                logger.error("Failed to authenticate with backend API")
-            return success
-        return True
+    def __init__(self, auth_manager: AuthManager) -> None:
+        """
+        Initialize meeting record service
+        
+        Args:
+            auth_manager: Shared authentication manager, sends the authenticated requests
+        """
+        self.auth_manager = auth_manager
     
     async def create_meeting_record(
         self,
@@ -62,7 +51,7 @@ class MeetingService:
         Returns:
             Returns meeting record data if successful, None if failed
         """
-        if not await self.ensure_authenticated():
+        if not await self.auth_manager.ensure_authenticated():
             logger.error("Cannot create meeting record: authentication failed")
             return None
         
@@ -81,20 +70,17 @@ class MeetingService:
                 "user_can_see": user_can_see
             }
             
-            # Send create request
-            async with APIClient(config.api_base_url) as client:
-                # Set authentication headers
-                client.set_auth_headers(self.auth_manager.auth_headers)
-                
-                # Create meeting record
-                response = await client.post(
-                    "/api/v1/meeting-records/",
-                    json=meeting_data
-                )
-                
-                logger.info(f"Successfully created meeting record: {response.get('meeting_id')}")
-                return response
-                
+            # Send create request; the key lets it be retried without creating a second record
+            response = await self.auth_manager.request_json(
+                "POST",
+                "/api/v1/meeting-records/",
+                json=meeting_data,
+                headers={"Idempotency-Key": str(uuid.uuid4())}
+            )
+            
+            logger.info(f"Successfully created meeting record: {response.get('meeting_id')}")
+            return response
+            
         except Exception as e:
             logger.error(f"Failed to create meeting record: {e}")
             return None
@@ -0,0 +1,271 @@
+"""
+Reminder Delivery
+
+Sends reminder embeds to many channels at once and reports how each delivery went
+
+Discord rate limits message sends per channel (a route bucket keyed by channel ID)
+and per bot overall. Messages to one channel are therefore sent one after another,
+while different channels are served concurrently, at most `concurrency` at a time;
+py-cord's HTTP client waits out exhausted buckets and 429 responses itself. Embeds
+are split to stay within Discord's embed and message size limits.
+
+Each delivery reports the tasks of the messages that went out, so a channel that
+failed part way is only sent the rest again, and whether its error is terminal: a
+channel that is gone or not writable, or embeds that cannot be built, will fail
+the same way on every retry.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord limits for embeds and messages
+EMBED_MAX_FIELDS = 25
+EMBED_MAX_CHARACTERS = 6000  # Title, description, field names and values, footer and author
+FIELD_NAME_MAX_LENGTH = 256
+FIELD_VALUE_MAX_LENGTH = 1024
+MESSAGE_MAX_EMBEDS = 10
+MESSAGE_MAX_CHARACTERS = 6000  # Summed over all embeds of a message
+
+# Room left in each embed for the " (2/3)" part numbers added to titles
+PART_SUFFIX_RESERVE = 16
+
+# Send errors that retrying will not fix: unknown channel, missing permissions
+TERMINAL_ERRORS = (discord.NotFound, discord.Forbidden)
+
+# (tasks, embeds) sections of a channel's reminder; the embeds are built by
+# build_embeds with one field per task, in the order of the tasks
+ReminderSections = list[tuple[list[dict[str, Any]], list[discord.Embed]]]
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def build_embeds(
+    *,
+    title: str,
+    description: str,
+    fields: list[tuple[str, str]],
+    footer: str,
+    color: discord.Color,
+) -> list[discord.Embed]:
+    """
+    Spread fields over as many embeds as Discord's limits require
+    
+    The first embed carries the description and the last the footer; titles get
+    part numbers when there is more than one embed.
+    
+    Args:
+        title: Title of every embed
+        description: Description of the first embed
+        fields: (name, value) pairs, shortened to the field limits if needed
+        footer: Footer of the last embed
+        color: Color of every embed
+    
+    Returns:
+        Embeds in order, at least one
+    """
+    budget = EMBED_MAX_CHARACTERS - len(footer) - PART_SUFFIX_RESERVE
+    embeds = [discord.Embed(title=title, description=description, color=color)]
+    
+    for name, value in fields:
+        name = _truncate(name, FIELD_NAME_MAX_LENGTH)
+        value = _truncate(value, FIELD_VALUE_MAX_LENGTH)
+        current = embeds[-1]
+        if len(current.fields) >= EMBED_MAX_FIELDS or len(current) + len(name) + len(value) > budget:
+            current = discord.Embed(title=title, color=color)
+            embeds.append(current)
+        current.add_field(name=name, value=value, inline=False)
+    
+    if len(embeds) > 1:
+        for part, embed in enumerate(embeds, start=1):
+            embed.title = f"{title} ({part}/{len(embeds)})"
+    embeds[-1].set_footer(text=footer)
+    return embeds
+
+
+@dataclass
+class ReminderMessage:
+    """Embeds of one message and the tasks they carry fields of"""
+    
+    embeds: list[discord.Embed] = field(default_factory=list)
+    tasks: list[dict[str, Any]] = field(default_factory=list)
+
+
+def pack_messages(sections: ReminderSections) -> list[ReminderMessage]:
+    """
+    Group embeds into as few messages as the per-message limits allow
+    
+    Args:
+        sections: (tasks, embeds) pairs in order, each embed within the single-embed
+            limits and holding one field per task
+    
+    Returns:
+        Messages in order, with the tasks of their embeds
+    """
+    messages: list[ReminderMessage] = []
+    characters = 0
+    for tasks, embeds in sections:
+        remaining = list(tasks)
+        for embed in embeds:
+            if (
+                not messages
+                or len(messages[-1].embeds) >= MESSAGE_MAX_EMBEDS
+                or characters + len(embed) > MESSAGE_MAX_CHARACTERS
+            ):
+                messages.append(ReminderMessage())
+                characters = 0
+            messages[-1].embeds.append(embed)
+            messages[-1].tasks.extend(remaining[:len(embed.fields)])
+            del remaining[:len(embed.fields)]
+            characters += len(embed)
+    return messages
+
+
+@dataclass
+class ChannelDelivery:
+    """Outcome of sending one channel its reminder"""
+    
+    channel_id: str
+    task_count: int
+    messages_total: int = 0
+    messages_sent: int = 0
+    latency: float = 0.0  # Seconds from the first send until the last finished or failed
+    error: str | None = None
+    terminal: bool = False  # Whether retrying would fail the same way
+    sent_tasks: list[dict[str, Any]] = field(default_factory=list)  # Tasks of the messages sent
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class DeliveryReport:
+    """Outcome of one reminder fan-out"""
+    
+    deliveries: list[ChannelDelivery] = field(default_factory=list)
+    unrouted_task_count: int = 0  # Tasks whose portfolio has no reminder channel
+    duration: float = 0.0
+    
+    @property
+    def failed(self) -> list[ChannelDelivery]:
+        return [delivery for delivery in self.deliveries if not delivery.ok]
+    
+    @property
+    def delivered_task_count(self) -> int:
+        return sum(delivery.task_count for delivery in self.deliveries if delivery.ok)
+    
+    def summary(self, max_failures: int = 10) -> str:
+        """Human readable outcome, listing up to max_failures failed channels"""
+        lines = [
+            f"Sent reminders for {self.delivered_task_count} tasks to "
+            f"{len(self.deliveries) - len(self.failed)}/{len(self.deliveries)} channels "
+            f"in {self.duration:.1f}s"
+        ]
+        if self.deliveries:
+            slowest = max(self.deliveries, key=lambda delivery: delivery.latency)
+            lines.append(f"Slowest channel: {slowest.channel_id} ({slowest.latency:.1f}s)")
+        for delivery in self.failed[:max_failures]:
+            outcome = "given up" if delivery.terminal else "to be retried"
+            lines.append(
+                f"Failed channel {delivery.channel_id}: {delivery.task_count} tasks, "
+                f"{delivery.messages_sent}/{delivery.messages_total} messages sent, "
+                f"{outcome} ({delivery.error})"
+            )
+        if len(self.failed) > max_failures:
+            lines.append(f"...and {len(self.failed) - max_failures} more failed channels")
+        if self.unrouted_task_count:
+            lines.append(f"{self.unrouted_task_count} tasks skipped: their portfolio has no channel")
+        return "\n".join(lines)
+
+
+class ReminderFanout:
+    """Concurrent reminder sender"""
+    
+    def __init__(self, bot: discord.Bot, *, concurrency: int) -> None:
+        """
+        Initialize reminder sender
+        
+        Args:
+            bot: Bot whose channels receive the reminders
+            concurrency: Most channels being sent to at the same time
+        """
+        self.bot = bot
+        self.concurrency = max(1, concurrency)
+    
+    async def deliver(
+        self,
+        channel_tasks: dict[str, list[dict[str, Any]]],
+        build_sections: Callable[[list[dict[str, Any]]], ReminderSections],
+    ) -> DeliveryReport:
+        """
+        Send every channel the embeds built from its tasks
+        
+        Args:
+            channel_tasks: Tasks by channel ID
+            build_sections: Builds the (tasks, embeds) sections of one channel from its tasks
+        
+        Returns:
+            Report with the outcome of each channel, in the order of channel_tasks
+        """
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deliveries = await asyncio.gather(*(
+            self._deliver_channel(semaphore, channel_id, tasks, build_sections)
+            for channel_id, tasks in channel_tasks.items()
+        ))
+        return DeliveryReport(deliveries=list(deliveries), duration=time.perf_counter() - start)
+    
+    async def _deliver_channel(
+        self,
+        semaphore: asyncio.Semaphore,
+        channel_id: str,
+        tasks: list[dict[str, Any]],
+        build_sections: Callable[[list[dict[str, Any]]], ReminderSections],
+    ) -> ChannelDelivery:
+        delivery = ChannelDelivery(channel_id=channel_id, task_count=len(tasks))
+        try:
+            messages = pack_messages(build_sections(tasks))
+        except Exception as e:
+            delivery.error = f"{type(e).__name__}: {e}"
+            delivery.terminal = True
+            logger.error(f"Error building reminder for channel {channel_id}: {delivery.error}")
+            return delivery
+        
+        delivery.messages_total = len(messages)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                channel = self.bot.get_channel(int(channel_id)) or await self.bot.fetch_channel(
+                    int(channel_id)
+                )
+                for message in messages:
+                    await channel.send(embeds=message.embeds)
+                    delivery.messages_sent += 1
+                    delivery.sent_tasks.extend(message.tasks)
+            except Exception as e:
+                delivery.error = f"{type(e).__name__}: {e}"
+                delivery.terminal = isinstance(e, TERMINAL_ERRORS)
+            finally:
+                delivery.latency = time.perf_counter() - start
+        
+        if delivery.ok:
+            logger.info(
+                f"Sent reminder to channel {channel_id} for {len(tasks)} tasks "
+                f"in {delivery.messages_sent} messages ({delivery.latency:.2f}s)"
+            )
+        else:
+            logger.error(
+                f"Error sending reminder to channel {channel_id} after "
+                f"{delivery.messages_sent}/{delivery.messages_total} messages: {delivery.error}"
+            )
+        return delivery
@@ -0,0 +1,421 @@
+"""
+Reminder Scheduler
+
+Decides which task reminders are due and keeps a ledger of the ones already sent
+
+Every portfolio has a schedule: the local time of day its reminders go out and the
+lead times it is reminded at. A lead time in days ("3d", "1d") is sent at that
+time of day on the day that many days before the deadline's day; a shorter one
+("1h", "30m") is sent as soon as the deadline is that close. Days and times of
+day are taken in DEFAULT_TIMEZONE.
+
+Sent reminders are recorded in a SQLite ledger keyed by task, lead time and
+deadline, so a restart never repeats one, and a reminder that fell due while the
+bot was down is sent on the next tick as long as its task is not due yet. When
+several lead times of a task fell due, only the most imminent one is sent.
+
+A reminder whose channel failed is retried on later ticks, waiting longer after
+each failed attempt, and recorded as failed once it has used up its attempts or
+failed in a way retrying cannot fix.
+"""
+
+import math
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import pytz
+
+from .config import config
+
+_LEAD_TIME_PATTERN = re.compile(r"^(\d+)\s*([dhm])$")
+
+# Wait before retrying a failed reminder, doubled after each further failure
+RETRY_BASE_DELAY = timedelta(minutes=5)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class LeadTime:
+    """How long before its deadline a task is reminded"""
+    
+    label: str  # Normalized form such as "3d", also the ledger key
+    days: int = 0  # Calendar days, sent at the portfolio's time of day
+    delta: timedelta | None = None  # Exact time before the deadline, used instead of days
+    
+    @classmethod
+    def parse(cls, text: str) -> "LeadTime":
+        """
+        Parse a lead time such as 3d, 1h or 30m
+        
+        Raises:
+            ValueError: If the text is not a number followed by d, h or m
+        """
+        match = _LEAD_TIME_PATTERN.match(text.strip().lower())
+        if not match:
+            raise ValueError(f"Invalid reminder lead time {text!r}, expected e.g. 3d, 1h or 30m")
+        
+        amount, unit = int(match[1]), match[2]
+        if unit == "d":
+            return cls(f"{amount}d", days=amount)
+        delta = timedelta(hours=amount) if unit == "h" else timedelta(minutes=amount)
+        return cls(f"{amount}{unit}", delta=delta)
+    
+    @property
+    def span(self) -> timedelta:
+        """Approximate time before the deadline, for ordering lead times"""
+        return self.delta if self.delta is not None else timedelta(days=self.days)
+    
+    def send_at(self, deadline: datetime, send_time: time, zone: pytz.BaseTzInfo) -> datetime:
+        """Time the reminder of a task due at deadline goes out"""
+        if self.delta is not None:
+            return deadline - self.delta
+        day = deadline.astimezone(zone).date() - timedelta(days=self.days)
+        return zone.localize(datetime.combine(day, send_time))
+
+
+@dataclass(frozen=True)
+class PortfolioSchedule:
+    """Local time of day reminders go out and the lead times reminded at"""
+    
+    send_time: time
+    lead_times: tuple[LeadTime, ...]
+
+
+def _parse_time(text: str) -> time:
+    try:
+        return datetime.strptime(text.strip(), "%H:%M").time()
+    except ValueError:
+        raise ValueError(f"Invalid reminder time {text!r}, expected HH:MM") from None
+
+
+def parse_deadline(value: str) -> datetime:
+    """Deadline from the API as an aware UTC datetime; naive values are UTC"""
+    deadline = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if deadline.tzinfo is None:
+        return deadline.replace(tzinfo=timezone.utc)
+    return deadline.astimezone(timezone.utc)
+
+
+@dataclass
+class ReminderPlan:
+    """Reminders of one tick"""
+    
+    # (task, lead time) pairs to send now
+    send: list[tuple[dict[str, Any], LeadTime]] = field(default_factory=list)
+    # Due lead times superseded by a more imminent one, recorded without sending
+    skip: list[tuple[dict[str, Any], LeadTime]] = field(default_factory=list)
+
+
+class ReminderSchedule:
+    """Reminder schedules of all portfolios"""
+    
+    def __init__(
+        self,
+        zone: pytz.BaseTzInfo,
+        default: PortfolioSchedule,
+        portfolios: dict[int, PortfolioSchedule] | None = None,
+    ) -> None:
+        """
+        Initialize reminder schedules
+        
+        Args:
+            zone: Timezone of days and times of day
+            default: Schedule of portfolios without their own
+            portfolios: Schedules by portfolio ID
+        """
+        self.zone = zone
+        self.default = default
+        self.portfolios = portfolios or {}
+    
+    @classmethod
+    def from_config(cls) -> "ReminderSchedule":
+        """
+        Build the schedules from DEFAULT_TIMEZONE, REMINDER_TIME, REMINDER_LEAD_TIMES
+        and REMINDER_SCHEDULES
+        
+        Raises:
+            ValueError: If a setting cannot be parsed
+        """
+        default = PortfolioSchedule(
+            send_time=_parse_time(config.reminder_time),
+            lead_times=tuple(LeadTime.parse(text) for text in config.reminder_lead_times),
+        )
+        portfolios = {}
+        for portfolio_id, settings in config.reminder_schedules.items():
+            portfolios[int(portfolio_id)] = PortfolioSchedule(
+                send_time=_parse_time(settings["time"]) if "time" in settings else default.send_time,
+                lead_times=(
+                    tuple(LeadTime.parse(text) for text in settings["lead_times"])
+                    if "lead_times" in settings
+                    else default.lead_times
+                ),
+            )
+        return cls(pytz.timezone(config.default_timezone), default, portfolios)
+    
+    def for_portfolio(self, portfolio_id: int | None) -> PortfolioSchedule:
+        """Schedule of a portfolio"""
+        return self.portfolios.get(portfolio_id, self.default)
+    
+    def query_window(self, now: datetime) -> tuple[datetime, datetime]:
+        """
+        Deadlines to fetch so every reminder due by now is found, for all portfolios at once
+        
+        Args:
+            now: Current time, aware
+        
+        Returns:
+            (start, end) in UTC, end exclusive
+        """
+        today = now.astimezone(self.zone).date()
+        end = now
+        for schedule in (self.default, *self.portfolios.values()):
+            for lead in schedule.lead_times:
+                if lead.delta is not None:
+                    end = max(end, now + lead.delta)
+                else:
+                    # Anything due before the day after today + days may be reminded today
+                    day_after = datetime.combine(today + timedelta(days=lead.days + 1), time.min)
+                    end = max(end, self.zone.localize(day_after))
+        return now.astimezone(timezone.utc), end.astimezone(timezone.utc)
+    
+    def due_text(self, lead: LeadTime, deadline: datetime, now: datetime) -> str:
+        """
+        How a reminder reads in messages, from the time actually left
+        
+        A reminder sent late, after downtime or for a task created after its send
+        time, can be closer to the deadline than its lead time says.
+        
+        Args:
+            lead: Lead time the reminder is sent for
+            deadline: Deadline of the task, aware
+            now: Current time, aware
+        
+        Returns:
+            Text such as "due in 3 days", "due tomorrow" or "due within 20 minutes"
+        """
+        if lead.delta is None:
+            days = (deadline.astimezone(self.zone).date() - now.astimezone(self.zone).date()).days
+            if days <= 0:
+                return "due today"
+            return "due tomorrow" if days == 1 else f"due in {days} days"
+        
+        minutes = max(1, math.ceil((deadline - now).total_seconds() / 60))
+        if minutes < 60:
+            return "due within 1 minute" if minutes == 1 else f"due within {minutes} minutes"
+        hours = math.ceil(minutes / 60)
+        return "due within 1 hour" if hours == 1 else f"due within {hours} hours"
+    
+    def next_send_time(self, now: datetime) -> datetime:
+        """Next time the default schedule's day lead times go out"""
+        local_now = now.astimezone(self.zone)
+        send_at = self.zone.localize(datetime.combine(local_now.date(), self.default.send_time))
+        if send_at <= local_now:
+            send_at = self.zone.localize(
+                datetime.combine(local_now.date() + timedelta(days=1), self.default.send_time)
+            )
+        return send_at
+    
+    def plan(
+        self,
+        tasks: list[dict[str, Any]],
+        now: datetime,
+        sent: set[tuple[int, str, str]],
+    ) -> ReminderPlan:
+        """
+        Pick the reminders to send now
+        
+        Args:
+            tasks: Not completed tasks from the reminders API
+            now: Current time, aware
+            sent: (task ID, lead time label, deadline key) of the reminders in the ledger
+        
+        Returns:
+            Reminders to send and superseded ones to record
+        """
+        plan = ReminderPlan()
+        for task in tasks:
+            deadline = parse_deadline(task["deadline"])
+            if deadline <= now:
+                continue
+            
+            schedule = self.for_portfolio(task.get("portfolio_id"))
+            due = sorted(
+                (
+                    lead for lead in schedule.lead_times
+                    if lead.send_at(deadline, schedule.send_time, self.zone) <= now
+                ),
+                key=lambda lead: lead.span,
+            )
+            unsent = [
+                lead for lead in due
+                if (task["task_id"], lead.label, ledger_deadline(deadline)) not in sent
+            ]
+            if not unsent:
+                continue
+            
+            if unsent[0] == due[0]:
+                plan.send.append((task, due[0]))
+                unsent = unsent[1:]
+            plan.skip.extend((task, lead) for lead in unsent)
+        return plan
+
+
+def ledger_deadline(deadline: datetime) -> str:
+    """Deadline as stored in the ledger; a moved deadline gets its reminders again"""
+    return deadline.astimezone(timezone.utc).isoformat()
+
+
+def _reminder_key(task: dict[str, Any], lead: LeadTime) -> tuple[int, str, str]:
+    return task["task_id"], lead.label, ledger_deadline(parse_deadline(task["deadline"]))
+
+
+class DeliveryLedger:
+    """SQLite record of the reminders sent, and of the failed ones to retry"""
+    
+    def __init__(self, path: Path, max_attempts: int = 5) -> None:
+        """
+        Open the ledger, creating the file if needed
+        
+        Args:
+            path: SQLite database file
+            max_attempts: Failed sends of a reminder before it is recorded as failed
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reminder_deliveries (
+                task_id INTEGER NOT NULL,
+                lead_time TEXT NOT NULL,
+                deadline TEXT NOT NULL,
+                status TEXT NOT NULL,
+                channel_id TEXT,
+                recorded_at TEXT NOT NULL,
+                PRIMARY KEY (task_id, lead_time, deadline)
+            )
+            """
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reminder_attempts (
+                task_id INTEGER NOT NULL,
+                lead_time TEXT NOT NULL,
+                deadline TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                next_attempt_at TEXT NOT NULL,
+                error TEXT,
+                PRIMARY KEY (task_id, lead_time, deadline)
+            )
+            """
+        )
+        self.connection.commit()
+    
+    def sent(self, task_ids: list[int]) -> set[tuple[int, str, str]]:
+        """(task ID, lead time label, deadline key) recorded for the given tasks"""
+        if not task_ids:
+            return set()
+        placeholders = ", ".join("?" * len(task_ids))
+        rows = self.connection.execute(
+            "SELECT task_id, lead_time, deadline FROM reminder_deliveries "
+            f"WHERE task_id IN ({placeholders})",
+            task_ids,
+        )
+        return set(rows)
+    
+    def waiting(self, task_ids: list[int], now: datetime) -> set[tuple[int, str, str]]:
+        """(task ID, lead time label, deadline key) of failed reminders not to be retried yet"""
+        if not task_ids:
+            return set()
+        placeholders = ", ".join("?" * len(task_ids))
+        rows = self.connection.execute(
+            "SELECT task_id, lead_time, deadline FROM reminder_attempts "
+            f"WHERE task_id IN ({placeholders}) AND next_attempt_at > ?",
+            [*task_ids, now.astimezone(timezone.utc).isoformat()],
+        )
+        return set(rows)
+    
+    def record(
+        self,
+        reminders: list[tuple[dict[str, Any], LeadTime]],
+        status: str,
+        now: datetime,
+    ) -> None:
+        """
+        Record reminders so later ticks leave them out
+        
+        Args:
+            reminders: (task, lead time) pairs
+            status: "sent", "skipped" (superseded), "unrouted" (no portfolio channel)
+                or "failed" (given up)
+            now: Current time, aware
+        """
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO reminder_deliveries VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    *_reminder_key(task, lead),
+                    status,
+                    task.get("portfolio_channel"),
+                    now.astimezone(timezone.utc).isoformat(),
+                )
+                for task, lead in reminders
+            ],
+        )
+        self.connection.commit()
+    
+    def record_failure(
+        self,
+        reminders: list[tuple[dict[str, Any], LeadTime]],
+        error: str,
+        now: datetime,
+    ) -> list[tuple[dict[str, Any], LeadTime]]:
+        """
+        Count a failed attempt at sending reminders and hold them back before retrying
+        
+        Reminders that have used up max_attempts are recorded as failed instead.
+        
+        Args:
+            reminders: (task, lead time) pairs that were not sent
+            error: Why the send failed
+            now: Current time, aware
+        
+        Returns:
+            Reminders given up
+        """
+        given_up = []
+        for task, lead in reminders:
+            key = _reminder_key(task, lead)
+            row = self.connection.execute(
+                "SELECT attempts FROM reminder_attempts "
+                "WHERE task_id = ? AND lead_time = ? AND deadline = ?",
+                key,
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            if attempts >= self.max_attempts:
+                given_up.append((task, lead))
+            delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO reminder_attempts VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, attempts, (now + delay).astimezone(timezone.utc).isoformat(), error),
+            )
+        self.connection.commit()
+        self.record(given_up, "failed", now)
+        return given_up
+    
+    def prune(self, before: datetime) -> None:
+        """Forget reminders of deadlines before the given time"""
+        for table in ("reminder_deliveries", "reminder_attempts"):
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE deadline < ?", (ledger_deadline(before),)
+            )
+        self.connection.commit()
+    
+    def close(self) -> None:
+        """Close the database file"""
+        self.connection.close()